@@ -5,6 +5,8 @@ from django.contrib import messages
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth.models import User
 
+from main import replicas
+
 def register_view(request):
     if request.user.is_authenticated:
         return redirect('main:home')
@@ -57,8 +59,10 @@ def logout_view(request):
     return redirect('main:home')
 
 @login_required
+@replicas.read_from_replica
 def profile_view(request):
-    user_resumes = request.user.resume_set.all()
+    # The render document can be large and the list never shows it.
+    user_resumes = request.user.resume_set.defer('document')
     
     return render(request, 'accounts/profile.html', {
         'user_resumes': user_resumes,
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Resume, PersonalInfo, Experience, Education, Skill, Project
+from .models import Resume, PersonalInfo, Experience, Education, Skill, Project, ExportJob, ResumeEvent, ResumeSnapshot
 
 @admin.register(Resume)
 class ResumeAdmin(admin.ModelAdmin):
@@ -9,6 +9,9 @@ class ResumeAdmin(admin.ModelAdmin):
     readonly_fields = ('created_at', 'updated_at')
     ordering = ('-updated_at',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('document')
+
 @admin.register(PersonalInfo)
 class PersonalInfoAdmin(admin.ModelAdmin):
     list_display = ('first_name', 'last_name', 'email', 'phone', 'resume')
@@ -43,3 +46,29 @@ class ProjectAdmin(admin.ModelAdmin):
     list_filter = ('start_date', 'end_date')
     search_fields = ('title', 'technologies', 'resume__title')
     ordering = ('-start_date',)
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ('resume', 'user', 'status', 'created_at', 'started_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('resume__title', 'user__username')
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
+    ordering = ('-created_at',)
+
+@admin.register(ResumeEvent)
+class ResumeEventAdmin(admin.ModelAdmin):
+    list_display = ('resume', 'event', 'by', 'ts')
+    list_filter = ('event', 'ts')
+    search_fields = ('resume__title', 'by')
+    raw_id_fields = ('resume',)
+    ordering = ('-ts',)
+
+@admin.register(ResumeSnapshot)
+class ResumeSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('resume', 'number', 'label', 'created_at')
+    search_fields = ('resume__title', 'label')
+    raw_id_fields = ('resume',)
+    # Snapshots are immutable; the document is a compressed blob.
+    exclude = ('document',)
+    readonly_fields = ('resume', 'number', 'digest', 'created_at')
+    ordering = ('-created_at',)
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
 
 
 class MainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main'
+
+    def ready(self):
+        from . import checks, perf, signals, template_registry  # noqa: F401
+        try:
+            template_registry.load()
+        except (TemplateDoesNotExist, TemplateSyntaxError):
+            # Reported by the main.E001/E002 system checks; load() retries on first use.
+            pass
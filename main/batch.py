@@ -0,0 +1,147 @@
+"""
+Batch create/update/delete of resume sections for the builder.
+
+A batch is a list of operations such as::
+
+    {"op": "create", "model": "skill", "data": {"name": "Go", "level": "advanced"}}
+    {"op": "update", "model": "experience", "id": 12, "data": {"description": "..."}}
+    {"op": "delete", "model": "project", "id": 7}
+
+Every operation is validated with the same ModelForm as the single-entity
+endpoints; ``update`` only needs the fields being changed. A batch may touch
+each row at most once. Nothing is written unless every operation is valid, and
+then everything is written in one transaction with one bulk query per model
+and kind of operation. Bulk writes skip model signals, so the document and
+caches are refreshed here once for the whole batch.
+"""
+from django.conf import settings
+from django.db import router, transaction
+from django.forms.models import model_to_dict
+
+from . import signals
+from .forms import PersonalInfoForm, ExperienceForm, EducationForm, SkillForm, ProjectForm
+from .models import PersonalInfo
+
+FORMS = {
+    'personal_info': PersonalInfoForm,
+    'experience': ExperienceForm,
+    'education': EducationForm,
+    'skill': SkillForm,
+    'project': ProjectForm,
+}
+OPS = ('create', 'update', 'delete')
+
+
+class BatchError(Exception):
+    """The batch was rejected; ``results`` says which operations failed and why."""
+
+    def __init__(self, message, results=None):
+        super().__init__(message)
+        self.results = results or []
+
+
+def _parse(operations) -> list[dict]:
+    if not isinstance(operations, list) or not operations:
+        raise BatchError('"operations" must be a non-empty list.')
+    if len(operations) > settings.BATCH_MAX_OPERATIONS:
+        raise BatchError(f'A batch may contain at most {settings.BATCH_MAX_OPERATIONS} operations.')
+    parsed, seen = [], set()
+    for index, op in enumerate(operations):
+        if not isinstance(op, dict) or op.get('op') not in OPS or op.get('model') not in FORMS:
+            raise BatchError(f'Operation {index} needs "op" ({", ".join(OPS)}) and "model" ({", ".join(FORMS)}).')
+        data = op.get('data') or {}
+        if not isinstance(data, dict):
+            raise BatchError(f'Operation {index}: "data" must be an object.')
+        pk = op.get('id')
+        # personal_info is one row per resume, addressed by the resume rather than an id.
+        if op['op'] != 'create' and op['model'] != 'personal_info' and not isinstance(pk, int):
+            raise BatchError(f'Operation {index}: "{op["op"]}" needs an integer "id".')
+        if op['op'] != 'create' and op['model'] != 'personal_info':
+            # A second write to the same row would silently undo or no-op against the first.
+            if (op['model'], pk) in seen:
+                raise BatchError(f'Operation {index}: {op["model"]} {pk} is already changed by this batch.')
+            seen.add((op['model'], pk))
+        parsed.append({'op': op['op'], 'model': op['model'], 'id': pk, 'data': data})
+    if sum(op['model'] == 'personal_info' for op in parsed) > 1:
+        raise BatchError('A batch may change personal_info at most once.')
+    return parsed
+
+
+def _load_targets(resume, operations) -> dict:
+    """Fetch every row an update/delete refers to, one query per model, scoped to ``resume``."""
+    wanted = {}
+    for op in operations:
+        if op['op'] != 'create' or op['model'] == 'personal_info':
+            wanted.setdefault(op['model'], set()).add(op['id'])
+    targets = {}
+    for model_name, ids in wanted.items():
+        if model_name == 'personal_info':
+            targets[model_name] = {None: row for row in PersonalInfo.objects.filter(resume=resume)}
+        else:
+            model = FORMS[model_name]._meta.model
+            targets[model_name] = model.objects.filter(resume=resume, pk__in=ids).in_bulk()
+    return targets
+
+
+def apply(resume, operations) -> list[dict]:
+    """Validate and apply a batch; returns one result per operation, with the new id for creates."""
+    operations = _parse(operations)
+    targets = _load_targets(resume, operations)
+
+    results, failed = [], False
+    creates, updates, deletes = {}, {}, {}
+    for index, op in enumerate(operations):
+        form_class = FORMS[op['model']]
+        key = None if op['model'] == 'personal_info' else op['id']
+        instance = targets.get(op['model'], {}).get(key)
+        kind = op['op']
+        if op['model'] == 'personal_info' and kind != 'delete':
+            # One row per resume: create and update both mean "save it".
+            kind = 'update' if instance else 'create'
+
+        if kind != 'create' and instance is None:
+            results.append({'index': index, 'status': 'error', 'errors': {'id': ['Not found.']}})
+            failed = True
+            continue
+        if kind == 'delete':
+            deletes.setdefault(op['model'], {})[instance.pk] = instance
+            results.append({'index': index, 'status': 'success', 'id': instance.pk})
+            continue
+
+        data = op['data']
+        if kind == 'update':
+            # Fields not in the operation keep their current values.
+            data = {**model_to_dict(instance, fields=form_class._meta.fields), **data}
+        form = form_class(data, instance=instance)
+        if not form.is_valid():
+            results.append({'index': index, 'status': 'error', 'errors': form.errors})
+            failed = True
+            continue
+        obj = form.save(commit=False)
+        if kind == 'create':
+            obj.resume = resume
+            creates.setdefault(op['model'], []).append((index, obj))
+        else:
+            updates.setdefault(op['model'], {})[obj.pk] = obj
+        results.append({'index': index, 'status': 'success', 'id': obj.pk})
+
+    if failed:
+        raise BatchError('No changes were saved; fix the failed operations and resend the batch.', results)
+
+    with transaction.atomic():
+        for model_name, rows in deletes.items():
+            model = FORMS[model_name]._meta.model
+            # Nothing references section rows, so skip the collector and its per-row post_delete,
+            # each of which would refresh the document; sections_changed below does it once.
+            model.objects.filter(pk__in=list(rows))._raw_delete(router.db_for_write(model))
+        for model_name, rows in updates.items():
+            form_class = FORMS[model_name]
+            form_class._meta.model.objects.bulk_update(list(rows.values()), form_class._meta.fields)
+        for model_name, rows in creates.items():
+            FORMS[model_name]._meta.model.objects.bulk_create([obj for _, obj in rows])
+            for index, obj in rows:
+                results[index]['id'] = obj.pk
+        signals.sections_changed(resume.id, [
+            signals.SECTION_MODELS[FORMS[name]._meta.model] for name in {*deletes, *updates, *creates}
+        ])
+    return results
@@ -0,0 +1,56 @@
+import os
+
+from django.core.cache.backends.filebased import FileBasedCache
+
+
+class LRUFileBasedCache(FileBasedCache):
+    """
+    FileBasedCache that evicts the least recently used entries instead of a
+    random sample, and optionally bounds the total size of the cache directory.
+
+    Extra OPTIONS:
+        MAX_BYTES: upper bound for the size of all cache files (0 = unbounded).
+    """
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        options = params.get('OPTIONS', {})
+        self._max_bytes = int(options.get('MAX_BYTES', 0))
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, default, version)
+        if value is not default:
+            # Reads bump the mtime so _cull() can order entries by recency.
+            try:
+                os.utime(self._key_to_file(key, version))
+            except FileNotFoundError:
+                pass
+        return value
+
+    def _cull(self):
+        entries = []
+        for fname in self._list_cache_files():
+            try:
+                st = os.stat(fname)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, fname))
+
+        count = len(entries)
+        total = sum(size for _, size, _ in entries)
+        if not self._over_limits(count, total):
+            return
+        if self._cull_frequency == 0:
+            return self.clear()
+
+        # Oldest first; always make room for at least one new entry.
+        entries.sort()
+        for _, size, fname in entries:
+            if not self._over_limits(count, total):
+                break
+            self._delete(fname)
+            count -= 1
+            total -= size
+
+    def _over_limits(self, count, total):
+        return count >= self._max_entries or bool(self._max_bytes and total >= self._max_bytes)
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core import checks
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+
+from . import template_registry
+
+
+@checks.register(checks.Tags.templates)
+def check_resume_templates(app_configs, **kwargs):
+    """Every template choice should have a file; the fallback must exist and all must compile."""
+    try:
+        registry = template_registry.build()
+    except TemplateDoesNotExist as e:
+        return [checks.Error(f'Resume template {e} does not exist.', id='main.E001')]
+    except TemplateSyntaxError as e:
+        return [checks.Error(f'Resume template failed to compile: {e}', id='main.E002')]
+    missing = [key for key, entry in registry.items() if entry.is_fallback]
+    if not missing:
+        return []
+    return [checks.Warning(
+        f"{len(missing)} template choice(s) have no file and render with "
+        f"'{template_registry.FALLBACK_KEY}': {', '.join(missing)}.",
+        hint='Add main/resume_templates/<key>.html or remove the key from Resume.TEMPLATE_CHOICES.',
+        id='main.W001',
+    )]
+
+
+@checks.register(checks.Tags.caches)
+def check_live_preview_broker(app_configs, **kwargs):
+    """CacheBroker over a per-process cache only reaches subscribers in the publishing process."""
+    if not settings.LIVE_PREVIEW_ENABLED or settings.LIVE_PREVIEW_BROKER != 'main.live_preview.CacheBroker':
+        return []
+    backend = settings.CACHES.get(settings.LIVE_PREVIEW_CACHE_ALIAS, {}).get('BACKEND', '')
+    if not backend.endswith('LocMemCache'):
+        return []
+    return [checks.Warning(
+        f"LIVE_PREVIEW_CACHE_ALIAS '{settings.LIVE_PREVIEW_CACHE_ALIAS}' is a per-process LocMem cache, "
+        "so CacheBroker cannot deliver live preview updates across processes.",
+        hint='Point LIVE_PREVIEW_CACHE_ALIAS at a cache every process shares, such as Redis.',
+        id='main.W002',
+    )]
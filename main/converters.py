@@ -0,0 +1,194 @@
+"""Helpers for the Image ↔ PDF conversion tools."""
+import tempfile
+from collections import deque
+from contextlib import contextmanager
+from io import BytesIO
+
+from PIL import Image
+
+from . import perf
+
+try:
+    import fitz  # PyMuPDF
+except Exception:
+    fitz = None
+
+# Page sizes in PDF points (1/72 inch).
+PAGE_SIZES = {
+    'a4': (595, 842),
+    'letter': (612, 792),
+}
+
+
+def parse_page_range(spec: str, page_count: int) -> list[int]:
+    """
+    Turn a spec like ``"1-3,7"`` (1-based, inclusive) into 0-based page indexes.
+
+    An empty spec selects every page. Raises ValueError for malformed or
+    out-of-range input.
+    """
+    spec = (spec or '').replace(' ', '')
+    if not spec:
+        return list(range(page_count))
+    pages = []
+    for part in spec.split(','):
+        start, sep, end = part.partition('-')
+        try:
+            first = int(start) if start else 1
+            last = (int(end) if end else page_count) if sep else first
+        except ValueError:
+            raise ValueError(f'Invalid page range "{part}".')
+        if not 1 <= first <= last <= page_count:
+            raise ValueError(f'Page range "{part}" is outside 1-{page_count}.')
+        pages.extend(range(first - 1, last))
+    return list(dict.fromkeys(pages))
+
+
+def open_pdf(uploaded_file):
+    """
+    Open an uploaded PDF without copying it into Python memory when possible.
+
+    Large uploads are spooled to disk by Django; MuPDF then reads pages from the
+    file on demand. Small in-memory uploads are opened from their bytes.
+    """
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        return fitz.open(uploaded_file.temporary_file_path(), filetype='pdf')
+    return fitz.open(stream=uploaded_file.read(), filetype='pdf')
+
+
+def render_page(page, dpi: int, fmt: str) -> bytes:
+    # The pixmap is dropped as soon as it is encoded, so only one page's bitmap is alive at a time.
+    with perf.span('mupdf'):
+        return page.get_pixmap(dpi=dpi).tobytes(output=fmt)
+
+
+def iter_page_images(doc, pages, dpi: int, fmt: str):
+    """Yield ``(page_index, image_bytes)`` one page at a time, closing ``doc`` at the end."""
+    try:
+        for index in pages:
+            yield index, render_page(doc[index], dpi, fmt)
+    finally:
+        doc.close()
+
+
+@contextmanager
+def uploaded_pdf_path(uploaded_file):
+    """A filesystem path for the upload that worker processes can open themselves."""
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        yield uploaded_file.temporary_file_path()
+        return
+    with tempfile.NamedTemporaryFile(suffix='.pdf') as tmp:
+        for chunk in uploaded_file.chunks():
+            tmp.write(chunk)
+        tmp.flush()
+        yield tmp.name
+
+
+def rasterize_pages(path: str, pages: list[int], dpi: int, fmt: str) -> list[bytes]:
+    """Process-pool entry point: open the PDF independently and encode a run of pages."""
+    with fitz.open(path, filetype='pdf') as doc:
+        return [render_page(doc[index], dpi, fmt) for index in pages]
+
+
+def iter_page_images_parallel(path: str, pages, dpi: int, fmt: str, pool, workers: int, chunk_size: int = 4):
+    """
+    Like ``iter_page_images`` but rasterizes runs of ``chunk_size`` pages across ``pool``.
+
+    Results are yielded in page order. At most two chunks per worker are in
+    flight, which keeps every worker busy while bounding memory.
+    """
+    pages = list(pages)
+    pending = deque()
+    try:
+        for start in range(0, len(pages), chunk_size):
+            chunk = pages[start:start + chunk_size]
+            pending.append((chunk, pool.submit(rasterize_pages, path, chunk, dpi, fmt)))
+            if len(pending) >= workers * 2:
+                chunk, future = pending.popleft()
+                yield from zip(chunk, _wait_for_pages(future))
+        while pending:
+            chunk, future = pending.popleft()
+            yield from zip(chunk, _wait_for_pages(future))
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+def _wait_for_pages(future) -> list[bytes]:
+    # The workers' rendering is invisible here; count the time spent waiting on it.
+    with perf.span('mupdf'):
+        return future.result()
+
+
+def _prepare_image(uploaded_file, max_pixels, quality: int):
+    """
+    Return ``(jpeg_bytes, (width, height))`` for one upload, or None if unreadable.
+
+    Baseline RGB/greyscale JPEGs that already fit ``max_pixels`` are passed through
+    untouched; everything else is decoded (downscaled while decoding where the
+    codec supports it), flattened to RGB and re-encoded as JPEG.
+    """
+    try:
+        img = Image.open(uploaded_file)
+    except Exception:
+        return None
+    with img:
+        fits = max_pixels is None or (img.width <= max_pixels[0] and img.height <= max_pixels[1])
+        if img.format == 'JPEG' and img.mode in ('RGB', 'L') and fits:
+            uploaded_file.seek(0)
+            return uploaded_file.read(), img.size
+        try:
+            with perf.span('pillow'):
+                if not fits:
+                    img.thumbnail(max_pixels)
+                if img.mode not in ('RGB', 'L'):
+                    img = img.convert('RGB')
+                buf = BytesIO()
+                img.save(buf, format='JPEG', quality=quality)
+        except Exception:
+            return None
+        return buf.getvalue(), img.size
+
+
+def images_to_pdf(uploaded_files, path: str, page_size: str = '', dpi: int = 150, quality: int = 85) -> int:
+    """
+    Write ``uploaded_files`` to the file at ``path`` as a PDF, one image per page.
+
+    Images are decoded and appended one at a time, so at most one bitmap is
+    alive at once. With ``page_size`` (a key of PAGE_SIZES) each image is fitted
+    onto that page and downscaled to ``dpi``; otherwise the page matches the
+    image. Returns the number of pages written.
+    """
+    page_dims = PAGE_SIZES.get(page_size)
+    max_pixels = (page_dims[0] * dpi // 72, page_dims[1] * dpi // 72) if page_dims else None
+    pages = 0
+
+    if fitz is None:
+        # Pillow fallback: re-encodes every image and cannot pass JPEGs through.
+        with open(path, 'w+b') as out:
+            for f in uploaded_files:
+                prepared = _prepare_image(f, max_pixels, quality)
+                if prepared is None:
+                    continue
+                with Image.open(BytesIO(prepared[0])) as img, perf.span('pillow'):
+                    out.seek(0)
+                    img.save(out, format='PDF', append=pages > 0, resolution=72)
+                pages += 1
+        return pages
+
+    # MuPDF keeps only the compressed image streams until the document is saved.
+    doc = fitz.open()
+    for f in uploaded_files:
+        prepared = _prepare_image(f, max_pixels, quality)
+        if prepared is None:
+            continue
+        stream, (width, height) = prepared
+        with perf.span('mupdf'):
+            page = doc.new_page(width=page_dims[0] if page_dims else width, height=page_dims[1] if page_dims else height)
+            page.insert_image(page.rect, stream=stream)
+        pages += 1
+    if pages:
+        with perf.span('mupdf'):
+            doc.save(path, garbage=1, deflate=True)
+    doc.close()
+    return pages
@@ -0,0 +1,117 @@
+"""
+Denormalized render documents.
+
+Each resume keeps its personal info and section rows in ``Resume.document``,
+so rendering reads that one row instead of joining six tables:
+
+    {"personal_info": {...} | null, "experiences": [...], "education": [...],
+     "skills": [...], "projects": [...]}
+
+Rows hold every concrete field except the keys, as JSON (dates as ISO
+strings, decimals as strings). ``context`` turns the document back into
+unsaved model instances for the templates.
+
+The model signals in ``main.signals`` keep it current in the same
+transaction as the change, re-reading only the sections that changed
+(``refresh``). Writes that bypass signals must call
+``signals.sections_changed`` or set the document themselves, as
+``seeding.create`` does. A NULL document, as on rows from before the column
+existed, is rebuilt from the section tables on first read (``get``) and
+written back unless the resume changed meanwhile.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+
+from .models import Resume, PersonalInfo, Experience, Education, Skill, Project
+
+# Section name -> model; personal info is the single header row.
+SECTIONS = {
+    'experiences': Experience,
+    'education': Education,
+    'skills': Skill,
+    'projects': Project,
+}
+# html_cache section names that differ from document keys.
+_KEYS = {'header': 'personal_info'}
+
+
+def field_values(instance, exclude=()) -> dict:
+    """Concrete field values of ``instance`` for building a copy, without its key and ``exclude``."""
+    return {
+        f.attname: getattr(instance, f.attname)
+        for f in instance._meta.concrete_fields
+        if not f.primary_key and f.name not in exclude
+    }
+
+
+def jsonable(value):
+    """``value`` as it reads back from a JSONField."""
+    return json.loads(json.dumps(value, cls=DjangoJSONEncoder))
+
+
+def row(instance) -> dict:
+    return field_values(instance, exclude=('resume',))
+
+
+def build(resume) -> dict:
+    """The document for ``resume`` from its related rows, using prefetched ones when present."""
+    try:
+        personal_info = row(resume.personal_info)
+    except PersonalInfo.DoesNotExist:
+        personal_info = None
+    return jsonable({
+        'personal_info': personal_info,
+        **{name: [row(obj) for obj in getattr(resume, name).all()] for name in SECTIONS},
+    })
+
+
+def get(resume) -> dict:
+    """``resume.document``, built and saved first if it is missing."""
+    if resume.document is None:
+        doc = build(resume)
+        # A concurrent edit bumped the version: it will have left the document NULL, so leave it to the next read.
+        Resume.objects.filter(pk=resume.pk, version=resume.version).update(document=doc)
+        resume.document = doc
+    return resume.document
+
+
+def _read_section(resume_id: int, key: str):
+    if key == 'personal_info':
+        obj = PersonalInfo.objects.filter(resume_id=resume_id).first()
+        return row(obj) if obj else None
+    return [row(obj) for obj in SECTIONS[key].objects.filter(resume_id=resume_id)]
+
+
+def refresh(resume_id: int, sections) -> None:
+    """
+    Bump the resume's version and re-read ``sections`` (html_cache section
+    names) into its document. Run it inside the transaction that changed them.
+    """
+    doc = Resume.objects.select_for_update().filter(pk=resume_id).values_list('document', flat=True).first()
+    if doc is None:
+        # Not built yet, or the resume is being deleted: the next read builds it whole.
+        Resume.objects.filter(pk=resume_id).update(version=F('version') + 1)
+        return
+    for name in sections:
+        key = _KEYS.get(name, name)
+        doc[key] = _read_section(resume_id, key)
+    Resume.objects.filter(pk=resume_id).update(version=F('version') + 1, document=jsonable(doc))
+
+
+def _instance(model, values: dict):
+    fields = {f.attname: f for f in model._meta.concrete_fields}
+    # Fields the model has since lost are dropped; new ones take their defaults.
+    return model(**{name: fields[name].to_python(value) for name, value in values.items() if name in fields})
+
+
+def context(resume, doc: dict | None = None) -> dict:
+    """The template context for ``resume`` rendered from ``doc``, by default its own document."""
+    doc = get(resume) if doc is None else doc
+    personal_info = doc.get('personal_info')
+    return {
+        'resume': resume,
+        'personal_info': _instance(PersonalInfo, personal_info) if personal_info is not None else None,
+        **{name: [_instance(model, values) for values in doc.get(name, [])] for name, model in SECTIONS.items()},
+    }
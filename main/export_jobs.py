@@ -0,0 +1,126 @@
+"""
+Database-backed queue for background PDF exports.
+
+Views enqueue an ``ExportJob`` row; ``manage.py run_export_worker`` claims
+queued jobs and renders them on a local process pool. Finished PDFs land in
+the PDF cache, so the regular export view serves them without re-rendering.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from . import pdf_cache, rendering
+from .models import ExportJob, Resume
+
+ACTIVE_STATUSES = (ExportJob.STATUS_QUEUED, ExportJob.STATUS_RUNNING)
+
+
+class QueueFull(Exception):
+    """The user already has the maximum number of pending exports."""
+
+
+@transaction.atomic
+def enqueue(user, resume, base_url: str) -> ExportJob:
+    # Lock the user row so concurrent requests count and insert one at a time.
+    User.objects.select_for_update().only('pk').get(pk=user.pk)
+    existing = ExportJob.objects.filter(resume=resume, status__in=ACTIVE_STATUSES).first()
+    if existing is not None:
+        return existing
+    active = ExportJob.objects.filter(user=user, status__in=ACTIVE_STATUSES).count()
+    if active >= settings.EXPORT_MAX_PENDING_JOBS_PER_USER:
+        raise QueueFull
+    return ExportJob.objects.create(user=user, resume=resume, base_url=base_url)
+
+
+def claim(limit: int) -> list[ExportJob]:
+    """Atomically move up to ``limit`` queued jobs to running, oldest first."""
+    if limit <= 0:
+        return []
+    running = dict(
+        ExportJob.objects.filter(status=ExportJob.STATUS_RUNNING)
+        .values('user_id').annotate(n=Count('id')).order_by()
+        .values_list('user_id', 'n')
+    )
+    claimed = []
+    # Look past the first `limit` rows so one busy user cannot starve the rest.
+    for job in ExportJob.objects.filter(status=ExportJob.STATUS_QUEUED)[:limit * 10]:
+        if len(claimed) >= limit:
+            break
+        if running.get(job.user_id, 0) >= settings.EXPORT_MAX_RUNNING_JOBS_PER_USER:
+            continue
+        now = timezone.now()
+        updated = ExportJob.objects.filter(pk=job.pk, status=ExportJob.STATUS_QUEUED).update(
+            status=ExportJob.STATUS_RUNNING, started_at=now,
+        )
+        if updated:
+            job.status, job.started_at = ExportJob.STATUS_RUNNING, now
+            running[job.user_id] = running.get(job.user_id, 0) + 1
+            claimed.append(job)
+    return claimed
+
+
+def prepare(job: ExportJob) -> tuple[str, str | None]:
+    """Return ``(digest, html)`` for a job; ``html`` is None if the PDF is already cached."""
+    resume = Resume.objects.get(pk=job.resume_id)
+    digest = pdf_cache.resume_digest(resume, rendering.pdf_template_name(resume), job.base_url)
+    if pdf_cache.get(digest) is not None:
+        return digest, None
+    return digest, rendering.render_pdf_html(resume)
+
+
+def finish(job: ExportJob, digest: str, pdf: bytes | None = None) -> None:
+    if pdf is not None:
+        pdf_cache.store(job.resume_id, digest, pdf)
+    ExportJob.objects.filter(pk=job.pk).update(
+        status=ExportJob.STATUS_DONE, digest=digest, finished_at=timezone.now(),
+    )
+
+
+def fail(job: ExportJob, error) -> None:
+    ExportJob.objects.filter(pk=job.pk).update(
+        status=ExportJob.STATUS_FAILED, error=str(error)[:2000], finished_at=timezone.now(),
+    )
+
+
+def requeue_stale(timeout_seconds: int) -> int:
+    """Put jobs left running by a crashed worker back on the queue."""
+    cutoff = timezone.now() - timedelta(seconds=timeout_seconds)
+    return ExportJob.objects.filter(status=ExportJob.STATUS_RUNNING, started_at__lt=cutoff).update(
+        status=ExportJob.STATUS_QUEUED, started_at=None,
+    )
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return round(values[index], 3)
+
+
+def metrics(sample_size: int = 500) -> dict:
+    """Queue depth by status plus wait/total latency over the most recent finished jobs."""
+    counts = dict(
+        ExportJob.objects.values('status').annotate(n=Count('id')).order_by()
+        .values_list('status', 'n')
+    )
+    recent = (
+        ExportJob.objects.filter(status=ExportJob.STATUS_DONE, started_at__isnull=False)
+        .order_by('-finished_at')
+        .values_list('created_at', 'started_at', 'finished_at')[:sample_size]
+    )
+    wait = [(started - created).total_seconds() for created, started, _ in recent]
+    total = [(finished - created).total_seconds() for created, _, finished in recent]
+    return {
+        'queue_depth': counts.get(ExportJob.STATUS_QUEUED, 0),
+        'running': counts.get(ExportJob.STATUS_RUNNING, 0),
+        'done': counts.get(ExportJob.STATUS_DONE, 0),
+        'failed': counts.get(ExportJob.STATUS_FAILED, 0),
+        'wait_seconds': {'p50': _percentile(wait, 50), 'p95': _percentile(wait, 95)},
+        'latency_seconds': {'p50': _percentile(total, 50), 'p95': _percentile(total, 95)},
+        'sample_size': len(total),
+    }
@@ -0,0 +1,82 @@
+"""
+Resume history as an append-only ``ResumeEvent`` log.
+
+Views call ``record``; earlier events are never rewritten. ``page`` backs the
+newest-first history API with keyset pagination on ``(ts, id)`` (see
+``main.keyset``), and ``manage.py compact_resume_history`` applies the
+retention settings:
+
+* RESUME_HISTORY_COMPACT_WINDOW: a run of the same event by the same user,
+  each within this many seconds of the next, is collapsed to its latest event;
+* RESUME_HISTORY_RETENTION_DAYS: older events are deleted (0 keeps everything);
+* RESUME_HISTORY_MAX_EVENTS: only the newest N events per resume are kept.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from . import keyset
+from .models import ResumeEvent
+
+DELETE_BATCH_SIZE = 500
+
+
+def record(resume, event: str, user=None) -> ResumeEvent:
+    return ResumeEvent.objects.create(resume=resume, event=event, by=user.get_username() if user else '')
+
+
+def page(resume, cursor: str = '', limit: int = 20) -> tuple[list[ResumeEvent], str | None]:
+    """Up to ``limit`` events older than ``cursor``, newest first, plus the cursor for the next page."""
+    return keyset.page(ResumeEvent.objects.filter(resume=resume).only('ts', 'event', 'by'), 'ts', cursor, limit)
+
+
+def _delete_ids(ids: list[int]) -> int:
+    deleted = 0
+    for start in range(0, len(ids), DELETE_BATCH_SIZE):
+        deleted += ResumeEvent.objects.filter(pk__in=ids[start:start + DELETE_BATCH_SIZE]).delete()[0]
+    return deleted
+
+
+def collapse_runs(window_seconds: int) -> int:
+    if window_seconds <= 0:
+        return 0
+    window = timedelta(seconds=window_seconds)
+    redundant, previous = [], None
+    rows = ResumeEvent.objects.order_by('resume_id', 'ts', 'id').values_list('id', 'resume_id', 'event', 'by', 'ts')
+    for row in rows.iterator(chunk_size=2000):
+        if previous and previous[1:4] == row[1:4] and row[4] - previous[4] <= window:
+            redundant.append(previous[0])
+        previous = row
+    return _delete_ids(redundant)
+
+
+def expire(retention_days: int, now=None) -> int:
+    if retention_days <= 0:
+        return 0
+    cutoff = (now or timezone.now()) - timedelta(days=retention_days)
+    return ResumeEvent.objects.filter(ts__lt=cutoff).delete()[0]
+
+
+def trim(max_events: int) -> int:
+    if max_events <= 0:
+        return 0
+    over = (
+        ResumeEvent.objects.values('resume_id').annotate(n=Count('id')).filter(n__gt=max_events)
+        .order_by().values_list('resume_id', flat=True)
+    )
+    deleted = 0
+    for resume_id in over:
+        ids = ResumeEvent.objects.filter(resume_id=resume_id).values_list('id', flat=True)[max_events:]
+        deleted += _delete_ids(list(ids))
+    return deleted
+
+
+def compact(now=None) -> dict:
+    """Apply every retention setting; returns the number of events each step removed."""
+    return {
+        'collapsed': collapse_runs(settings.RESUME_HISTORY_COMPACT_WINDOW),
+        'expired': expire(settings.RESUME_HISTORY_RETENTION_DAYS, now),
+        'trimmed': trim(settings.RESUME_HISTORY_MAX_EVENTS),
+    }
@@ -0,0 +1,82 @@
+"""
+Cache for rendered resume HTML.
+
+Each resume has a token for its own row and one per section (see SECTIONS).
+The model signals in ``main.signals`` replace a token after any row in that
+section is saved or deleted, which orphans every entry built from the old one:
+
+* the whole page, keyed on all of the resume's tokens and the template name;
+* each ``{% resume_fragment %}`` block in the resume templates, keyed on its
+  section's token and the template name.
+
+Editing one experience therefore re-renders the page shell and the experiences
+fragment, while the header, education, skills and projects fragments come from
+the cache. Orphaned entries are never read again and age out of the LRU cache.
+"""
+import secrets
+
+from django.conf import settings
+from django.core.cache import caches
+
+SECTIONS = ('header', 'experiences', 'education', 'skills', 'projects')
+
+
+def _cache():
+    return caches[settings.HTML_CACHE_ALIAS]
+
+
+def _token_key(resume_id: int, name: str) -> str:
+    return f'html:token:{resume_id}:{name}'
+
+
+def tokens(resume_id: int) -> dict:
+    """The current token for the resume row and each section, minting any that are missing."""
+    cache = _cache()
+    keys = {name: _token_key(resume_id, name) for name in ('resume',) + SECTIONS}
+    found = cache.get_many(keys.values())
+    result, missing = {}, {}
+    for name, key in keys.items():
+        if key in found:
+            result[name] = found[key]
+        else:
+            result[name] = missing[key] = secrets.token_hex(8)
+    if missing:
+        cache.set_many(missing, None)
+    return result
+
+
+def bump(resume_id: int, name: str) -> None:
+    """Retire everything cached from the current ``name`` token ('resume' or a section)."""
+    _cache().set(_token_key(resume_id, name), secrets.token_hex(8), None)
+
+
+def page_key(resume_id: int, template_name: str, tokens: dict) -> str:
+    versions = ':'.join(tokens[name] for name in ('resume',) + SECTIONS)
+    return f'html:page:{resume_id}:{template_name}:{versions}'
+
+
+def fragment_key(resume_id: int, template_name: str, name: str, token: str) -> str:
+    return f'html:fragment:{resume_id}:{template_name}:{name}:{token}'
+
+
+def snapshot_key(render_key: str) -> str:
+    # Snapshots never change, so their pages need no tokens; see main.snapshots.
+    return f'html:snapshot:{render_key}'
+
+
+def dashboard_stats_key(user_id: int) -> str:
+    # The dashboard's summary counts; main.signals drops them when one of the user's resumes changes.
+    return f'html:dashboard-stats:{user_id}'
+
+
+def get(key: str):
+    return _cache().get(key)
+
+
+def store(key: str, html: str, timeout: int | None = None) -> str:
+    _cache().set(key, html, timeout)
+    return html
+
+
+def delete(key: str) -> None:
+    _cache().delete(key)
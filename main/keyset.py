@@ -0,0 +1,40 @@
+"""
+Keyset (cursor) pagination over newest-first ``(timestamp, id)`` orderings.
+
+A cursor names the last row of a page as ``<microseconds since epoch>.<id>``;
+the next page is the rows strictly after it. Unlike OFFSET, each page costs
+one index range scan however deep the reader has scrolled, and rows added or
+removed meanwhile never shift later pages.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def encode_cursor(ts: datetime, pk: int) -> str:
+    return f'{(ts - EPOCH) // timedelta(microseconds=1)}.{pk}'
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of ``encode_cursor``; raises ValueError for anything else."""
+    micros, _, pk = cursor.partition('.')
+    return EPOCH + timedelta(microseconds=int(micros)), int(pk)
+
+
+def page(queryset, field: str, cursor: str = '', limit: int = 20) -> tuple[list, str | None]:
+    """
+    Up to ``limit`` rows of ``queryset`` after ``cursor``, plus the cursor for
+    the next page. ``queryset`` must be ordered by ``-<field>, -pk``.
+    """
+    if cursor:
+        ts, pk = decode_cursor(cursor)
+        # The redundant ``<=`` bound gives the database an index range to start from.
+        queryset = queryset.filter(Q(**{f'{field}__lte': ts}), Q(**{f'{field}__lt': ts}) | Q(pk__lt=pk))
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return rows[:limit], next_cursor
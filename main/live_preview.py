@@ -0,0 +1,176 @@
+"""
+Live preview channel for the split builder.
+
+Writers publish a small notification after commit: which sections of a
+resume changed. Every open ``resume_live_preview`` stream subscribed to that
+resume re-renders just those fragments (through the html cache, so several
+viewers share one render) and pushes them to the browser as Server-Sent
+Events.
+
+Where notifications travel is set by ``LIVE_PREVIEW_BROKER``:
+
+* ``InProcessBroker`` (default) delivers within one ASGI process. It is also
+  the stand-in used by the tests.
+* ``CacheBroker`` delivers through the ``LIVE_PREVIEW_CACHE_ALIAS`` cache,
+  which subscribers poll, so it reaches every process and node sharing that
+  cache (e.g. Redis or Memcached). A LocMem cache is per process, so it
+  reaches nothing ``InProcessBroker`` wouldn't; ``main.checks`` warns.
+
+Streams stay open for as long as the builder is, so the endpoint is off
+unless ``LIVE_PREVIEW_ENABLED``, which should only be set under ASGI.
+
+A broker needs ``publish(resume_id, message)``, callable from any thread, and
+``subscribe(resume_id)`` returning an object with ``async get(timeout)``,
+which returns the messages received so far (an empty list on timeout), and
+``close()``.
+"""
+import asyncio
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+RELOAD = 'resume'  # the whole page changed, e.g. a different template
+
+
+class _QueueSubscription:
+    def __init__(self, broker, resume_id):
+        self.broker = broker
+        self.resume_id = resume_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+    async def get(self, timeout: float) -> list[dict]:
+        try:
+            messages = [await asyncio.wait_for(self.queue.get(), timeout)]
+        except asyncio.TimeoutError:
+            return []
+        while not self.queue.empty():
+            messages.append(self.queue.get_nowait())
+        return messages
+
+    def close(self):
+        self.broker._remove(self)
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def publish(self, resume_id, message: dict):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(resume_id, ()))
+        for sub in subscriptions:
+            # Publishers run in sync threads; hand over to the subscriber's event loop.
+            sub.loop.call_soon_threadsafe(sub.queue.put_nowait, message)
+
+    def subscribe(self, resume_id) -> _QueueSubscription:
+        sub = _QueueSubscription(self, resume_id)
+        with self._lock:
+            self._subscriptions.setdefault(resume_id, set()).add(sub)
+        return sub
+
+    def _remove(self, sub):
+        with self._lock:
+            subs = self._subscriptions.get(sub.resume_id, set())
+            subs.discard(sub)
+            if not subs:
+                self._subscriptions.pop(sub.resume_id, None)
+
+
+class _CacheSubscription:
+    def __init__(self, broker, resume_id):
+        self.broker = broker
+        self.resume_id = resume_id
+        # Only messages published from now on.
+        self.seen = broker.cache.get(broker.seq_key(resume_id), 0)
+
+    async def get(self, timeout: float) -> list[dict]:
+        cache, seq_key = self.broker.cache, self.broker.seq_key(self.resume_id)
+        deadline = time.monotonic() + timeout
+        while True:
+            latest = await cache.aget(seq_key, 0)
+            if latest < self.seen:  # the counter expired or was evicted
+                self.seen = latest
+            if latest > self.seen:
+                keys = [self.broker.message_key(self.resume_id, n) for n in range(self.seen + 1, latest + 1)]
+                found = await cache.aget_many(keys)
+                if len(found) < len(keys):
+                    # publish() numbers a message before storing it; give it one poll to land.
+                    await asyncio.sleep(settings.LIVE_PREVIEW_POLL_INTERVAL)
+                    found.update(await cache.aget_many([key for key in keys if key not in found]))
+                self.seen = latest
+                return [found[key] for key in keys if key in found]
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            await asyncio.sleep(min(settings.LIVE_PREVIEW_POLL_INTERVAL, remaining))
+
+    def close(self):
+        pass
+
+
+class CacheBroker:
+    """Numbered messages per resume in a shared cache; subscribers poll the counter."""
+
+    def __init__(self):
+        self.cache = caches[settings.LIVE_PREVIEW_CACHE_ALIAS]
+        # Messages only matter to subscribers that are polling right now.
+        self.timeout = max(60, 10 * settings.LIVE_PREVIEW_POLL_INTERVAL)
+
+    @staticmethod
+    def seq_key(resume_id) -> str:
+        return f'live:seq:{resume_id}'
+
+    @staticmethod
+    def message_key(resume_id, n) -> str:
+        return f'live:msg:{resume_id}:{n}'
+
+    def publish(self, resume_id, message: dict):
+        key = self.seq_key(resume_id)
+        self.cache.add(key, 0, self.timeout)
+        try:
+            n = self.cache.incr(key)
+        except ValueError:  # expired between add() and incr()
+            self.cache.add(key, 0, self.timeout)
+            n = self.cache.incr(key)
+        self.cache.set(self.message_key(resume_id, n), message, self.timeout)
+        self.cache.touch(key, self.timeout)
+
+    def subscribe(self, resume_id) -> _CacheSubscription:
+        return _CacheSubscription(self, resume_id)
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.LIVE_PREVIEW_BROKER)()
+    return _broker
+
+
+@receiver(setting_changed)
+def _reset_broker(setting, **kwargs):
+    global _broker
+    if setting in ('LIVE_PREVIEW_BROKER', 'LIVE_PREVIEW_CACHE_ALIAS', 'CACHES'):
+        _broker = None
+
+
+def publish(resume_id, sections):
+    get_broker().publish(resume_id, {'sections': sorted(set(sections))})
+
+
+def subscribe(resume_id):
+    return get_broker().subscribe(resume_id)
+
+
+def changed_sections(messages) -> set[str]:
+    """Merge a burst of notifications into one set of sections to re-render."""
+    return {name for message in messages for name in message['sections']}
@@ -0,0 +1,256 @@
+"""
+Load-test harness for ``manage.py loadtest``.
+
+Virtual users log in as accounts made by ``manage.py seed_loadtest`` and
+repeat a scenario against a running server, each with its own cookies and
+CSRF token, like a browser. Every request is recorded under its URL name;
+the report gives throughput, latency percentiles and status codes per
+endpoint.
+
+Scenarios are plain functions of a ``VirtualUser``; add one to SCENARIOS to
+make it available on the command line.
+"""
+import io
+import json
+import random
+import re
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from http.cookiejar import CookieJar
+
+from PIL import Image
+
+from .models import Resume
+
+DEFAULT_PREFIX = 'loadtest'
+DEFAULT_PASSWORD = 'loadtest-password'
+
+
+def username(prefix: str, n: int) -> str:
+    return f'{prefix}-{n:05d}'
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Time each endpoint on its own; a redirect is a result, not another request.
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Recorder:
+    """Thread-safe collection of (endpoint, status, seconds) samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, name, status, seconds):
+        with self._lock:
+            self.samples.setdefault(name, []).append((status, seconds))
+
+
+class VirtualUser:
+    def __init__(self, base_url: str, account: str, password: str, recorder: Recorder, rng: random.Random):
+        self.base_url = base_url.rstrip('/')
+        self.account = account
+        self.password = password
+        self.recorder = recorder
+        self.rng = rng
+        self.cookies = CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies), _NoRedirect)
+        self.resume_ids = []
+        self.version = {}
+
+    def csrf_token(self) -> str:
+        return next((c.value for c in self.cookies if c.name == 'csrftoken'), '')
+
+    def request(self, name, path, data=None, json_body=None, files=None, headers=None):
+        """Send one request, record it under ``name`` and return ``(status, body)``."""
+        headers = dict(headers or {})
+        body = None
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            headers.update({'Content-Type': 'application/json', 'X-CSRFToken': self.csrf_token()})
+        elif files is not None:
+            body, content_type = _multipart(data or {}, files)
+            headers.update({'Content-Type': content_type, 'X-CSRFToken': self.csrf_token()})
+        elif data is not None:
+            body = urllib.parse.urlencode({'csrfmiddlewaretoken': self.csrf_token(), **data}).encode()
+            headers.update({'Content-Type': 'application/x-www-form-urlencoded', 'X-CSRFToken': self.csrf_token()})
+        req = urllib.request.Request(self.base_url + path, data=body, headers=headers)
+        start = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=120) as response:
+                status, content = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, content = e.code, e.read()
+        except OSError:
+            status, content = 0, b''  # connection refused, reset or timed out
+        self.recorder.add(name, status, time.perf_counter() - start)
+        return status, content
+
+    def login(self) -> bool:
+        self.request('accounts:login', '/accounts/login/')
+        status, _ = self.request('accounts:login', '/accounts/login/',
+                                 data={'username': self.account, 'password': self.password})
+        if status != 302:
+            return False
+        _, content = self.request('main:dashboard', '/dashboard/')
+        self.resume_ids = sorted({int(pk) for pk in re.findall(rb'/builder/(\d+)/', content)})
+        return bool(self.resume_ids)
+
+    def pick_resume(self) -> int:
+        return self.rng.choice(self.resume_ids)
+
+
+def _multipart(fields: dict, files: dict) -> tuple[bytes, str]:
+    """Encode ``fields`` and ``files`` ({name: (filename, content_type, bytes)}) as multipart/form-data."""
+    boundary = uuid.uuid4().hex
+    out = io.BytesIO()
+    for name, value in fields.items():
+        out.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, content_type, content) in files.items():
+        out.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                  f'Content-Type: {content_type}\r\n\r\n'.encode())
+        out.write(content)
+        out.write(b'\r\n')
+    out.write(f'--{boundary}--\r\n'.encode())
+    return out.getvalue(), f'multipart/form-data; boundary={boundary}'
+
+
+def _sample_image(fmt: str) -> bytes:
+    image = Image.new('RGB', (1240, 1754), (250, 250, 250))
+    image.paste((40, 90, 160), (100, 100, 1140, 300))
+    buf = io.BytesIO()
+    image.save(buf, fmt, resolution=150)
+    return buf.getvalue()
+
+
+_SAMPLE_PNG = _sample_image('PNG')
+_SAMPLE_PDF = _sample_image('PDF')
+
+
+# Scenarios: one iteration each; the runner repeats them until the time is up.
+
+def browse(user: VirtualUser):
+    """A visitor looking around: public pages, the gallery and their own resumes."""
+    user.request('main:home', '/')
+    user.request('main:templates', '/templates/')
+    key = user.rng.choice(Resume.TEMPLATE_CHOICES)[0]
+    user.request('main:preview_template', f'/view/preview/{key}/')
+    user.request('main:dashboard', '/dashboard/')
+    user.request('main:view_resume', f'/view/{user.pick_resume()}/')
+
+
+def editor_session(user: VirtualUser):
+    """Open the builder, type into the header (autosave), add a skill, look at the result."""
+    resume_id = user.pick_resume()
+    _, page = user.request('main:builder_resume', f'/builder/{resume_id}/')
+    found = re.search(rb'version: (\d+)', page)
+    version = int(found.group(1)) if found else user.version.get(resume_id, 0)
+    user.request('main:resume_history', f'/builder/{resume_id}/history/')
+    for word in ('Senior', 'Senior engineer', 'Senior engineer, platform'):
+        status, body = user.request('main:autosave_resume', f'/autosave/{resume_id}/', json_body={
+            'version': version, 'changes': [{'model': 'personal_info', 'data': {'summary': word}}],
+        })
+        if status == 200:
+            version = json.loads(body)['version']
+    status, body = user.request('main:add_skill', f'/add-skill/{resume_id}/',
+                                data={'name': f'Skill {user.rng.randrange(10 ** 6)}', 'level': 'advanced'})
+    if status == 200:
+        version = json.loads(body).get('version', version)
+    user.version[resume_id] = version
+    user.request('main:view_resume', f'/view/{resume_id}/')
+
+
+def export_burst(user: VirtualUser):
+    """Download every resume as a PDF, then all of them as a ZIP."""
+    for resume_id in user.resume_ids:
+        user.request('main:export_resume_pdf', f'/export/{resume_id}/')
+    user.request('main:export_resumes_zip', '/export/all/')
+
+
+def convert_tools(user: VirtualUser):
+    """The converter tools with a one-page document."""
+    user.request('main:tools_convert', '/tools/convert/')
+    user.request('main:tool_image_to_pdf', '/tools/convert/image-to-pdf/',
+                 data={'page_size': 'a4'}, files={'images': ('page.png', 'image/png', _SAMPLE_PNG)})
+    user.request('main:tool_pdf_to_images', '/tools/convert/pdf-to-images/',
+                 data={'format': 'png', 'dpi': '72'}, files={'pdf': ('doc.pdf', 'application/pdf', _SAMPLE_PDF)})
+
+
+SCENARIOS = {
+    'browse': browse,
+    'editor_session': editor_session,
+    'export_burst': export_burst,
+    'convert_tools': convert_tools,
+}
+
+
+def run(base_url: str, scenarios: list[str], users: int, duration: float, accounts: int,
+        prefix: str = DEFAULT_PREFIX, password: str = DEFAULT_PASSWORD,
+        think_time: float = 0.5, ramp_up: float = 0.0, seed: int = 0) -> dict:
+    """
+    Run ``users`` virtual users for ``duration`` seconds and return the report.
+
+    Virtual user ``i`` logs in as seeded account ``i % accounts + 1`` and runs
+    ``scenarios[i % len(scenarios)]`` in a loop, pausing up to ``think_time``
+    seconds (uniformly at random) between iterations.
+    """
+    recorder = Recorder()
+    failed_logins = []
+    start = time.perf_counter()
+    deadline = start + duration
+
+    def virtual_user(i):
+        rng = random.Random(seed * 100003 + i)
+        time.sleep(ramp_up * i / max(users, 1))
+        user = VirtualUser(base_url, username(prefix, i % accounts + 1), password, recorder, rng)
+        if not user.login():
+            failed_logins.append(user.account)
+            return
+        scenario = SCENARIOS[scenarios[i % len(scenarios)]]
+        # At least one iteration, however long logging in took.
+        while True:
+            scenario(user)
+            if time.perf_counter() >= deadline:
+                break
+            time.sleep(rng.uniform(0, think_time))
+
+    threads = [threading.Thread(target=virtual_user, args=(i,), daemon=True) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        'elapsed_s': round(elapsed, 3),
+        'failed_logins': failed_logins,
+        'endpoints': {name: summarize(samples, elapsed) for name, samples in sorted(recorder.samples.items())},
+    }
+
+
+def summarize(samples: list[tuple[int, float]], elapsed: float) -> dict:
+    latencies = sorted(seconds for _, seconds in samples)
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0]
+    statuses = {}
+    for status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'requests': len(samples),
+        'rps': round(len(samples) / elapsed, 2),
+        'p50_ms': round(p50 * 1000, 1),
+        'p95_ms': round(p95 * 1000, 1),
+        'p99_ms': round(p99 * 1000, 1),
+        'max_ms': round(latencies[-1] * 1000, 1),
+        'errors': sum(1 for status, _ in samples if status == 0 or status >= 500),
+        'statuses': statuses,
+    }
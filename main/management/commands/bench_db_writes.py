@@ -0,0 +1,159 @@
+import json
+import platform
+import threading
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from main import rendering, seeding
+from main.models import Resume
+
+from .bench_templates import git_commit, timings
+
+
+def autosave(resume_id: int, skill, n: int) -> None:
+    """What autosave_resume writes for a one-field change: the version claim, then the section row."""
+    with transaction.atomic():
+        Resume.objects.filter(id=resume_id).update(version=F('version'))
+        skill.name = f'Skill {n}'
+        skill.save(update_fields=['name'])
+
+
+def view(resume_id: int) -> None:
+    """What view_resume reads on a cache miss."""
+    rendering.resume_context(Resume.objects.get(id=resume_id))
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure concurrent-write throughput of the active DATABASE_PROFILE: one thread per writer, each '
+        'autosaving its own resume, with optional readers viewing resumes meanwhile. Run it once per profile '
+        '(e.g. DATABASE_PROFILE=sqlite-wal manage.py bench_db_writes) and compare. Each thread holds its own '
+        'connection, so this measures database locking, not web workers; use `manage.py loadtest` for that.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8, help='Concurrent writer threads.')
+        parser.add_argument('--readers', type=int, default=0, help='Concurrent reader threads.')
+        parser.add_argument('--writes', type=int, default=200, help='Writes per writer.')
+        parser.add_argument('--json', dest='json_path', help='Write results as JSON to this file ("-" for stdout).')
+
+    def handle(self, *args, writers, readers, writes, json_path, **options):
+        if writers < 1 or writes < 1 or readers < 0:
+            raise CommandError('--writers and --writes must be at least 1 and --readers at least 0.')
+
+        user = User.objects.create(username=f'bench-{time.time_ns()}')
+        try:
+            resumes = [seeding.create_sample(user, 'modern') for _ in range(writers)]
+            skills = [resume.skills.first() for resume in resumes]
+            # Threads open their own connections, which must see the rows above.
+            connection.close()
+            results = self.run(resumes, skills, readers, writes)
+        finally:
+            User.objects.filter(pk=user.pk).delete()
+
+        db = settings.DATABASES['default']
+        report = {
+            'meta': {
+                'commit': git_commit(),
+                'timestamp': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'platform': platform.platform(),
+                'profile': settings.DATABASE_PROFILE,
+                'vendor': connection.vendor,
+                'conn_max_age': db.get('CONN_MAX_AGE', 0),
+                'pool': bool(db.get('OPTIONS', {}).get('pool')),
+                'writers': writers,
+                'readers': readers,
+                'writes_per_writer': writes,
+            },
+            'results': results,
+        }
+        self.print_summary(report)
+        if json_path == '-':
+            self.stdout.write(json.dumps(report, indent=2))
+        elif json_path:
+            with open(json_path, 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f'Wrote {json_path}')
+
+    def run(self, resumes, skills, readers, writes) -> dict:
+        samples = {'writes': [], 'reads': []}
+        errors = {'writes': [], 'reads': []}
+        done = threading.Event()
+        start = threading.Barrier(len(resumes) + readers + 1)
+
+        def writer(resume, skill):
+            try:
+                start.wait()
+                for n in range(writes):
+                    began = time.perf_counter()
+                    try:
+                        autosave(resume.id, skill, n)
+                    except DatabaseError as e:
+                        errors['writes'].append(str(e))
+                    else:
+                        samples['writes'].append(time.perf_counter() - began)
+            finally:
+                connection.close()
+
+        def reader(n):
+            try:
+                start.wait()
+                while not done.is_set():
+                    began = time.perf_counter()
+                    try:
+                        view(resumes[n % len(resumes)].id)
+                    except DatabaseError as e:
+                        errors['reads'].append(str(e))
+                    else:
+                        samples['reads'].append(time.perf_counter() - began)
+            finally:
+                connection.close()
+
+        write_threads = [threading.Thread(target=writer, args=pair) for pair in zip(resumes, skills)]
+        read_threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+        for thread in write_threads + read_threads:
+            thread.start()
+        start.wait()
+        began = time.perf_counter()
+        for thread in write_threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+        done.set()
+        for thread in read_threads:
+            thread.join()
+
+        results = {'seconds': round(elapsed, 3)}
+        for kind in ('writes', 'reads'):
+            results[kind] = {
+                **(timings(samples[kind]) if samples[kind] else {'runs': 0}),
+                'per_second': round(len(samples[kind]) / elapsed, 1),
+                'errors': len(errors[kind]),
+            }
+        # The distinct messages, e.g. "database is locked".
+        results['error_messages'] = sorted(set(errors['writes'] + errors['reads']))
+        return results
+
+    def print_summary(self, report):
+        meta, results = report['meta'], report['results']
+        self.stdout.write(
+            f"{meta['profile']} ({meta['vendor']}), {meta['writers']} writers x {meta['writes_per_writer']} writes, "
+            f"{meta['readers']} readers, {results['seconds']:.2f}s"
+        )
+        for kind in ('writes', 'reads'):
+            row = results[kind]
+            if row['runs']:
+                self.stdout.write(
+                    f"  {kind + ':':8}{row['per_second']:9.1f}/s  p50 {row['p50_ms']:8.2f} ms  p95 {row['p95_ms']:8.2f} ms"
+                    f"  {row['errors']} failed"
+                )
+        if results['error_messages']:
+            self.stdout.write(self.style.WARNING(f"  errors: {'; '.join(results['error_messages'])}"))
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main import converters, rendering
+
+
+def build_sample_pdf(path: str, page_count: int) -> None:
+    """A multi-page PDF with text and vector shapes, roughly like a scanned handout."""
+    doc = converters.fitz.open()
+    for n in range(page_count):
+        page = doc.new_page()
+        page.insert_text((72, 72), f'Benchmark page {n + 1}', fontsize=24)
+        for row in range(40):
+            page.insert_text((72, 110 + row * 16), 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 2, fontsize=9)
+        for i in range(12):
+            page.draw_circle((100 + i * 35, 760), 14, color=(i / 12, 0.3, 1 - i / 12), fill=(i / 12, 0.6, 0.4))
+    doc.save(path)
+    doc.close()
+
+
+class Command(BaseCommand):
+    help = 'Compare serial and parallel PDF → image rasterization throughput.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=40)
+        parser.add_argument('--dpi', type=int, default=settings.PDF_TO_IMAGES_DEFAULT_DPI)
+        parser.add_argument('--format', default='png', choices=['png', 'jpg'])
+        parser.add_argument('--workers', type=int, default=settings.PDF_RENDER_WORKERS)
+        parser.add_argument('--chunk-size', type=int, default=4)
+        parser.add_argument('--pdf', help='Benchmark an existing PDF instead of a generated sample.')
+
+    def handle(self, *args, pages, dpi, format, workers, chunk_size, pdf, **options):
+        if converters.fitz is None:
+            raise CommandError('PyMuPDF is not installed.')
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = pdf or os.path.join(tmpdir, 'sample.pdf')
+            if not pdf:
+                build_sample_pdf(path, pages)
+            with converters.fitz.open(path) as doc:
+                page_indexes = list(range(doc.page_count))
+
+            start = time.perf_counter()
+            doc = converters.fitz.open(path)
+            serial_bytes = sum(len(data) for _, data in converters.iter_page_images(doc, page_indexes, dpi, format))
+            serial = time.perf_counter() - start
+
+            with rendering.process_pool(workers) as pool:
+                # Warm the pool so process start-up is not counted.
+                list(pool.map(converters.rasterize_pages, [path] * workers, [[0]] * workers, [dpi] * workers, [format] * workers))
+                start = time.perf_counter()
+                parallel_bytes = sum(
+                    len(data) for _, data in converters.iter_page_images_parallel(
+                        path, page_indexes, dpi, format, pool, workers, chunk_size,
+                    )
+                )
+                parallel = time.perf_counter() - start
+
+        if serial_bytes != parallel_bytes:
+            raise CommandError('Serial and parallel runs produced different output.')
+        count = len(page_indexes)
+        self.stdout.write(f'{count} pages at {dpi} DPI as {format.upper()}, {workers} workers, chunk size {chunk_size}')
+        self.stdout.write(f'  serial:   {serial:7.2f}s  {count / serial:7.1f} pages/s')
+        self.stdout.write(f'  parallel: {parallel:7.2f}s  {count / parallel:7.1f} pages/s')
+        self.stdout.write(f'  speedup:  {serial / parallel:7.2f}x')
@@ -0,0 +1,236 @@
+import json
+import math
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import date
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from main import html_cache, rendering, signals, template_registry
+from main.models import Resume, PersonalInfo, Experience, Education, Skill, Project
+
+LOREM = (
+    'Led a cross-functional team to deliver a customer-facing platform, cutting latency by 40% '
+    'and raising conversion. Mentored engineers, ran design reviews and owned the on-call rotation.'
+)
+
+
+def build_resume(user, size: int) -> Resume:
+    """
+    A resume with ``size`` experiences and projects, ``size // 2`` (at least one)
+    education entries and ``2 * size`` skills.
+    """
+    resume = Resume.objects.create(user=user, title=f'Benchmark {size}')
+    PersonalInfo.objects.create(
+        resume=resume, first_name='Alex', last_name='Doe', email='alex@example.com', phone='+1 555 123 4567',
+        city='San Francisco', state='CA', country='USA', linkedin='https://linkedin.com/in/alexdoe',
+        website='https://alex.dev', summary=LOREM,
+    )
+    Experience.objects.bulk_create(
+        Experience(resume=resume, company=f'Company {i}', position='Senior Engineer', location='Remote',
+                   start_date=date(2024 - i, 1, 1), end_date=date(2025 - i, 1, 1), description=LOREM)
+        for i in range(size)
+    )
+    Education.objects.bulk_create(
+        Education(resume=resume, institution=f'University {i}', degree='B.Sc.', field_of_study='Computer Science',
+                  start_date=date(2010 - 4 * i, 9, 1), end_date=date(2014 - 4 * i, 6, 1), gpa='3.80')
+        for i in range(max(1, size // 2))
+    )
+    Skill.objects.bulk_create(Skill(resume=resume, name=f'Skill {i}', level='advanced') for i in range(2 * size))
+    Project.objects.bulk_create(
+        Project(resume=resume, title=f'Project {i}', description=LOREM, technologies='Python, Django, PostgreSQL',
+                url='https://example.com', start_date=date(2024 - i, 3, 1))
+        for i in range(size)
+    )
+    # bulk_create sends no signals: rebuild the render document the views read.
+    signals.sections_changed(resume.id, html_cache.SECTIONS)
+    return Resume.objects.get(pk=resume.pk)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def timings(samples: list[float]) -> dict:
+    return {
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'runs': len(samples),
+    }
+
+
+def reset_peak_rss() -> bool:
+    """Reset the process's peak RSS (Linux only); False if the peak can't be reset."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark HTML and PDF rendering of every resume template over synthetic resumes. '
+        'Data is created in a transaction that is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='2,10,30',
+                            help='Comma-separated resume sizes (experiences/projects per resume).')
+        parser.add_argument('--templates', help='Comma-separated template keys (default: every template with a file).')
+        parser.add_argument('--iterations', type=int, default=20, help='HTML renders per template and size.')
+        parser.add_argument('--pdf-iterations', type=int, default=3, help='PDF renders per template and size.')
+        parser.add_argument('--no-pdf', action='store_true', help='Only benchmark HTML rendering.')
+        parser.add_argument('--base-url', default='http://localhost:8000/')
+        parser.add_argument('--json', dest='json_path', help='Write results as JSON to this file ("-" for stdout).')
+        parser.add_argument('--compare', help='A previous --json file; prints p50 changes against it.')
+
+    def handle(self, *args, sizes, templates, iterations, pdf_iterations, no_pdf, base_url, json_path, compare, **options):
+        try:
+            sizes = [int(s) for s in sizes.split(',')]
+        except ValueError:
+            raise CommandError('--sizes must be comma-separated integers.')
+        registry = template_registry.load()
+        if templates:
+            keys = templates.split(',')
+            unknown = [key for key in keys if key not in registry]
+            if unknown:
+                raise CommandError(f'Unknown template(s): {", ".join(unknown)}')
+        else:
+            keys = [key for key, entry in registry.items() if not entry.is_fallback]
+        if iterations < 1 or pdf_iterations < 1:
+            raise CommandError('--iterations and --pdf-iterations must be at least 1.')
+        pdf = not no_pdf
+        if pdf and rendering.HTML is None:
+            self.stderr.write('WeasyPrint is not available; benchmarking HTML only.')
+            pdf = False
+
+        rss_per_case = reset_peak_rss()
+        results = []
+        with transaction.atomic():
+            user = User.objects.create(username=f'bench-{time.time_ns()}')
+            for size in sizes:
+                resume = build_resume(user, size)
+                for key in keys:
+                    resume.template = key
+                    results.append(self.run_case(resume, key, size, iterations, pdf_iterations if pdf else 0, base_url))
+            transaction.set_rollback(True)
+
+        report = {
+            'meta': {
+                'commit': git_commit(),
+                'timestamp': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'platform': platform.platform(),
+                'iterations': iterations,
+                'pdf_iterations': pdf_iterations if pdf else 0,
+                'sizes': sizes,
+                # Without a resettable peak, RSS is the process-wide high-water mark so far.
+                'peak_rss_scope': 'case' if rss_per_case else 'process',
+            },
+            'results': results,
+        }
+        self.print_table(results)
+        if compare:
+            self.print_comparison(results, compare)
+        if json_path == '-':
+            self.stdout.write(json.dumps(report, indent=2))
+        elif json_path:
+            with open(json_path, 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f'Wrote {json_path}')
+
+    def run_case(self, resume, key, size, iterations, pdf_iterations, base_url) -> dict:
+        reset_peak_rss()
+        # view_resume renders the page template with the page context; cold, without the fragment cache.
+        page = template_registry.for_resume(resume).template
+        context = rendering.page_context(resume, None)
+        html = page.render(context)  # warm-up: first render evaluates the section querysets
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            html = page.render(context)
+            samples.append(time.perf_counter() - start)
+        result = {
+            'template': key,
+            'size': size,
+            'sections': {name: len(context[name]) for name in ('experiences', 'education', 'skills', 'projects')},
+            'html': {**timings(samples), 'bytes': len(html.encode())},
+            'pdf': None,
+        }
+        if pdf_iterations:
+            # export_resume_pdf: render the PDF template, then WeasyPrint, in-process.
+            samples = []
+            for _ in range(pdf_iterations):
+                start = time.perf_counter()
+                data = rendering.write_pdf(rendering.render_pdf_html(resume), base_url)
+                samples.append(time.perf_counter() - start)
+            result['pdf'] = {**timings(samples), 'bytes': len(data)}
+        result['peak_rss_mb'] = peak_rss_mb()
+        return result
+
+    def print_table(self, results):
+        self.stdout.write(f'{"template":<14}{"size":>5}{"html p50":>10}{"html p95":>10}'
+                          f'{"pdf p50":>10}{"pdf p95":>10}{"pdf KB":>9}{"RSS MB":>9}')
+        for r in results:
+            pdf = r['pdf']
+            pdf_cols = (f'{pdf["p50_ms"]:>10.1f}{pdf["p95_ms"]:>10.1f}{pdf["bytes"] / 1024:>9.1f}'
+                        if pdf else f'{"-":>10}{"-":>10}{"-":>9}')
+            self.stdout.write(f'{r["template"]:<14}{r["size"]:>5}{r["html"]["p50_ms"]:>10.2f}'
+                              f'{r["html"]["p95_ms"]:>10.2f}{pdf_cols}{r["peak_rss_mb"]:>9.1f}')
+
+    def print_comparison(self, results, path):
+        try:
+            with open(path) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+        before = {(r['template'], r['size']): r for r in baseline['results']}
+        self.stdout.write(f'\nChange in p50 against {path} (commit {baseline["meta"].get("commit") or "unknown"}):')
+        for r in results:
+            old = before.get((r['template'], r['size']))
+            if old is None:
+                continue
+            line = f'{r["template"]:<14}{r["size"]:>5}  html {self.ratio(r["html"], old["html"])}'
+            if r['pdf'] and old['pdf']:
+                line += f'  pdf {self.ratio(r["pdf"], old["pdf"])}'
+            self.stdout.write(line)
+
+    @staticmethod
+    def ratio(new, old) -> str:
+        if not old['p50_ms']:
+            return 'n/a'
+        return f'{(new["p50_ms"] / old["p50_ms"] - 1) * 100:+6.1f}%'
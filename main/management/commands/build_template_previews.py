@@ -0,0 +1,68 @@
+import os
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from main import converters, previews, rendering, template_registry
+from main.models import Resume
+
+THUMBNAIL_DPI = 40
+
+
+class Command(BaseCommand):
+    help = 'Pre-render the template gallery previews (HTML, PDF, PNG thumbnail). Run before collectstatic.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild every template, changed or not.')
+
+    def handle(self, *args, force, **options):
+        root = settings.TEMPLATE_PREVIEW_DIR
+        os.makedirs(root, exist_ok=True)
+        manifest = previews.load_manifest().copy()
+        if rendering.HTML is None:
+            self.stderr.write('WeasyPrint is not available: building HTML previews only.')
+        elif converters.fitz is None:
+            self.stderr.write('PyMuPDF is not available: skipping PNG thumbnails.')
+
+        built = 0
+        for key, _ in Resume.TEMPLATE_CHOICES:
+            template = template_registry.resolve(key).template
+            digest = previews.artifact_hash(template)
+            entry = manifest.get(key)
+            if not force and entry and entry['hash'] == digest and all(
+                os.path.exists(os.path.join(root, path)) for path in entry['files'].values() if path
+            ):
+                continue
+
+            version_dir = os.path.join(key, digest)
+            os.makedirs(os.path.join(root, version_dir), exist_ok=True)
+            files = {'html': None, 'pdf': None, 'png': None}
+
+            html = template.render(previews.dummy_context(key))
+            files['html'] = self._write(root, version_dir, 'preview.html', html.encode())
+            if rendering.HTML is not None:
+                pdf = rendering.write_pdf(html, str(settings.BASE_DIR))
+                files['pdf'] = self._write(root, version_dir, 'preview.pdf', pdf)
+                if converters.fitz is not None:
+                    with converters.fitz.open(stream=pdf, filetype='pdf') as doc:
+                        png = converters.render_page(doc[0], THUMBNAIL_DPI, 'png')
+                    files['png'] = self._write(root, version_dir, 'thumbnail.png', png)
+
+            if entry and entry['hash'] != digest:
+                shutil.rmtree(os.path.join(root, key, entry['hash']), ignore_errors=True)
+            manifest[key] = {'hash': digest, 'files': files}
+            built += 1
+            self.stdout.write(f'  {key}: {digest}')
+
+        previews.write_manifest(manifest)
+        self.stdout.write(self.style.SUCCESS(
+            f'Built {built} preview(s), {len(Resume.TEMPLATE_CHOICES) - built} unchanged.'
+        ))
+
+    @staticmethod
+    def _write(root: str, version_dir: str, name: str, data: bytes) -> str:
+        path = os.path.join(version_dir, name)
+        with open(os.path.join(root, path), 'wb') as f:
+            f.write(data)
+        return path.replace(os.sep, '/')
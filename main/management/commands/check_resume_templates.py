@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main import template_registry
+
+
+class Command(BaseCommand):
+    help = 'Show which template each Resume.TEMPLATE_CHOICES key renders with.'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--strict', action='store_true', help='Fail if any key falls back to another template.')
+
+    def handle(self, *args, strict, **options):
+        registry = template_registry.build()
+        width = max(len(key) for key in registry)
+        for key, entry in registry.items():
+            line = f'{key:<{width}}  {entry.name}'
+            self.stdout.write(self.style.WARNING(f'{line}  (fallback)') if entry.is_fallback else line)
+        missing = [key for key, entry in registry.items() if entry.is_fallback]
+        if missing and strict:
+            raise CommandError(f'{len(missing)} template choice(s) have no file: {", ".join(missing)}')
+        self.stdout.write(f'{len(registry) - len(missing)} of {len(registry)} template choices have their own file.')
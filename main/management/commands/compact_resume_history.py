@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from main import history
+
+
+class Command(BaseCommand):
+    help = 'Apply the resume history retention settings (collapse, expire, trim). Safe to run from cron.'
+
+    def handle(self, *args, **options):
+        removed = history.compact()
+        self.stdout.write(
+            f"Removed {sum(removed.values())} event(s): {removed['collapsed']} collapsed "
+            f"(window {settings.RESUME_HISTORY_COMPACT_WINDOW}s), {removed['expired']} expired "
+            f"(> {settings.RESUME_HISTORY_RETENTION_DAYS} days), {removed['trimmed']} trimmed "
+            f"(> {settings.RESUME_HISTORY_MAX_EVENTS} per resume)."
+        )
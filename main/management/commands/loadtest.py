@@ -0,0 +1,132 @@
+import json
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from main import loadtest
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=2).close()
+            return
+        except urllib.error.HTTPError:
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f'Server at {url} did not come up within {timeout:.0f}s.')
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive a running server with virtual users and report throughput and latency per endpoint. '
+        'Seed accounts first with `manage.py seed_loadtest`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--scenario', default='editor_session',
+                            help=f'Comma-separated scenarios, spread over the users: {", ".join(loadtest.SCENARIOS)}.')
+        parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users.')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to run.')
+        parser.add_argument('--ramp-up', type=float, default=0, help='Seconds over which users start.')
+        parser.add_argument('--think-time', type=float, default=0.5, help='Maximum pause between iterations.')
+        parser.add_argument('--accounts', type=int, help='Seeded accounts to log in as (default: --users).')
+        parser.add_argument('--prefix', default=loadtest.DEFAULT_PREFIX)
+        parser.add_argument('--password', default=loadtest.DEFAULT_PASSWORD)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for repeatable runs.')
+        parser.add_argument('--spawn-gunicorn', action='store_true',
+                            help='Start gunicorn on a free local port for the run instead of using --base-url.')
+        parser.add_argument('--workers', type=int, default=settings.PDF_RENDER_WORKERS,
+                            help='Gunicorn workers with --spawn-gunicorn.')
+        parser.add_argument('--json', dest='json_path', help='Write the report as JSON to this file ("-" for stdout).')
+        parser.add_argument('--compare', help='A previous --json file; prints p95 changes against it.')
+
+    def handle(self, *args, scenario, spawn_gunicorn, workers, json_path, compare, **options):
+        scenarios = scenario.split(',')
+        unknown = [name for name in scenarios if name not in loadtest.SCENARIOS]
+        if unknown:
+            raise CommandError(f'Unknown scenario(s): {", ".join(unknown)}')
+        if options['users'] < 1 or options['duration'] <= 0:
+            raise CommandError('--users and --duration must be positive.')
+
+        server = None
+        base_url = options['base_url']
+        if spawn_gunicorn:
+            base_url = f'http://127.0.0.1:{free_port()}'
+            server = subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn', 'resumw_project.wsgi:application',
+                 '--bind', base_url.removeprefix('http://'), '--workers', str(workers), '--log-level', 'warning'],
+                cwd=settings.BASE_DIR,
+            )
+        try:
+            wait_until_up(base_url + '/', timeout=30)
+            report = loadtest.run(
+                base_url, scenarios, options['users'], options['duration'], options['accounts'] or options['users'],
+                prefix=options['prefix'], password=options['password'], think_time=options['think_time'],
+                ramp_up=options['ramp_up'], seed=options['seed'],
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+        report['meta'] = {
+            'timestamp': timezone.now().isoformat(),
+            'base_url': base_url,
+            'scenarios': scenarios,
+            'users': options['users'],
+            'duration_s': options['duration'],
+            'think_time_s': options['think_time'],
+            'database': settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1],
+            'gunicorn_workers': workers if spawn_gunicorn else None,
+        }
+        if report['failed_logins']:
+            self.stderr.write(f'{len(report["failed_logins"])} virtual user(s) could not log in, '
+                              f'e.g. {report["failed_logins"][0]}; did you run seed_loadtest?')
+        self.print_table(report)
+        if compare:
+            self.print_comparison(report, compare)
+        if json_path == '-':
+            self.stdout.write(json.dumps(report, indent=2))
+        elif json_path:
+            with open(json_path, 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f'Wrote {json_path}')
+
+    def print_table(self, report):
+        self.stdout.write(f'{"endpoint":<28}{"reqs":>7}{"req/s":>8}{"p50 ms":>9}{"p95 ms":>9}'
+                          f'{"p99 ms":>9}{"errors":>8}  statuses')
+        for name, e in report['endpoints'].items():
+            statuses = ' '.join(f'{code}:{n}' for code, n in sorted(e['statuses'].items()))
+            self.stdout.write(f'{name:<28}{e["requests"]:>7}{e["rps"]:>8.1f}{e["p50_ms"]:>9.1f}{e["p95_ms"]:>9.1f}'
+                              f'{e["p99_ms"]:>9.1f}{e["errors"]:>8}  {statuses}')
+        total = sum(e['requests'] for e in report['endpoints'].values())
+        self.stdout.write(f'{total} requests in {report["elapsed_s"]:.1f}s ({total / report["elapsed_s"]:.1f} req/s)')
+
+    def print_comparison(self, report, path):
+        try:
+            with open(path) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+        self.stdout.write(f'\nChange in p95 against {path}:')
+        for name, e in report['endpoints'].items():
+            old = baseline['endpoints'].get(name)
+            if old and old['p95_ms']:
+                self.stdout.write(f'{name:<28}{(e["p95_ms"] / old["p95_ms"] - 1) * 100:+7.1f}%')
@@ -0,0 +1,83 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from main import export_jobs, rendering
+
+
+class Command(BaseCommand):
+    help = 'Render queued PDF export jobs on a local process pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.PDF_RENDER_WORKERS,
+                            help='Number of WeasyPrint worker processes.')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait between queue polls when idle.')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is drained instead of polling forever.')
+
+    def handle(self, *args, workers, poll_interval, once, **options):
+        if rendering.HTML is None:
+            raise CommandError('WeasyPrint is not available; cannot render PDFs.')
+
+        requeued = export_jobs.requeue_stale(settings.EXPORT_JOB_TIMEOUT)
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale job(s).')
+        self.stdout.write(f'Export worker started with {workers} process(es).')
+
+        pending = {}
+        pool = rendering.process_pool(workers)
+        try:
+            while True:
+                close_old_connections()
+                for job in export_jobs.claim(workers - len(pending)):
+                    try:
+                        digest, html = export_jobs.prepare(job)
+                    except Exception as exc:
+                        export_jobs.fail(job, exc)
+                        continue
+                    if html is None:
+                        export_jobs.finish(job, digest)
+                        continue
+                    try:
+                        pending[pool.submit(rendering.write_pdf, html, job.base_url)] = (job, digest)
+                    except BrokenProcessPool as exc:
+                        export_jobs.fail(job, exc)
+                        pool = self.restart(pool, pending, workers)
+
+                if not pending:
+                    if once:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                done, _ = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    job, digest = pending.pop(future)
+                    try:
+                        export_jobs.finish(job, digest, future.result())
+                    except BrokenProcessPool as exc:
+                        export_jobs.fail(job, exc)
+                        broken = True
+                    except Exception as exc:
+                        export_jobs.fail(job, exc)
+                    else:
+                        self.stdout.write(f'Rendered export job {job.id} for resume {job.resume_id}.')
+                if broken:
+                    pool = self.restart(pool, pending, workers)
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+    def restart(self, pool, pending, workers):
+        """A render process died and broke the pool: fail the jobs it still held and start a new one."""
+        for job, _ in pending.values():
+            export_jobs.fail(job, 'The render process crashed.')
+        pending.clear()
+        pool.shutdown(wait=False, cancel_futures=True)
+        self.stderr.write('A render process crashed; restarting the pool.')
+        return rendering.process_pool(workers)
@@ -0,0 +1,89 @@
+import time
+from datetime import date
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from main import loadtest
+from main.models import Resume, PersonalInfo, Experience, Education, Skill, Project
+
+BATCH_SIZE = 1000
+TEMPLATES = [key for key, _ in Resume.TEMPLATE_CHOICES]
+
+
+class Command(BaseCommand):
+    help = (
+        'Create accounts with resumes for `manage.py loadtest`. Accounts are named '
+        '<prefix>-00001, <prefix>-00002, ... and share one password.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--resumes-per-user', type=int, default=3)
+        parser.add_argument('--size', type=int, default=5, help='Experiences, projects and 2x skills per resume.')
+        parser.add_argument('--prefix', default=loadtest.DEFAULT_PREFIX)
+        parser.add_argument('--password', default=loadtest.DEFAULT_PASSWORD)
+        parser.add_argument('--clear', action='store_true', help='Delete accounts from an earlier run first.')
+
+    def handle(self, *args, users, resumes_per_user, size, prefix, password, clear, **options):
+        if users < 1 or resumes_per_user < 1 or size < 0:
+            raise CommandError('--users and --resumes-per-user must be positive and --size not negative.')
+        existing = User.objects.filter(username__startswith=f'{prefix}-')
+        if clear:
+            deleted, _ = existing.delete()
+            self.stdout.write(f'Deleted {deleted} rows from an earlier run.')
+        elif existing.exists():
+            raise CommandError(f'Accounts named {prefix}-* already exist; pass --clear to replace them.')
+
+        start = time.perf_counter()
+        # Hashing is deliberately slow; every account gets the same hash.
+        hashed = make_password(password)
+        with transaction.atomic():
+            accounts = User.objects.bulk_create(
+                (User(username=loadtest.username(prefix, n), password=hashed, email=f'{prefix}{n}@example.com')
+                 for n in range(1, users + 1)),
+                batch_size=BATCH_SIZE,
+            )
+            # No render documents: each is built from the section rows on first read.
+            resumes = Resume.objects.bulk_create(
+                (Resume(user=user, title=f'Resume {i + 1}', template=TEMPLATES[(n + i) % len(TEMPLATES)],
+                        document=None)
+                 for n, user in enumerate(accounts) for i in range(resumes_per_user)),
+                batch_size=BATCH_SIZE,
+            )
+            self.seed_sections(resumes, size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(accounts)} users and {len(resumes)} resumes in {time.perf_counter() - start:.1f}s '
+            f'(password "{password}").'
+        ))
+
+    def seed_sections(self, resumes, size):
+        PersonalInfo.objects.bulk_create(
+            (PersonalInfo(resume=resume, first_name='Load', last_name=f'Tester {resume.pk}',
+                          email=f'resume{resume.pk}@example.com', city='Springfield',
+                          summary='Engineer with a track record of shipping reliable systems.')
+             for resume in resumes),
+            batch_size=BATCH_SIZE,
+        )
+        Experience.objects.bulk_create(
+            (Experience(resume=resume, company=f'Company {i}', position='Engineer', start_date=date(2024 - i, 1, 1),
+                        end_date=date(2025 - i, 1, 1), description='Built and operated services used by millions.')
+             for resume in resumes for i in range(size)),
+            batch_size=BATCH_SIZE,
+        )
+        Education.objects.bulk_create(
+            (Education(resume=resume, institution='State University', degree='B.Sc.', start_date=date(2012, 9, 1),
+                       end_date=date(2016, 6, 1)) for resume in resumes),
+            batch_size=BATCH_SIZE,
+        )
+        Skill.objects.bulk_create(
+            (Skill(resume=resume, name=f'Skill {i}', level='advanced') for resume in resumes for i in range(2 * size)),
+            batch_size=BATCH_SIZE,
+        )
+        Project.objects.bulk_create(
+            (Project(resume=resume, title=f'Project {i}', description='An open-source tool.',
+                     start_date=date(2024 - i, 3, 1)) for resume in resumes for i in range(size)),
+            batch_size=BATCH_SIZE,
+        )
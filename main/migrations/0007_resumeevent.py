@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:15
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ts', models.DateTimeField(default=django.utils.timezone.now)),
+                ('event', models.CharField(max_length=50)),
+                ('by', models.CharField(blank=True, max_length=150)),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='main.resume')),
+            ],
+            options={
+                'ordering': ['-ts', '-id'],
+                'indexes': [models.Index(fields=['resume', 'ts'], name='main_resume_resume__0b632f_idx')],
+            },
+        ),
+    ]
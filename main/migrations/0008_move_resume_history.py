@@ -0,0 +1,49 @@
+from datetime import timezone as dt_timezone
+
+from django.db import migrations
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+BATCH_SIZE = 1000
+
+
+def move_history(apps, schema_editor):
+    Resume = apps.get_model('main', 'Resume')
+    ResumeEvent = apps.get_model('main', 'ResumeEvent')
+    events = []
+    resumes = Resume.objects.values_list('id', 'history')
+    for resume_id, history in resumes.iterator(chunk_size=BATCH_SIZE):
+        for entry in history or []:
+            ts = parse_datetime(entry.get('ts') or '') or timezone.now()
+            if timezone.is_naive(ts):
+                ts = timezone.make_aware(ts, dt_timezone.utc)
+            events.append(ResumeEvent(
+                resume_id=resume_id, ts=ts,
+                event=str(entry.get('event', ''))[:50], by=str(entry.get('by', ''))[:150],
+            ))
+        if len(events) >= BATCH_SIZE:
+            ResumeEvent.objects.bulk_create(events)
+            events = []
+    ResumeEvent.objects.bulk_create(events)
+
+
+def restore_history(apps, schema_editor):
+    Resume = apps.get_model('main', 'Resume')
+    ResumeEvent = apps.get_model('main', 'ResumeEvent')
+    history = {}
+    for resume_id, ts, event, by in ResumeEvent.objects.order_by('ts', 'id').values_list('resume_id', 'ts', 'event', 'by'):
+        history.setdefault(resume_id, []).append({'ts': ts.isoformat(), 'event': event, 'by': by})
+    for resume_id, entries in history.items():
+        Resume.objects.filter(pk=resume_id).update(history=entries)
+    ResumeEvent.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_resumeevent'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_history, restore_history),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_move_resume_history'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='resume',
+            name='history',
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_resume_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='education',
+            index=models.Index(fields=['resume', '-start_date'], name='main_educat_resume__839950_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['resume', '-start_date'], name='main_experi_resume__98ce6e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['resume', '-start_date'], name='main_projec_resume__c24606_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['user', '-updated_at'], name='main_resume_user_id_52a917_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['resume', 'name'], name='main_skill_resume__ddcf93_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_resume_dashboard_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('label', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('digest', models.CharField(max_length=64)),
+                ('document', models.BinaryField()),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='main.resume')),
+            ],
+            options={
+                'ordering': ['-number'],
+                'constraints': [models.UniqueConstraint(fields=('resume', 'number'), name='main_snapshot_unique_number')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:55
+
+import main.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_resumesnapshot'),
+    ]
+
+    # Existing resumes start NULL and are built on first read (main/documents.py);
+    # only new ones start from the empty document.
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='document',
+            field=models.JSONField(editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='resume',
+            name='document',
+            field=models.JSONField(default=main.models.empty_document, editable=False, null=True),
+        ),
+    ]
@@ -1,5 +1,18 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+# Related names of a resume's section lists.
+SECTION_RELATIONS = ('experiences', 'education', 'skills', 'projects')
+
+class ResumeQuerySet(models.QuerySet):
+    def with_sections(self):
+        """Load personal info via a join and each section list with one extra query."""
+        return self.select_related('personal_info').prefetch_related(*SECTION_RELATIONS)
+
+def empty_document():
+    """The render document of a resume without sections; see main/documents.py."""
+    return {'personal_info': None, 'experiences': [], 'education': [], 'skills': [], 'projects': []}
 
 class Resume(models.Model):
     TEMPLATE_CHOICES = [
@@ -48,16 +61,48 @@ class Resume(models.Model):
     color_bg = models.CharField(max_length=32, blank=True, default='')
     color_text = models.CharField(max_length=32, blank=True, default='')
     font_family = models.CharField(max_length=64, blank=True, default='')
-    # Audit trail
-    history = models.JSONField(default=list, blank=True)
+    # Bumped on every change to the resume or its sections; autosave uses it for optimistic concurrency.
+    version = models.PositiveIntegerField(default=0, editable=False)
+    # Personal info and section rows, denormalized for rendering (main/documents.py). NULL until first built.
+    document = models.JSONField(null=True, default=empty_document, editable=False)
+
+    objects = ResumeQuerySet.as_manager()
     
     def __str__(self):
         return f"{self.title} - {self.get_template_display()}"
+
+    def save(self, *args, **kwargs):
+        # `version` and `document` only change through updates in main.signals; never write back a stale copy.
+        if (not self._state.adding and self.pk is not None and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ('version', 'document')
+            ]
+        super().save(*args, **kwargs)
     
     class Meta:
-        ordering = ['-updated_at']
+        ordering = ['-updated_at', '-id']
+        # The dashboard pages through a user's resumes newest first, keyset-style on (updated_at, id).
+        indexes = [models.Index(fields=['user', '-updated_at', '-id'])]
+
+class ResumeSection(models.Model):
+    """Base for rows that appear in ``Resume.document``."""
+
+    def save(self, *args, **kwargs):
+        # post_save rewrites the resume's document; commit both or neither.
+        with transaction.atomic(using=kwargs.get('using') or router.db_for_write(type(self), instance=self)):
+            super().save(*args, **kwargs)
+
+    def delete(self, using=None, keep_parents=False):
+        # So does post_delete; don't leave the document listing a deleted row.
+        with transaction.atomic(using=using or router.db_for_write(type(self), instance=self)):
+            return super().delete(using=using, keep_parents=keep_parents)
 
-class PersonalInfo(models.Model):
+    class Meta:
+        abstract = True
+
+class PersonalInfo(ResumeSection):
     resume = models.OneToOneField(Resume, on_delete=models.CASCADE, related_name='personal_info')
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
@@ -76,7 +121,7 @@ class PersonalInfo(models.Model):
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
-class Experience(models.Model):
+class Experience(ResumeSection):
     resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='experiences')
     company = models.CharField(max_length=200)
     position = models.CharField(max_length=200)
@@ -91,8 +136,9 @@ class Experience(models.Model):
     
     class Meta:
         ordering = ['-start_date']
+        indexes = [models.Index(fields=['resume', '-start_date'])]
 
-class Education(models.Model):
+class Education(ResumeSection):
     resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='education')
     institution = models.CharField(max_length=200)
     degree = models.CharField(max_length=200)
@@ -109,8 +155,9 @@ class Education(models.Model):
     
     class Meta:
         ordering = ['-start_date']
+        indexes = [models.Index(fields=['resume', '-start_date'])]
 
-class Skill(models.Model):
+class Skill(ResumeSection):
     SKILL_LEVEL_CHOICES = [
         ('beginner', 'Beginner'),
         ('intermediate', 'Intermediate'),
@@ -127,8 +174,9 @@ class Skill(models.Model):
     
     class Meta:
         ordering = ['name']
+        indexes = [models.Index(fields=['resume', 'name'])]
 
-class Project(models.Model):
+class Project(ResumeSection):
     resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='projects')
     title = models.CharField(max_length=200)
     description = models.TextField()
@@ -143,3 +191,66 @@ class Project(models.Model):
     
     class Meta:
         ordering = ['-start_date']
+        indexes = [models.Index(fields=['resume', '-start_date'])]
+
+class ExportJob(models.Model):
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='export_jobs')
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='export_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    base_url = models.CharField(max_length=200, blank=True)
+    digest = models.CharField(max_length=64, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Export of {self.resume_id} ({self.get_status_display()})"
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+class ResumeEvent(models.Model):
+    """Append-only audit trail for a resume; see main/history.py for paging and retention."""
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='events')
+    ts = models.DateTimeField(default=timezone.now)
+    event = models.CharField(max_length=50)
+    # Username at the time of the change, so the trail survives account deletion.
+    by = models.CharField(max_length=150, blank=True)
+
+    def __str__(self):
+        return f"{self.event} on {self.resume_id} at {self.ts:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        ordering = ['-ts', '-id']
+        indexes = [models.Index(fields=['resume', 'ts'])]
+
+class ResumeSnapshot(models.Model):
+    """An immutable saved version of a resume; see main/snapshots.py for the document format."""
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='snapshots')
+    # 1, 2, 3... per resume.
+    number = models.PositiveIntegerField()
+    label = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # SHA-256 of the uncompressed document; doubles as the ETag of everything rendered from it.
+    digest = models.CharField(max_length=64)
+    document = models.BinaryField()
+
+    def __str__(self):
+        return f"Version {self.number} of {self.resume_id}"
+
+    class Meta:
+        ordering = ['-number']
+        constraints = [models.UniqueConstraint(fields=['resume', 'number'], name='main_snapshot_unique_number')]
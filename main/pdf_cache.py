@@ -0,0 +1,61 @@
+"""
+Content-addressed cache for rendered resume PDFs.
+
+Entries are keyed by a SHA-256 digest of everything that ends up in the PDF:
+the resume's own fields (title, template, theme), its render document (every
+related section row, see ``main.documents``) and the template name. A
+per-resume pointer to the latest digest lets the model signals in
+``main.signals`` drop the cached PDF as soon as any of those rows is saved or
+deleted.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import documents
+
+RESUME_FIELDS = (
+    'title', 'template', 'use_custom_theme', 'color_primary', 'color_secondary',
+    'color_accent', 'color_bg', 'color_text', 'font_family',
+)
+
+
+def _cache():
+    return caches[settings.PDF_CACHE_ALIAS]
+
+
+def resume_digest(resume, template_name: str, base_url: str = '') -> str:
+    """Hash the resume, its sections and the template used to render it."""
+    payload = {
+        'template_name': template_name,
+        'base_url': base_url,
+        'resume': {name: getattr(resume, name) for name in RESUME_FIELDS},
+        'document': documents.get(resume),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def get(digest: str):
+    """Return the cached entry ``{'pdf', 'rendered_at'}`` for a digest, or None."""
+    return _cache().get(f'pdf:{digest}')
+
+
+def store(resume_id: int | None, digest: str, pdf: bytes) -> dict:
+    """Cache ``pdf``; with a ``resume_id``, as that resume's current PDF for ``invalidate``."""
+    cache = _cache()
+    entry = {'pdf': pdf, 'rendered_at': time.time()}
+    cache.set(f'pdf:{digest}', entry, None)
+    if resume_id is not None:
+        cache.set(f'pdf:resume:{resume_id}', digest, None)
+    return entry
+
+
+def invalidate(resume_id: int) -> None:
+    cache = _cache()
+    digest = cache.get(f'pdf:resume:{resume_id}')
+    if digest:
+        cache.delete_many([f'pdf:{digest}', f'pdf:resume:{resume_id}'])
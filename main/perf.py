@@ -0,0 +1,272 @@
+"""
+Per-request performance instrumentation.
+
+PerfMiddleware times every request into per-view histograms. A sample of
+requests (PERF_SAMPLE_RATE) is also broken down into spans:
+
+* ``db``: every query, through an execute wrapper on each connection;
+* ``template``: template rendering, through ``main.template_backends``;
+* ``weasyprint``, ``mupdf``, ``pillow``: ``span()`` around those libraries.
+
+Sampled requests get a Server-Timing header and one JSON log line on the
+``main.perf`` logger. Streamed responses (ZIP exports, page images) are timed
+until their last chunk is sent, so their spans include the work done while
+streaming; they get no Server-Timing header, since headers go out first. ``render_metrics()`` serves the histograms in the
+Prometheus text format.
+
+Outside a sampled request, ``span()`` and the query wrapper cost one
+ContextVar lookup. Queries are counted and timed, but their SQL is never
+formatted or stored. Metrics are per process; with several workers, scrape
+each or aggregate them downstream.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger('main.perf')
+
+_current = ContextVar('perf_sample', default=None)
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], buckets: tuple):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, labels: tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self) -> dict:
+        with self._lock:
+            return {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+REQUEST_SECONDS = Histogram(
+    'resume_request_duration_seconds', 'Time to produce a response, by view.',
+    ('view', 'method', 'status'), REQUEST_BUCKETS,
+)
+SPAN_SECONDS = Histogram(
+    'resume_request_span_seconds', 'Time per sampled request spent in each kind of work.',
+    ('view', 'span'), REQUEST_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    'resume_request_db_queries', 'Database queries per sampled request.',
+    ('view',), QUERY_BUCKETS,
+)
+HISTOGRAMS = (REQUEST_SECONDS, SPAN_SECONDS, DB_QUERIES)
+
+
+class Sample:
+    """Span totals for one sampled request: name -> [count, seconds]."""
+
+    __slots__ = ('spans',)
+
+    def __init__(self):
+        self.spans = {}
+
+    def add(self, name: str, seconds: float):
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+
+class span:
+    """``with perf.span('pillow'): ...`` adds the block's time to the current sampled request."""
+
+    __slots__ = ('name', 'sample', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.sample = _current.get()
+        if self.sample is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.sample is not None:
+            self.sample.add(self.name, time.perf_counter() - self.start)
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    sample = _current.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.add('db', time.perf_counter() - start)
+
+
+@receiver(connection_created, dispatch_uid='main.perf.connection_created')
+def install_db_wrapper(sender, connection, **kwargs):
+    # Once per connection object; it stays in place across reconnects.
+    if _db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _db_wrapper)
+
+
+def _sampled_stream(content, end, sample):
+    """Yield ``content`` with ``sample`` current while each chunk is produced, then ``end()``."""
+    iterator = iter(content)
+    try:
+        while True:
+            token = _current.set(sample) if sample is not None else None
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                if token is not None:
+                    _current.reset(token)
+            yield chunk
+    finally:
+        end()
+
+
+class PerfMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        sample, token, start = self._begin()
+        try:
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                _current.reset(token)
+        return self._finish(request, response, sample, start)
+
+    async def __acall__(self, request):
+        sample, token, start = self._begin()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if token is not None:
+                _current.reset(token)
+        return self._finish(request, response, sample, start)
+
+    def _finish(self, request, response, sample, start):
+        if response.streaming and not response.is_async:
+            # The work happens while the body is sent (PDF renders, rasterizing); time it all.
+            response.streaming_content = _sampled_stream(
+                response.streaming_content, lambda: self._end(request, response, sample, start), sample,
+            )
+        else:
+            # Async streams (the live preview) stay open indefinitely: time the first byte.
+            self._end(request, response, sample, start)
+        return response
+
+    @staticmethod
+    def _begin():
+        sample = Sample() if random.random() < settings.PERF_SAMPLE_RATE else None
+        token = _current.set(sample) if sample is not None else None
+        return sample, token, time.perf_counter()
+
+    @staticmethod
+    def _end(request, response, sample, start):
+        elapsed = time.perf_counter() - start
+        match = getattr(request, 'resolver_match', None)
+        # View names, not paths, keep the label set bounded.
+        view = match.view_name if match else 'unmatched'
+        REQUEST_SECONDS.observe((view, request.method, f'{response.status_code // 100}xx'), elapsed)
+        slow = elapsed >= settings.PERF_SLOW_REQUEST_SECONDS
+        if sample is None:
+            if slow:
+                logger.warning(json.dumps({'view': view, 'method': request.method,
+                                           'status': response.status_code, 'ms': round(elapsed * 1000, 1)}))
+            return
+        for name, (_, seconds) in sample.spans.items():
+            SPAN_SECONDS.observe((view, name), seconds)
+        DB_QUERIES.observe((view,), sample.spans.get('db', (0, 0))[0])
+        # A streamed body's headers are long gone by now.
+        if settings.PERF_SERVER_TIMING and not response.streaming:
+            response['Server-Timing'] = server_timing(sample, elapsed)
+        level = logging.WARNING if slow else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps({
+                'view': view, 'method': request.method, 'status': response.status_code,
+                'ms': round(elapsed * 1000, 1),
+                'spans': {name: {'n': n, 'ms': round(s * 1000, 1)} for name, (n, s) in sample.spans.items()},
+            }))
+
+
+def server_timing(sample: Sample, elapsed: float) -> str:
+    metrics = [f'{name};dur={seconds * 1000:.1f};desc="{count}x"' for name, (count, seconds) in sample.spans.items()]
+    metrics.append(f'total;dur={elapsed * 1000:.1f}')
+    return ', '.join(metrics)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values) -> str:
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def render_metrics(gauges: dict | None = None) -> str:
+    """
+    The histograms in the Prometheus text format, followed by ``gauges``:
+    ``{name: (help, value)}`` or ``{name: (help, {labels_tuple_of_pairs: value})}``.
+    """
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += [f'# HELP {histogram.name} {histogram.help}', f'# TYPE {histogram.name} histogram']
+        for values, (counts, total, count) in sorted(histogram.collect().items()):
+            labels = _labels(histogram.labels, values)
+            cumulative = 0
+            for bound, n in zip((*histogram.buckets, '+Inf'), counts):
+                cumulative += n
+                lines.append(f'{histogram.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{histogram.name}_sum{{{labels}}} {total}')
+            lines.append(f'{histogram.name}_count{{{labels}}} {count}')
+    for name, (help, value) in (gauges or {}).items():
+        lines += [f'# HELP {name} {help}', f'# TYPE {name} gauge']
+        if isinstance(value, dict):
+            for pairs, v in value.items():
+                if v is not None:
+                    names, values = zip(*pairs)
+                    lines.append(f'{name}{{{_labels(names, values)}}} {v}')
+        elif value is not None:
+            lines.append(f'{name} {value}')
+    return '\n'.join(lines) + '\n'
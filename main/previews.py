@@ -0,0 +1,111 @@
+"""
+Pre-rendered previews for the template gallery.
+
+``manage.py build_template_previews`` renders every template in
+``Resume.TEMPLATE_CHOICES`` with the sample data below to HTML, PDF and a PNG
+thumbnail under ``<TEMPLATE_PREVIEW_DIR>/<template>/<hash>/``. The hash covers
+the template source and the sample data, so editing one template only
+rebuilds that template's artifacts and the versioned path never serves a
+stale copy. ``manifest.json`` in the same directory maps each template to its
+current artifacts; the gallery links to them and falls back to the live
+``preview_template`` view for anything not built yet.
+"""
+import hashlib
+import json
+import os
+from datetime import date
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.templatetags.static import static
+
+from .models import Resume
+
+# Artifacts live under this prefix inside the static files tree.
+STATIC_PREFIX = 'previews'
+MANIFEST_NAME = 'manifest.json'
+
+SAMPLE_PERSONAL_INFO = SimpleNamespace(
+    first_name='Jamie', last_name='Smith', email='jamie@example.com', phone='+1 555 111 2222',
+    linkedin='https://linkedin.com/in/jamiesmith', website='https://jamie.dev', summary='Creative problem-solver.',
+    address='123 Main St', city='NYC', state='NY', zip_code='10001', country='USA',
+    photo_url='https://placehold.co/140x140',
+)
+SAMPLE_EXPERIENCES = [
+    SimpleNamespace(position='Engineer', company='Acme', location='NY', start_date=date(2022, 1, 1),
+                    end_date=None, current=True, description='Did things.'),
+]
+SAMPLE_EDUCATION = [
+    SimpleNamespace(degree='B.Sc', institution='Uni', field_of_study='CS', location='NY', start_date=date(2017, 9, 1),
+                    end_date=date(2021, 6, 1), current=False, gpa=3.7, description='Honors'),
+]
+SAMPLE_SKILLS = [
+    SimpleNamespace(name='Python', level='advanced', get_level_display='Advanced'),
+    SimpleNamespace(name='Django', level='advanced', get_level_display='Advanced'),
+]
+SAMPLE_PROJECTS = [
+    SimpleNamespace(title='Demo', description='A sample project', technologies='Django', url='', github_url=''),
+]
+
+
+def dummy_context(template_key: str) -> dict:
+    return {
+        'resume': Resume(id=0, title='Sample Resume', template=template_key),
+        'personal_info': SAMPLE_PERSONAL_INFO,
+        'experiences': SAMPLE_EXPERIENCES,
+        'education': SAMPLE_EDUCATION,
+        'skills': SAMPLE_SKILLS,
+        'projects': SAMPLE_PROJECTS,
+        'title': 'Preview ',
+    }
+
+
+def artifact_hash(template) -> str:
+    """Hash of everything a preview is built from: the template file and the sample data."""
+    digest = hashlib.sha256()
+    with open(template.origin.name, 'rb') as f:
+        digest.update(f.read())
+    sample = dummy_context('')
+    del sample['resume']
+    digest.update(json.dumps(sample, sort_keys=True, default=lambda o: getattr(o, '__dict__', str(o))).encode())
+    return digest.hexdigest()[:16]
+
+
+def manifest_path() -> str:
+    return os.path.join(settings.TEMPLATE_PREVIEW_DIR, MANIFEST_NAME)
+
+
+_manifest = (None, {})
+
+
+def load_manifest() -> dict:
+    """The build manifest, re-read only when the file changes."""
+    global _manifest
+    try:
+        mtime = os.stat(manifest_path()).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    if _manifest[0] != mtime:
+        with open(manifest_path()) as f:
+            _manifest = (mtime, json.load(f))
+    return _manifest[1]
+
+
+def write_manifest(manifest: dict) -> None:
+    tmp = manifest_path() + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, manifest_path())
+
+
+def artifact_urls(template_key: str) -> dict | None:
+    """Static URLs ``{'html', 'pdf', 'png'}`` for a built preview, or None if it isn't available."""
+    entry = load_manifest().get(template_key)
+    if not entry:
+        return None
+    try:
+        return {kind: static(f'{STATIC_PREFIX}/{path}') if path else None
+                for kind, path in entry['files'].items()}
+    except ValueError:
+        # Built but not collected yet: the manifest storage has no entry for it.
+        return None
@@ -0,0 +1,190 @@
+"""
+Opt-in sampling profiler for slow views.
+
+Views decorated with ``profile_view`` are profiled when PROFILING_ENABLED is
+on and either a staff user sends the ``X-Profile: 1`` header or the request
+falls in the PROFILING_SAMPLE_RATE fraction. A background thread samples the
+request thread's Python stack every PROFILING_INTERVAL seconds, including
+while a streaming response is being sent, and the result is saved in the
+folded-stack format read by flamegraph.pl, speedscope and inferno. Time in C
+extensions (WeasyPrint's and MuPDF's native code) is attributed to the
+Python frame that called into them.
+
+Profiles go to PROFILE_DIR, capped at PROFILE_MAX_FILES files and
+PROFILE_MAX_BYTES in total, oldest first out. Each profile keeps at most
+PROFILING_MAX_STACKS distinct stacks and stops sampling after
+PROFILING_MAX_SECONDS. The response names its profile in ``X-Profile-Id``;
+staff list and download profiles through the ``profile_list`` and
+``profile_download`` views.
+"""
+import functools
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+HEADER = 'X-Profile'
+TRUNCATED = '[truncated]'
+_NAME_RE = re.compile(r'^\d{8}T\d{6}-[\w-]+-[0-9a-f]{8}\.folded$')
+
+
+class StackSampler(threading.Thread):
+    """Counts the distinct Python stacks of ``thread_id`` until stopped."""
+
+    def __init__(self, thread_id: int, interval: float, max_seconds: float, max_stacks: int):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.max_stacks = max_stacks
+        self.counts = {}
+        self._stopped = threading.Event()
+
+    def run(self):
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stopped.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{frame.f_globals.get("__name__", "?")}:{code.co_qualname}'.replace(';', ':'))
+                frame = frame.f_back
+            key = ';'.join(reversed(stack))
+            if key not in self.counts and len(self.counts) >= self.max_stacks:
+                key = TRUNCATED
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def folded(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in sorted(self.counts.items()))
+
+
+def should_profile(request) -> bool:
+    if not settings.PROFILING_ENABLED:
+        return False
+    if request.headers.get(HEADER) == '1':
+        user = getattr(request, 'user', None)
+        return bool(user and user.is_active and user.is_staff)
+    return random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+def profile_dir() -> str:
+    return str(settings.PROFILE_DIR)
+
+
+def new_name(view_name: str) -> str:
+    return f'{timezone.now():%Y%m%dT%H%M%S}-{view_name}-{secrets.token_hex(4)}.folded'
+
+
+def save(name: str, sampler: StackSampler) -> None:
+    """Write the profile and evict old ones."""
+    os.makedirs(profile_dir(), exist_ok=True)
+    path = os.path.join(profile_dir(), name)
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(sampler.folded())
+    os.replace(tmp, path)
+    evict()
+
+
+def list_profiles() -> list[dict]:
+    """Saved profiles, newest first."""
+    try:
+        names = [name for name in os.listdir(profile_dir()) if _NAME_RE.match(name)]
+    except FileNotFoundError:
+        return []
+    entries = []
+    for name in names:
+        try:
+            st = os.stat(os.path.join(profile_dir(), name))
+        except FileNotFoundError:
+            continue  # evicted meanwhile
+        entries.append({'name': name, 'bytes': st.st_size, 'mtime': st.st_mtime})
+    entries.sort(key=lambda e: e['mtime'], reverse=True)
+    return entries
+
+
+def evict():
+    entries = list_profiles()
+    total = sum(e['bytes'] for e in entries)
+    while entries and (len(entries) > settings.PROFILE_MAX_FILES or total > settings.PROFILE_MAX_BYTES):
+        oldest = entries.pop()
+        total -= oldest['bytes']
+        try:
+            os.remove(os.path.join(profile_dir(), oldest['name']))
+        except FileNotFoundError:
+            pass
+
+
+def path_for(name: str) -> str | None:
+    """The file for a profile name from ``list_profiles()``, or None for anything else."""
+    if not _NAME_RE.match(name):
+        return None
+    path = os.path.join(profile_dir(), name)
+    return path if os.path.exists(path) else None
+
+
+def _finisher(sampler, name):
+    """Stop ``sampler`` and save its profile on the first call; later calls do nothing."""
+    done = False
+
+    def finish():
+        nonlocal done
+        if not done:
+            done = True
+            sampler.stop()
+            save(name, sampler)
+    return finish
+
+
+def _profiled_stream(content, finish):
+    try:
+        yield from content
+    finally:
+        finish()
+
+
+def profile_view(view):
+    """Profile the view, and any streaming response it returns, for requests picked by ``should_profile``."""
+    view_name = view.__name__
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not should_profile(request):
+            return view(request, *args, **kwargs)
+        sampler = StackSampler(
+            threading.get_ident(), settings.PROFILING_INTERVAL,
+            settings.PROFILING_MAX_SECONDS, settings.PROFILING_MAX_STACKS,
+        )
+        name = new_name(view_name)
+        sampler.start()
+        try:
+            response = view(request, *args, **kwargs)
+        except BaseException:
+            sampler.stop()
+            save(name, sampler)
+            raise
+        response[f'{HEADER}-Id'] = name
+        if response.streaming and not response.is_async:
+            # The work happens while the body is sent; keep sampling until it is done. A body
+            # that is never sent (client gone, response replaced) still ends at close().
+            finish = _finisher(sampler, name)
+            response.streaming_content = _profiled_stream(response.streaming_content, finish)
+            response._resource_closers.append(finish)
+        else:
+            sampler.stop()
+            save(name, sampler)
+        return response
+
+    return wrapper
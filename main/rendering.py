@@ -0,0 +1,148 @@
+"""Resume rendering shared by the views and the background PDF workers."""
+import logging
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.template.context import make_context
+
+from . import documents, pdf_cache, perf, template_registry
+from .templatetags.resume_fragments import ResumeFragmentNode
+
+try:
+    from weasyprint import HTML
+except Exception:
+    HTML = None
+
+logger = logging.getLogger(__name__)
+
+
+def resume_context(resume) -> dict:
+    """Everything the resume templates show, from the resume row alone (see main.documents)."""
+    return documents.context(resume)
+
+
+def page_context(resume, tokens: dict) -> dict:
+    """Context for the HTML page: fragments are cached against ``tokens`` (see html_cache)."""
+    return {**resume_context(resume), 'title': resume.title, 'fragment_tokens': tokens}
+
+
+def render_fragments(resume, sections, request=None, tokens: dict | None = None) -> dict[str, str]:
+    """
+    Render only the ``{% resume_fragment %}`` blocks for ``sections`` of the
+    resume's page template, keyed by fragment name.
+
+    Without ``tokens`` the fragments bypass the cache; with them, as in
+    view_resume, read ``tokens`` before loading ``resume``.
+    """
+    template = template_registry.for_resume(resume).template.template
+    context = make_context(page_context(resume, tokens), request)
+    fragments = {}
+    with context.render_context.push_state(template), context.bind_template(template):
+        for node in template.nodelist.get_nodes_by_type(ResumeFragmentNode):
+            if node.section in sections:
+                fragments[node.name] = node.render_fragment(context)
+    return fragments
+
+
+def pdf_template_name(resume) -> str:
+    return template_registry.resolve(resume.template).name
+
+
+def render_pdf_html(resume, request=None) -> str:
+    return template_registry.resolve(resume.template).template.render(resume_context(resume), request)
+
+
+def write_pdf(html_string: str, base_url: str) -> bytes:
+    """Run WeasyPrint; a plain module-level function so process pools can pickle it."""
+    with perf.span('weasyprint'):
+        return HTML(string=html_string, base_url=base_url).write_pdf()
+
+
+def process_pool(max_workers: int | None = None) -> ProcessPoolExecutor:
+    """
+    Process pool for CPU-bound rendering; spawned children never inherit DB connections.
+    Children set Django up before their first task, since unpickling a function
+    from this module imports the models.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers or settings.PDF_RENDER_WORKERS,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=django.setup,
+    )
+
+
+_shared_pool = None
+
+
+def shared_pool() -> ProcessPoolExecutor:
+    """
+    Long-lived pool reused across requests in this process, so requests don't
+    pay for spawning. Sized by PDF_SHARED_POOL_WORKERS, since every web worker
+    process has one.
+    """
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = process_pool(settings.PDF_SHARED_POOL_WORKERS)
+    return _shared_pool
+
+
+def _render_failed(resume, pool, exc) -> None:
+    global _shared_pool
+    logger.error('Rendering the PDF for resume %s failed.', resume.id, exc_info=exc)
+    # A child died (e.g. out of memory); the next request starts a fresh pool.
+    if isinstance(exc, BrokenProcessPool) and _shared_pool is pool:
+        _shared_pool = None
+
+
+def iter_resume_pdfs(resumes, base_url: str, max_in_flight: int | None = None):
+    """
+    Yield ``(resume, pdf_bytes)`` for each resume as soon as its PDF is ready.
+
+    Cached PDFs are yielded immediately; the rest render on the shared process
+    pool with at most ``max_in_flight`` renders outstanding, so memory is bounded
+    by one PDF per worker rather than by the size of the batch. Output order
+    follows completion, not input order. A resume that fails to render is
+    logged and yielded with None, so the rest of the batch still arrives.
+    """
+    max_in_flight = max_in_flight or settings.PDF_SHARED_POOL_WORKERS
+    pool = shared_pool()
+    pending = {}
+    try:
+        for resume in resumes:
+            digest = pdf_cache.resume_digest(resume, pdf_template_name(resume), base_url)
+            entry = pdf_cache.get(digest)
+            if entry is not None:
+                yield resume, entry['pdf']
+                continue
+            try:
+                future = pool.submit(write_pdf, render_pdf_html(resume), base_url)
+            except Exception as exc:
+                _render_failed(resume, pool, exc)
+                yield resume, None
+                continue
+            pending[future] = (resume, digest)
+            while len(pending) >= max_in_flight:
+                yield from _collect(pending, pool)
+        while pending:
+            yield from _collect(pending, pool)
+    finally:
+        # Client went away mid-stream: don't keep rendering for nobody.
+        for future in pending:
+            future.cancel()
+
+
+def _collect(pending: dict, pool):
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        resume, digest = pending.pop(future)
+        try:
+            pdf = future.result()
+        except Exception as exc:
+            _render_failed(resume, pool, exc)
+            yield resume, None
+            continue
+        pdf_cache.store(resume.id, digest, pdf)
+        yield resume, pdf
@@ -0,0 +1,86 @@
+"""
+Read-replica routing.
+
+Views wrapped in ``read_from_replica`` run their reads against one of
+``settings.DATABASE_REPLICAS``, picked once per request so that every read on
+a page sees the same point in the primary's history. Every write, every read inside a transaction
+and every other view use the primary (``default``).
+
+Replicas lag behind the primary, so a browser that just wrote must not read
+from one: ``ReplicaPinMiddleware`` answers every successful non-GET request
+with a cookie that keeps that browser's reads on the primary for
+``REPLICA_PIN_SECONDS``. After an autosave the preview and the next page show
+the save, while everyone else's page views go to the replicas.
+
+The html_cache tokens live in the shared cache and move on the primary's
+commit, so a replica can be behind them: views check ``reading()`` and never
+store what they render from a replica.
+
+Without replicas configured this module does nothing.
+"""
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.deprecation import MiddlewareMixin
+
+# The replica a read_from_replica view reads from while it runs; None elsewhere.
+_replica = ContextVar('replica', default=None)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+def reading() -> bool:
+    """Whether this view's reads may come from a replica, so may be older than the cache tokens."""
+    return _replica.get() is not None
+
+
+def pinned(request) -> bool:
+    """Whether ``request`` comes from a browser that wrote within the last REPLICA_PIN_SECONDS."""
+    return settings.REPLICA_PIN_COOKIE in request.COOKIES
+
+
+def read_from_replica(view):
+    """Route the view's reads to a replica unless the browser is pinned to the primary."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not settings.DATABASE_REPLICAS or pinned(request):
+            return view(request, *args, **kwargs)
+        # Replicas lag by different amounts; mixing them would mix points in time on one page.
+        token = _replica.set(random.choice(settings.DATABASE_REPLICAS))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica.reset(token)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # Reads inside a transaction must see its writes.
+        replica = _replica.get()
+        if replica is not None and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return replica
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Explicit, or saving an instance read from a replica would write to it.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas get the schema from the primary.
+        return False if db in settings.DATABASE_REPLICAS else None
+
+
+class ReplicaPinMiddleware(MiddlewareMixin):
+    def process_response(self, request, response):
+        if settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
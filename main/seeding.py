@@ -0,0 +1,173 @@
+"""
+Sample resumes and resume cloning.
+
+A sample dataset is a plain dict: ``personal_info`` holds PersonalInfo field
+values and ``experiences``, ``education``, ``skills`` and ``projects`` hold
+lists of field values for those sections. SAMPLES maps a template key to its
+dataset; templates without their own use DEFAULT_SAMPLE, and most datasets
+only override the sections that set them apart.
+
+A resume document is a dataset plus a ``resume`` entry holding the resume's
+own fields; ``document`` reads one from a resume's render document (see
+``main.documents``) without touching the section tables. ``create`` writes a
+resume and every section from one with one ``bulk_create`` per table inside
+a single transaction, so its query count does not depend on how many rows a
+section has; ``create_sample`` and ``clone`` are built on it.
+``bulk_create`` sends no ``post_save``; that is fine here because the rows
+belong to a resume that did not exist before the transaction, which starts
+at a fresh cache token and version and is given its render document directly.
+"""
+from datetime import date
+
+from django.db import transaction
+
+from . import documents
+from .models import Resume, PersonalInfo
+
+DEFAULT_SAMPLE = {
+    'personal_info': {
+        'first_name': 'Alex', 'last_name': 'Doe', 'email': 'alex@example.com', 'phone': '+1 555 123 4567',
+        'linkedin': 'https://linkedin.com/in/alexdoe', 'website': 'https://alex.dev',
+        'summary': 'Results-driven professional with 5+ years building impactful products.',
+        'city': 'San Francisco', 'state': 'CA', 'country': 'USA',
+        'photo_url': 'https://avatars.githubusercontent.com/u/9919?s=200&v=4',
+    },
+    'experiences': [
+        {'company': 'TechCorp', 'position': 'Senior Developer', 'location': 'Remote', 'start_date': date(2021, 1, 1),
+         'current': True, 'description': 'Built scalable services, mentored engineers, led delivery.'},
+    ],
+    'education': [
+        {'institution': 'State University', 'degree': 'B.Sc. Computer Science', 'field_of_study': 'Computer Science',
+         'start_date': date(2015, 9, 1), 'end_date': date(2019, 6, 1), 'gpa': 3.8},
+    ],
+    'skills': [{'name': name} for name in ('Python', 'Django', 'PostgreSQL', 'Docker', 'AWS', 'Git', 'REST APIs')],
+    'projects': [
+        {'title': 'Project Atlas', 'technologies': 'Django, DRF, React',
+         'description': 'Platform for analytics with dashboards and APIs.',
+         'github_url': 'https://github.com/example/project'},
+    ],
+}
+
+_ACADEMIC = {
+    **DEFAULT_SAMPLE,
+    'personal_info': {
+        **DEFAULT_SAMPLE['personal_info'],
+        'summary': 'Researcher in distributed systems with publications on consensus and replication.',
+    },
+    'experiences': [
+        {'company': 'State University', 'position': 'Postdoctoral Researcher', 'location': 'Boston, MA',
+         'start_date': date(2022, 9, 1), 'current': True,
+         'description': 'Lead a group studying geo-replicated storage; teach the graduate systems seminar.'},
+        {'company': 'Systems Lab', 'position': 'Research Assistant', 'location': 'Boston, MA',
+         'start_date': date(2018, 9, 1), 'end_date': date(2022, 8, 1),
+         'description': 'Designed and evaluated a low-latency consensus protocol.'},
+    ],
+    'education': [
+        {'institution': 'State University', 'degree': 'Ph.D.', 'field_of_study': 'Computer Science',
+         'start_date': date(2017, 9, 1), 'end_date': date(2022, 6, 1),
+         'description': 'Thesis: Fast agreement in wide-area networks.'},
+        *DEFAULT_SAMPLE['education'],
+    ],
+}
+
+_GRADUATE = {
+    **DEFAULT_SAMPLE,
+    'personal_info': {
+        **DEFAULT_SAMPLE['personal_info'],
+        'summary': 'Recent computer science graduate looking for a first role in backend development.',
+    },
+    'experiences': [
+        {'company': 'TechCorp', 'position': 'Software Engineering Intern', 'location': 'Remote',
+         'start_date': date(2024, 6, 1), 'end_date': date(2024, 9, 1),
+         'description': 'Added pagination and caching to an internal reporting API.'},
+    ],
+    'education': [
+        {'institution': 'State University', 'degree': 'B.Sc. Computer Science', 'field_of_study': 'Computer Science',
+         'start_date': date(2021, 9, 1), 'end_date': date(2025, 6, 1), 'gpa': 3.9},
+    ],
+    'projects': [
+        {'title': 'Campus Eats', 'technologies': 'Django, HTMX',
+         'description': 'Ordering app for campus food trucks, used by 2,000 students.',
+         'github_url': 'https://github.com/example/campus-eats'},
+        *DEFAULT_SAMPLE['projects'],
+    ],
+}
+
+_EXECUTIVE = {
+    **DEFAULT_SAMPLE,
+    'personal_info': {
+        **DEFAULT_SAMPLE['personal_info'],
+        'summary': 'Engineering leader who has grown teams from 10 to 120 while shipping on schedule.',
+    },
+    'experiences': [
+        {'company': 'TechCorp', 'position': 'VP of Engineering', 'location': 'San Francisco, CA',
+         'start_date': date(2020, 3, 1), 'current': True,
+         'description': 'Run a 120-person organization across platform, product and data engineering.'},
+        {'company': 'Startup Inc', 'position': 'Director of Engineering', 'location': 'San Francisco, CA',
+         'start_date': date(2015, 5, 1), 'end_date': date(2020, 2, 1),
+         'description': 'Built the engineering team through Series C; owned delivery and hiring.'},
+    ],
+    'skills': [{'name': name, 'level': 'expert'} for name in
+               ('Engineering Management', 'Hiring', 'Budgeting', 'Roadmapping', 'Architecture')],
+    'projects': [],
+}
+
+SAMPLES = {
+    'academic': _ACADEMIC,
+    'graduate': _GRADUATE,
+    'junior': _GRADUATE,
+    'executive': _EXECUTIVE,
+    'senior': _EXECUTIVE,
+    'corporate': _EXECUTIVE,
+}
+
+
+def sample_for(template_key: str) -> dict:
+    return SAMPLES.get(template_key, DEFAULT_SAMPLE)
+
+
+def document(resume: Resume) -> dict:
+    """``resume``'s render document (see ``main.documents``) plus a ``resume`` entry with its own fields."""
+    return {
+        'resume': documents.field_values(resume, exclude=('user', 'created_at', 'updated_at', 'version', 'document')),
+        **documents.get(resume),
+    }
+
+
+@transaction.atomic
+def create(user_id: int, doc: dict) -> Resume:
+    """A new resume owned by ``user_id`` from a resume document."""
+    personal_info = PersonalInfo(**doc['personal_info']) if doc.get('personal_info') is not None else None
+    sections = {name: [model(**row) for row in doc.get(name) or ()] for name, model in documents.SECTIONS.items()}
+    # bulk_create sends no signals, so the render document is written up front.
+    render_document = documents.jsonable({
+        'personal_info': documents.row(personal_info) if personal_info else None,
+        **{name: [documents.row(obj) for obj in objs] for name, objs in sections.items()},
+    })
+    resume = Resume.objects.create(user_id=user_id, document=render_document, **doc['resume'])
+    if personal_info is not None:
+        personal_info.resume = resume
+        PersonalInfo.objects.bulk_create([personal_info])
+    for name, objs in sections.items():
+        for obj in objs:
+            obj.resume = resume
+        if objs:
+            documents.SECTIONS[name].objects.bulk_create(objs)
+    return resume
+
+
+def create_sample(user, template_key: str) -> Resume:
+    """A new resume for ``user`` filled with the sample dataset for ``template_key``."""
+    resume_fields = {'title': f'My {template_key.title()} Resume', 'template': template_key}
+    return create(user.pk, {**sample_for(template_key), 'resume': resume_fields})
+
+
+def copy_title(title: str, suffix: str = 'copy') -> str:
+    return f'{title} ({suffix})'[:Resume._meta.get_field('title').max_length]
+
+
+def clone(resume: Resume, user=None, title: str | None = None) -> Resume:
+    """Copy ``resume`` (see ``document``) and all its sections for ``user``, by default its owner."""
+    doc = document(resume)
+    doc['resume']['title'] = title or copy_title(resume.title)
+    return create(user.pk if user else resume.user_id, doc)
@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import documents, html_cache, live_preview, pdf_cache
+from .models import Resume, PersonalInfo, Experience, Education, Skill, Project
+
+# Section model -> the html_cache section its rows are rendered in.
+SECTION_MODELS = {
+    PersonalInfo: 'header',
+    Experience: 'experiences',
+    Education: 'education',
+    Skill: 'skills',
+    Project: 'projects',
+}
+
+
+def _bump_version(resume_id):
+    Resume.objects.filter(pk=resume_id).update(version=F('version') + 1)
+
+
+def _bump_html_token(resume_id, name):
+    # After commit, so a concurrent reader can't cache old rows under the new token.
+    transaction.on_commit(lambda: html_cache.bump(resume_id, name))
+
+
+def _drop_dashboard_stats(user_id):
+    # After commit, like the tokens, so a concurrent dashboard can't cache the old counts.
+    transaction.on_commit(lambda: html_cache.delete(html_cache.dashboard_stats_key(user_id)))
+
+
+def _publish_live(resume_id, sections):
+    # Registered after the token bumps, so subscribers render against the new tokens.
+    transaction.on_commit(lambda: live_preview.publish(resume_id, sections))
+
+
+@receiver(post_save, sender=Resume, dispatch_uid='main.resume_saved')
+@receiver(post_delete, sender=Resume, dispatch_uid='main.resume_deleted')
+def resume_changed(sender, instance, signal, **kwargs):
+    pdf_cache.invalidate(instance.pk)
+    _bump_html_token(instance.pk, 'resume')
+    _drop_dashboard_stats(instance.user_id)
+    if signal is post_save:
+        _bump_version(instance.pk)
+        _publish_live(instance.pk, [live_preview.RELOAD])
+
+
+def sections_changed(resume_id, sections):
+    """
+    Bump the version, update the render document and invalidate caches; also
+    called after bulk writes, which send no signals.
+    """
+    sections = set(sections)
+    pdf_cache.invalidate(resume_id)
+    with transaction.atomic():
+        documents.refresh(resume_id, sections)
+    for name in sections:
+        _bump_html_token(resume_id, name)
+    if sections:
+        _publish_live(resume_id, sections)
+
+
+def section_changed(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Resume):
+        return  # deleted along with its resume, whose own signal covers it
+    sections_changed(instance.resume_id, [SECTION_MODELS[sender]])
+
+
+for _model in SECTION_MODELS:
+    post_save.connect(section_changed, sender=_model, dispatch_uid=f'main.{_model.__name__}_saved')
+    post_delete.connect(section_changed, sender=_model, dispatch_uid=f'main.{_model.__name__}_deleted')
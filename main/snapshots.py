@@ -0,0 +1,90 @@
+"""
+Saved resume versions as immutable, compressed snapshots.
+
+``take`` stores a resume and all its sections as one resume document (see
+``main.seeding``), JSON-encoded and zlib-compressed, in a ``ResumeSnapshot``
+row. Snapshots are never updated, so anything rendered from one is keyed by
+the SHA-256 of its document and never goes stale:
+
+* ``context`` rebuilds the template context from the document alone, as
+  unsaved model instances; viewing or exporting a version never reads the
+  section tables;
+* ``create_variant`` turns a snapshot into a new resume with one bulk insert
+  per table (``seeding.create``).
+
+Documents store field values by name. Fields the models have since lost are
+ignored and new fields take their defaults, so old snapshots keep loading
+after migrations.
+"""
+import hashlib
+import json
+import zlib
+
+from django.db import transaction
+
+from . import documents, seeding, template_registry
+from .models import Resume, PersonalInfo, ResumeSnapshot
+
+
+def encode(doc: dict) -> tuple[bytes, str]:
+    """The compressed document and the digest of its canonical JSON."""
+    raw = json.dumps(doc, sort_keys=True, separators=(',', ':'), default=str).encode()
+    return zlib.compress(raw, 9), hashlib.sha256(raw).hexdigest()
+
+
+def _values(model, row: dict) -> dict:
+    fields = {f.attname: f for f in model._meta.concrete_fields}
+    return {name: fields[name].to_python(value) for name, value in row.items() if name in fields}
+
+
+def decode(snapshot: ResumeSnapshot) -> dict:
+    """The snapshot's resume document with Python values (dates, decimals) restored."""
+    doc = json.loads(zlib.decompress(snapshot.document))
+    personal_info = doc.get('personal_info')
+    return {
+        'resume': _values(Resume, doc['resume']),
+        'personal_info': _values(PersonalInfo, personal_info) if personal_info is not None else None,
+        **{name: [_values(model, row) for row in doc.get(name, [])] for name, model in documents.SECTIONS.items()},
+    }
+
+
+@transaction.atomic
+def take(resume: Resume, label: str = '') -> tuple[ResumeSnapshot, bool]:
+    """
+    Snapshot ``resume`` from its render document. Returns the latest snapshot
+    instead, with False, if nothing changed since.
+    """
+    blob, digest = encode(seeding.document(resume))
+    latest = resume.snapshots.defer('document').first()
+    if latest is not None and latest.digest == digest:
+        return latest, False
+    snapshot = ResumeSnapshot.objects.create(
+        resume=resume, number=latest.number + 1 if latest else 1, label=label, digest=digest, document=blob,
+    )
+    return snapshot, True
+
+
+def template_for(doc: dict) -> template_registry.ResumeTemplate:
+    return template_registry.resolve(doc['resume'].get('template', ''))
+
+
+def page_template_for(doc: dict) -> template_registry.ResumeTemplate:
+    """What ``view_resume`` renders the snapshotted resume with, custom theme included."""
+    return template_registry.for_resume(Resume(**doc['resume']))
+
+
+def context(snapshot: ResumeSnapshot, doc: dict) -> dict:
+    """Template context for rendering ``doc``, decoded from ``snapshot``, like ``rendering.resume_context``."""
+    resume = Resume(id=snapshot.resume_id, **doc['resume'])
+    return {**documents.context(resume, doc), 'title': resume.title}
+
+
+def render_key(snapshot: ResumeSnapshot, template_name: str, *extra: str) -> str:
+    """Digest of what a rendering depends on: the document, the template and e.g. the base URL."""
+    return hashlib.sha256(':'.join((snapshot.digest, template_name) + extra).encode()).hexdigest()
+
+
+def create_variant(snapshot: ResumeSnapshot, user, title: str | None = None) -> Resume:
+    doc = decode(snapshot)
+    doc['resume']['title'] = title or seeding.copy_title(doc['resume'].get('title', ''), f'v{snapshot.number}')
+    return seeding.create(user.pk, doc)
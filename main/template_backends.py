@@ -0,0 +1,24 @@
+from django.template.backends.django import DjangoTemplates, Template
+
+from . import perf
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        with perf.span('template'):
+            return super().render(context, request)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend with rendering timed as the ``template`` span
+    (see main.perf). Covers ``render()``, ``render_to_string()`` and
+    templates fetched with ``get_template()``; includes count towards the
+    template that includes them.
+    """
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return InstrumentedTemplate(super().get_template(template_name).template, self)
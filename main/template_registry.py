@@ -0,0 +1,83 @@
+"""
+Resume template registry.
+
+Maps every key in ``Resume.TEMPLATE_CHOICES`` to a compiled Template, built
+once at startup. Keys without a template file resolve to FALLBACK_KEY up
+front, so rendering never searches the loaders or handles
+TemplateDoesNotExist at request time. ``manage.py check`` warns about those
+keys (see ``main.checks``); ``manage.py check_resume_templates`` lists the
+full mapping.
+"""
+from typing import NamedTuple
+
+from django.dispatch import receiver
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.utils.autoreload import file_changed
+
+from .models import Resume
+
+FALLBACK_KEY = 'modern'
+CUSTOM_THEME_KEY = 'custom'
+
+
+class ResumeTemplate(NamedTuple):
+    key: str
+    name: str  # the template actually rendered, e.g. the fallback's
+    template: object
+    is_fallback: bool
+
+
+def template_path(key: str) -> str:
+    return f'main/resume_templates/{key}.html'
+
+
+def build() -> dict[str, ResumeTemplate]:
+    fallback = get_template(template_path(FALLBACK_KEY))
+    registry = {}
+    for key, _ in Resume.TEMPLATE_CHOICES:
+        try:
+            template, is_fallback = get_template(template_path(key)), False
+        except TemplateDoesNotExist:
+            template, is_fallback = fallback, True
+        registry[key] = ResumeTemplate(key, template.template.name, template, is_fallback)
+    return registry
+
+
+_registry = None
+
+
+def load() -> dict[str, ResumeTemplate]:
+    global _registry
+    if _registry is None:
+        _registry = build()
+    return _registry
+
+
+def reset() -> None:
+    global _registry
+    _registry = None
+
+
+def resolve(key: str) -> ResumeTemplate:
+    """The entry for ``key``; unknown keys get the fallback template."""
+    registry = load()
+    return registry.get(key) or registry[FALLBACK_KEY]
+
+
+def for_resume(resume) -> ResumeTemplate:
+    """What ``view_resume`` renders: the custom-theme template overrides the chosen layout."""
+    if resume.use_custom_theme:
+        return resolve(CUSTOM_THEME_KEY)
+    return resolve(resume.template)
+
+
+def missing_keys() -> list[str]:
+    return [key for key, entry in load().items() if entry.is_fallback]
+
+
+@receiver(file_changed, dispatch_uid='main.template_registry_reset')
+def _template_file_changed(sender, file_path, **kwargs):
+    # runserver reloads templates without restarting; drop the compiled ones with them.
+    if file_path.suffix == '.html':
+        reset()
@@ -0,0 +1,53 @@
+from django import template
+
+from .. import html_cache
+
+register = template.Library()
+
+
+class ResumeFragmentNode(template.Node):
+    def __init__(self, nodelist, section, part):
+        self.nodelist = nodelist
+        self.section = section
+        self.name = f'{section}:{part}' if part else section
+
+    def render_fragment(self, context):
+        """The fragment's HTML without markers, from the cache when the context carries tokens."""
+        tokens = context.get('fragment_tokens')
+        if tokens is None:
+            return self.nodelist.render(context)
+        key = html_cache.fragment_key(context['resume'].pk, context.template.name, self.name, tokens[self.section])
+        html = html_cache.get(key)
+        if html is None:
+            html = html_cache.store(key, self.nodelist.render(context))
+        return html
+
+    def render(self, context):
+        # Only view_resume passes tokens; PDF exports and previews render straight through.
+        if context.get('fragment_tokens') is None:
+            return self.nodelist.render(context)
+        # Comment markers let the editor swap a single fragment without touching layout or CSS.
+        return f'<!--fragment:{self.name}-->{self.render_fragment(context)}<!--/fragment:{self.name}-->'
+
+
+@register.tag
+def resume_fragment(parser, token):
+    """
+    Cache the enclosed markup as one section of the resume::
+
+        {% resume_fragment 'experiences' %}...{% endresume_fragment %}
+
+    A second name marks a further piece of the same section placed elsewhere
+    in the layout, e.g. ``{% resume_fragment 'header' 'summary' %}``.
+    """
+    bits = token.split_contents()
+    if len(bits) not in (2, 3) or any(b[0] not in '\'"' or b[0] != b[-1] for b in bits[1:]):
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' takes a quoted section name and an optional quoted part name"
+        )
+    section, part = bits[1][1:-1], (bits[2][1:-1] if len(bits) == 3 else '')
+    if section not in html_cache.SECTIONS:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' section must be one of {', '.join(html_cache.SECTIONS)}")
+    nodelist = parser.parse(('endresume_fragment',))
+    parser.delete_first_token()
+    return ResumeFragmentNode(nodelist, section, part)
@@ -1,3 +1,1149 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections, router, transaction
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+
+from . import checks, converters, documents, export_jobs, history, html_cache, live_preview, loadtest, pdf_cache, perf, previews, profiling, rendering, replicas, seeding, template_registry, views
+from .models import Resume, PersonalInfo, Experience, Education, Skill, Project, ResumeEvent, ExportJob
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'pdf': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-pdf'},
+    'html': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-html'},
+}
+TEST_STORAGES = {
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+def make_resume(user, sections=2, title='Test Resume', **kwargs):
+    resume = Resume.objects.create(user=user, title=title, **kwargs)
+    PersonalInfo.objects.create(resume=resume, first_name='Ada', last_name='Lovelace', email='ada@example.com')
+    for i in range(sections):
+        Experience.objects.create(resume=resume, company=f'Co {i}', position='Engineer',
+                                  start_date=date(2020, 1, i + 1), description='Work')
+        Education.objects.create(resume=resume, institution=f'Uni {i}', degree='BSc', start_date=date(2015, 1, i + 1))
+        Skill.objects.create(resume=resume, name=f'Skill {i}')
+        Project.objects.create(resume=resume, title=f'Project {i}', description='Demo')
+    return resume
+
+
+def make_pdf(pages=3) -> bytes:
+    doc = converters.fitz.open()
+    for n in range(pages):
+        doc.new_page().insert_text((72, 72), f'Page {n + 1}', fontsize=24)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class ResumeViewQueryCountTests(TestCase):
+    """Resume pages must issue a fixed number of queries, whatever the section sizes."""
+
+    # Session and user lookups made by the auth middleware on every request.
+    AUTH_QUERIES = 2
+
+    def setUp(self):
+        caches['html'].clear()
+        self.user = User.objects.create_user('ada', password='secret')
+        self.client.force_login(self.user)
+
+    def assertViewQueries(self, url, expected):
+        for sections in (1, 5):
+            resume = make_resume(self.user, sections=sections)
+            with self.assertNumQueries(self.AUTH_QUERIES + expected):
+                response = self.client.get(url.format(id=resume.id))
+            self.assertIn(response.status_code, (200, 302))
+
+    def test_view_resume(self):
+        # The resume row alone: sections come from its render document.
+        self.assertViewQueries('/view/{id}/', 1)
+
+    def test_edit_resume(self):
+        self.assertViewQueries('/edit/{id}/', 5)
+
+    def test_builder_resume(self):
+        self.assertViewQueries('/builder/{id}/', 5)
+
+    def test_export_resume_pdf(self):
+        with mock.patch.object(rendering, 'HTML', object()), \
+                mock.patch.object(rendering, 'write_pdf', return_value=b'%PDF-1.7'):
+            self.assertViewQueries('/export/{id}/', 1)
+
+    def test_invalid_settings_post_reuses_the_bound_resume(self):
+        for url in ('/edit/{id}/', '/builder/{id}/'):
+            resume = make_resume(self.user, sections=3)
+            with self.subTest(url=url), self.assertNumQueries(self.AUTH_QUERIES + 5):
+                response = self.client.post(url.format(id=resume.id), {'title': '', 'template': 'modern'})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.context['form'].errors)
+            self.assertEqual(len(response.context['experiences']), 3)
+
+    def test_suggestions_use_prefetched_sections(self):
+        resume = Resume.objects.create(user=self.user, title='Empty', template='developer')
+        response = self.client.get(f'/edit/{resume.id}/')
+        self.assertContains(response, 'Add at least one work experience')
+        self.assertContains(response, 'Showcase 1-2 projects')
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class ResumeHtmlCacheTests(TestCase):
+    def setUp(self):
+        caches['html'].clear()
+        self.user = User.objects.create_user('ada', password='secret')
+        self.client.force_login(self.user)
+        self.resume = make_resume(self.user)
+        self.url = f'/view/{self.resume.id}/'
+
+    def test_repeat_view_is_served_from_cache(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(ResumeViewQueryCountTests.AUTH_QUERIES + 1):
+            second = self.client.get(self.url)
+        self.assertEqual(first.content, second.content)
+
+    def test_section_edit_rerenders_only_that_fragment(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(resume=self.resume, name='Analytical Engines')
+        with mock.patch.object(html_cache, 'store', wraps=html_cache.store) as store:
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Analytical Engines')
+        stored = [call.args[0] for call in store.call_args_list]
+        self.assertEqual(len(stored), 2)
+        self.assertTrue(stored[0].startswith(f'html:fragment:{self.resume.id}:main/resume_templates/modern.html:skills:'))
+        self.assertTrue(stored[1].startswith(f'html:page:{self.resume.id}:'))
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class PdfCacheTests(TestCase):
+    def setUp(self):
+        caches['pdf'].clear()
+        self.user = User.objects.create_user('ada', password='secret')
+        self.client.force_login(self.user)
+        self.resume = make_resume(self.user)
+        self.url = f'/export/{self.resume.id}/'
+        for patcher in (mock.patch.object(rendering, 'HTML', object()),
+                        mock.patch.object(rendering, 'write_pdf', return_value=b'%PDF-')):
+            self.write_pdf = patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_repeat_download_is_served_from_cache(self):
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+        self.assertEqual(second.content, b'%PDF-')
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.write_pdf.assert_called_once()
+
+    def test_matching_etag_gets_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_section_save_invalidates(self):
+        etag = self.client.get(self.url)['ETag']
+        skill = self.resume.skills.first()
+        skill.name = 'Analytical Engines'
+        skill.save()
+        self.assertIsNone(pdf_cache.get(etag.strip('"')))
+        response = self.client.get(self.url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.write_pdf.call_count, 2)
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES,
+                   EXPORT_MAX_PENDING_JOBS_PER_USER=2, EXPORT_MAX_RUNNING_JOBS_PER_USER=1)
+class ExportQueueTests(TestCase):
+    def setUp(self):
+        self.ada = User.objects.create_user('ada', password='secret')
+        self.bob = User.objects.create_user('bob', password='secret')
+
+    def enqueue(self, user) -> ExportJob:
+        return export_jobs.enqueue(user, make_resume(user, sections=0), 'http://testserver/')
+
+    def test_enqueue_reuses_active_job_and_limits_pending(self):
+        job = self.enqueue(self.ada)
+        self.assertEqual(export_jobs.enqueue(self.ada, job.resume, 'http://testserver/'), job)
+        self.enqueue(self.ada)
+        with self.assertRaises(export_jobs.QueueFull):
+            self.enqueue(self.ada)
+
+    def test_enqueue_locks_the_user_row(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.enqueue(self.ada)
+        lock = next(q['sql'] for q in queries if 'FROM "auth_user"' in q['sql'])
+        if connection.features.has_select_for_update:
+            self.assertIn('FOR UPDATE', lock)
+
+    def test_worker_survives_a_crashed_render_process(self):
+        crashed, survivor = self.enqueue(self.ada), self.enqueue(self.bob)
+
+        class BrokenPool:
+            def submit(self, *args):
+                future = Future()
+                future.set_exception(BrokenProcessPool('A child process terminated abruptly.'))
+                return future
+
+            def shutdown(self, **kwargs):
+                pass
+
+        pool = ThreadPoolExecutor(1)
+        self.addCleanup(pool.shutdown)
+        err = io.StringIO()
+        with mock.patch.object(rendering, 'HTML', object()), \
+                mock.patch.object(rendering, 'write_pdf', return_value=b'%PDF-'), \
+                mock.patch.object(rendering, 'process_pool', side_effect=[BrokenPool(), pool]):
+            call_command('run_export_worker', workers=1, once=True, poll_interval=0.01, stdout=io.StringIO(), stderr=err)
+        crashed.refresh_from_db()
+        survivor.refresh_from_db()
+        self.assertEqual(crashed.status, ExportJob.STATUS_FAILED)
+        self.assertIn('terminated abruptly', crashed.error)
+        self.assertEqual(survivor.status, ExportJob.STATUS_DONE)
+        self.assertIn('restarting the pool', err.getvalue())
+
+    def test_claim_limits_running_jobs_per_user(self):
+        ada_jobs = [self.enqueue(self.ada), self.enqueue(self.ada)]
+        bob_job = self.enqueue(self.bob)
+        claimed = export_jobs.claim(3)
+        # Ada's second job waits behind her first; Bob's is not starved by it.
+        self.assertEqual(claimed, [ada_jobs[0], bob_job])
+        self.assertEqual(export_jobs.claim(3), [])
+        export_jobs.finish(ada_jobs[0], 'digest')
+        self.assertEqual(export_jobs.claim(3), [ada_jobs[1]])
+
+    def test_requeue_stale_jobs(self):
+        stale, fresh = self.enqueue(self.ada), self.enqueue(self.bob)
+        export_jobs.claim(2)
+        ExportJob.objects.filter(pk=stale.pk).update(started_at=timezone.now() - timedelta(seconds=600))
+        self.assertEqual(export_jobs.requeue_stale(300), 1)
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual((stale.status, stale.started_at), (ExportJob.STATUS_QUEUED, None))
+        self.assertEqual(fresh.status, ExportJob.STATUS_RUNNING)
+
+    def test_metrics(self):
+        done, failed = self.enqueue(self.ada), self.enqueue(self.bob)
+        self.enqueue(self.ada)
+        export_jobs.claim(2)
+        created = timezone.now() - timedelta(seconds=10)
+        ExportJob.objects.filter(pk=done.pk).update(created_at=created, started_at=created + timedelta(seconds=4))
+        export_jobs.finish(ExportJob.objects.get(pk=done.pk), 'digest')
+        export_jobs.fail(failed, RuntimeError('boom'))
+        metrics = export_jobs.metrics()
+        self.assertEqual({k: metrics[k] for k in ('queue_depth', 'running', 'done', 'failed', 'sample_size')},
+                         {'queue_depth': 1, 'running': 0, 'done': 1, 'failed': 1, 'sample_size': 1})
+        self.assertEqual(metrics['wait_seconds'], {'p50': 4.0, 'p95': 4.0})
+        self.assertGreaterEqual(metrics['latency_seconds']['p50'], 10)
+
+    def test_async_export_view(self):
+        self.client.force_login(self.ada)
+        resumes = [make_resume(self.ada, sections=0) for _ in range(3)]
+        for resume in resumes[:2]:
+            response = self.client.post(f'/export/{resume.id}/async/')
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response.json()['status'], 'success')
+        response = self.client.post(f'/export/{resumes[2].id}/async/')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['status'], 'error')
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class TemplateRegistryTests(TestCase):
+    def test_missing_template_resolves_to_fallback_without_loader_lookup(self):
+        user = User.objects.create_user('ada', password='secret')
+        self.client.force_login(user)
+        resume = make_resume(user, template='neon')
+        self.assertTrue(template_registry.resolve('neon').is_fallback)
+        with mock.patch('main.template_registry.get_template') as get_template:
+            response = self.client.get(f'/view/{resume.id}/')
+        self.assertEqual(response.status_code, 200)
+        get_template.assert_not_called()
+        self.assertEqual(rendering.pdf_template_name(resume), 'main/resume_templates/modern.html')
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class ResumeHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ada', password='secret')
+        self.client.force_login(self.user)
+        self.resume = Resume.objects.create(user=self.user, title='History')
+
+    def test_api_pages_newest_first(self):
+        now = timezone.now()
+        for i in range(5):
+            ResumeEvent.objects.create(resume=self.resume, event=f'e{i}', by='ada', ts=now + timedelta(minutes=i))
+        url, seen = f'/builder/{self.resume.id}/history/?limit=2', []
+        while url:
+            data = self.client.get(url).json()
+            seen += [e['event'] for e in data['events']]
+            url = data['next']
+        self.assertEqual(seen, ['e4', 'e3', 'e2', 'e1', 'e0'])
+        self.assertEqual(self.client.get(f'/builder/{self.resume.id}/history/?cursor=bad').status_code, 400)
+
+    @override_settings(RESUME_HISTORY_COMPACT_WINDOW=600, RESUME_HISTORY_RETENTION_DAYS=30, RESUME_HISTORY_MAX_EVENTS=2)
+    def test_compact(self):
+        now = timezone.now()
+        for minutes in (0, 5, 8, 30, 60):
+            ResumeEvent.objects.create(resume=self.resume, event='updated_settings', by='ada', ts=now - timedelta(minutes=minutes))
+        ResumeEvent.objects.create(resume=self.resume, event='updated_settings', by='ada', ts=now - timedelta(days=40))
+        removed = history.compact(now)
+        self.assertEqual(removed, {'collapsed': 2, 'expired': 1, 'trimmed': 1})
+        self.assertEqual(list(self.resume.events.values_list('ts', flat=True)), [now, now - timedelta(minutes=30)])
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class DashboardTests(TestCase):
+    def setUp(self):
+        caches['html'].clear()
+        self.user = User.objects.create_user('ada', password='secret')
+        self.client.force_login(self.user)
+
+    def make_resumes(self, n):
+        resumes = [Resume.objects.create(user=self.user, title=f'R{i}') for i in range(n)]
+        # Ties on updated_at are broken by id.
+        Resume.objects.filter(pk__in=[r.pk for r in resumes[:3]]).update(updated_at=timezone.now() - timedelta(days=1))
+        return resumes
+
+    def test_json_pages_cover_every_resume_once(self):
+        resumes = self.make_resumes(7)
+        url, seen = '/dashboard/resumes/?limit=2', []
+        while url:
+            data = self.client.get(url).json()
+            seen += [r['id'] for r in data['resumes']]
+            self.assertTrue(all(f'/builder/{r["id"]}/' in r['html'] for r in data['resumes']))
+            url = data['next']
+        self.assertEqual(seen, [r.id for r in Resume.objects.filter(user=self.user)])
+        self.assertEqual(sorted(seen), sorted(r.id for r in resumes))
+        self.assertEqual(self.client.get('/dashboard/resumes/?cursor=bad').status_code, 400)
+
+    @override_settings(DASHBOARD_PAGE_SIZE=3)
+    def test_page_queries_do_not_grow_with_resume_count(self):
+        # One page query and one aggregate, loading only the card columns.
+        for n in (4, 20):
+            with self.captureOnCommitCallbacks(execute=True):
+                Resume.objects.filter(user=self.user).delete()
+                self.make_resumes(n)
+            with CaptureQueriesContext(connection) as queries, \
+                    self.assertNumQueries(ResumeViewQueryCountTests.AUTH_QUERIES + 2):
+                response = self.client.get('/dashboard/')
+            self.assertEqual(len(response.context['resumes']), 3)
+            self.assertEqual(response.context['stats']['total'], n)
+            self.assertNotIn('color_primary', queries[-2]['sql'])
+            self.assertContains(response, 'id="more-resumes" data-next="/dashboard/resumes/?cursor=')
+
+    def test_profile_does_not_load_documents(self):
+        self.make_resumes(2)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/accounts/profile/')
+        self.assertContains(response, 'R1')
+        self.assertFalse(any('"document"' in q['sql'] for q in queries))
+
+    def test_stats_are_cached_until_a_resume_changes(self):
+        resumes = self.make_resumes(2)
+        self.client.get('/dashboard/')
+        with self.assertNumQueries(ResumeViewQueryCountTests.AUTH_QUERIES + 1):
+            response = self.client.get('/dashboard/')
+        self.assertEqual(response.context['stats'], {'total': 2, 'templates': 1})
+        with self.captureOnCommitCallbacks(execute=True):
+            resumes[0].template = 'classic'
+            resumes[0].save()
+        self.assertEqual(self.client.get('/dashboard/').context['stats'], {'total': 2, 'templates': 2})
+        with self.captureOnCommitCallbacks(execute=True):
+            resumes[1].delete()
+        self.assertEqual(self.client.get('/dashboard/').context['stats'], {'total': 1, 'templates': 1})
+
+
+
+class SeedingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ada', password='secret')
+        self.client.force_login(self.user)
+
+    def section_rows(self, resume):
+        return [
+            sorted(tuple(documents.field_values(row, exclude=('resume',)).values()) for row in getattr(resume, name).all())
+            for name in documents.SECTIONS
+        ]
+
+    def test_sample_queries_do_not_depend_on_dataset(self):
+        for key in ('modern', 'academic', 'executive'):
+            # Savepoint, resume insert, version bump, one insert per non-empty table, release.
+            tables = 1 + sum(1 for name in documents.SECTIONS if seeding.sample_for(key)[name])
+            with self.assertNumQueries(ResumeViewQueryCountTests.AUTH_QUERIES + 4 + tables):
+                response = self.client.get(f'/create/sample/{key}/')
+            resume = Resume.objects.get(id=int(response.url.strip('/').split('/')[-1]))
+            self.assertEqual(resume.skills.count(), len(seeding.sample_for(key)['skills']))
+
+    def test_clone_copies_every_section_in_constant_queries(self):
+        for sections in (1, 5):
+            original = make_resume(self.user, sections=sections, template='classic')
+            # The resume with its render document, then a savepoint around the resume insert,
+            # its version bump and one insert for personal info and each section.
+            with self.assertNumQueries(ResumeViewQueryCountTests.AUTH_QUERIES + 10):
+                response = self.client.post(f'/clone/{original.id}/')
+            copy = Resume.objects.get(id=int(response.url.strip('/').split('/')[-1]))
+            self.assertEqual((copy.title, copy.template, copy.user), ('Test Resume (copy)', 'classic', self.user))
+            self.assertEqual(copy.personal_info.first_name, 'Ada')
+            self.assertEqual(self.section_rows(copy), self.section_rows(original))
+        other = User.objects.create_user('bob', password='secret')
+        self.assertEqual(self.client.post(f'/clone/{make_resume(other).id}/').status_code, 404)
+
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class RenderDocumentTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ada', password='secret')
+        self.resume = make_resume(self.user, sections=2)
+
+    def document(self):
+        return Resume.objects.get(pk=self.resume.pk).document
+
+    def test_section_writes_update_only_their_section(self):
+        skill = self.resume.skills.first()
+        skill.name = 'Analytical Engines'
+        with CaptureQueriesContext(connection) as queries:
+            skill.save()
+        self.assertFalse(any('main_experience' in q['sql'] for q in queries))
+        self.assertEqual([s['name'] for s in self.document()['skills']], ['Analytical Engines', 'Skill 1'])
+        self.resume.experiences.get(company='Co 1').delete()
+        doc = self.document()
+        self.assertEqual([e['company'] for e in doc['experiences']], ['Co 0'])
+        self.assertEqual(doc['experiences'][0]['start_date'], '2020-01-01')
+        self.assertEqual(doc['personal_info']['first_name'], 'Ada')
+
+    def test_missing_document_is_built_on_first_read(self):
+        Resume.objects.filter(pk=self.resume.pk).update(document=None)
+        Skill.objects.create(resume=self.resume, name='Analytical Engines')
+        self.assertIsNone(self.document())
+        context = rendering.resume_context(Resume.objects.get(pk=self.resume.pk))
+        self.assertEqual(context['experiences'][0].start_date, date(2020, 1, 2))
+        self.assertEqual(len(self.document()['skills']), 3)
+
+    def test_section_delete_rolls_back_with_its_document_update(self):
+        skill = self.resume.skills.first()
+        with mock.patch.object(documents, 'refresh', side_effect=RuntimeError('boom')), self.assertRaises(RuntimeError):
+            skill.delete()
+        self.assertTrue(Skill.objects.filter(pk=skill.pk).exists())
+        self.assertEqual(len(self.document()['skills']), 2)
+
+    def test_stale_copy_does_not_overwrite_document(self):
+        stale = Resume.objects.get(pk=self.resume.pk)
+        Skill.objects.create(resume=self.resume, name='Analytical Engines')
+        stale.title = 'Renamed'
+        stale.save()
+        self.assertEqual(len(self.document()['skills']), 3)
+
+    def test_saving_a_copy_inserts_every_field(self):
+        copy = Resume.objects.get(pk=self.resume.pk)
+        copy.pk = None
+        copy.save()
+        self.assertEqual(Resume.objects.get(pk=copy.pk).document, self.document())
+        forced = Resume(pk=copy.pk + 1, user=self.user, title='Forced', document=self.document())
+        forced._state.adding = False
+        forced.save(force_insert=True)
+        self.assertEqual(Resume.objects.get(pk=forced.pk).document, self.document())
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class SnapshotTests(TestCase):
+    def setUp(self):
+        caches['html'].clear()
+        caches['pdf'].clear()
+        self.user = User.objects.create_user('ada', password='secret')
+        self.client.force_login(self.user)
+        self.resume = make_resume(self.user, sections=3)
+        self.url = f'/builder/{self.resume.id}/versions/'
+
+    def save_version(self, label=''):
+        return self.client.post(self.url, {'label': label})
+
+    def test_save_skips_unchanged_content(self):
+        self.assertEqual(self.save_version('first').status_code, 201)
+        self.assertEqual(self.save_version().json()['created'], False)
+        Skill.objects.create(resume=self.resume, name='Analytical Engines')
+        self.assertEqual(self.save_version().json()['snapshot']['number'], 2)
+        self.assertEqual([s['number'] for s in self.client.get(self.url).json()['snapshots']], [2, 1])
+        snapshot = self.resume.snapshots.get(number=1)
+        self.assertEqual(snapshot.label, 'first')
+        self.assertLess(len(snapshot.document), len(json.dumps(seeding.document(Resume.objects.get(pk=self.resume.pk)), default=str)))
+
+    def test_view_renders_from_snapshot_only(self):
+        self.save_version()
+        Skill.objects.create(resume=self.resume, name='Analytical Engines')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/view/{self.resume.id}/versions/1/')
+        self.assertContains(response, 'Skill 2')
+        self.assertNotContains(response, 'Analytical Engines')
+        self.assertEqual(len(queries), ResumeViewQueryCountTests.AUTH_QUERIES + 1)
+        self.assertFalse(any(table in q['sql'] for q in queries for table in ('main_skill', 'main_experience')))
+        self.assertIn('immutable', response['Cache-Control'])
+        repeat = self.client.get(f'/view/{self.resume.id}/versions/1/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+
+    def test_view_uses_the_live_pages_template(self):
+        Resume.objects.filter(pk=self.resume.pk).update(template='classic', use_custom_theme=True, color_primary='#123456')
+        self.save_version()
+        live = self.client.get(f'/view/{self.resume.id}/')
+        saved = self.client.get(f'/view/{self.resume.id}/versions/1/')
+        self.assertEqual(live.templates[0].name, template_registry.resolve(template_registry.CUSTOM_THEME_KEY).name)
+        self.assertEqual(saved.templates[0].name, live.templates[0].name)
+        self.assertContains(saved, '#123456')
+
+    def test_export_is_cached_per_snapshot(self):
+        self.save_version()
+        with mock.patch.object(rendering, 'HTML', object()), \
+                mock.patch.object(rendering, 'write_pdf', return_value=b'%PDF-1.7') as write_pdf:
+            first = self.client.get(f'/export/{self.resume.id}/versions/1/')
+            Skill.objects.create(resume=self.resume, name='Analytical Engines')
+            second = self.client.get(f'/export/{self.resume.id}/versions/1/')
+        self.assertEqual(write_pdf.call_count, 1)
+        self.assertEqual((first.content, first['ETag']), (second.content, second['ETag']))
+        self.assertNotIn('Analytical Engines', write_pdf.call_args.args[0])
+
+    def test_variant_copies_snapshot_in_constant_queries(self):
+        self.save_version()
+        Skill.objects.create(resume=self.resume, name='Analytical Engines')
+        # The snapshot, then a savepoint around the resume insert, its version bump and five bulk inserts.
+        with self.assertNumQueries(ResumeViewQueryCountTests.AUTH_QUERIES + 10):
+            response = self.client.post(f'/builder/{self.resume.id}/versions/1/variant/')
+        variant = Resume.objects.exclude(pk=self.resume.pk).get()
+        self.assertRedirects(response, f'/edit/{variant.id}/', fetch_redirect_response=False)
+        self.assertEqual(variant.title, 'Test Resume (v1)')
+        self.assertEqual(variant.skills.count(), 3)
+        self.assertEqual(variant.personal_info.first_name, 'Ada')
+        other = User.objects.create_user('bob', password='secret')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(f'/view/{self.resume.id}/versions/1/').status_code, 404)
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class BatchSectionsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ada', password='secret')
+        self.client.force_login(self.user)
+        self.resume = make_resume(self.user, sections=1)
+        self.url = f'/batch/{self.resume.id}/'
+
+    def post(self, operations):
+        return self.client.post(self.url, {'operations': operations}, content_type='application/json')
+
+    def test_mixed_batch(self):
+        experience = self.resume.experiences.get()
+        project = self.resume.projects.get()
+        response = self.post([
+            {'op': 'create', 'model': 'skill', 'data': {'name': f'New {i}', 'level': 'advanced'}} for i in range(10)
+        ] + [
+            {'op': 'update', 'model': 'experience', 'id': experience.id, 'data': {'company': 'Analytical Co'}},
+            {'op': 'update', 'model': 'personal_info', 'data': {'first_name': 'Augusta'}},
+            {'op': 'delete', 'model': 'project', 'id': project.id},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        new_ids = [r['id'] for r in results[:10]]
+        self.assertCountEqual(new_ids, self.resume.skills.filter(name__startswith='New ').values_list('id', flat=True))
+        experience.refresh_from_db()
+        self.assertEqual((experience.company, experience.position), ('Analytical Co', 'Engineer'))
+        self.assertEqual(PersonalInfo.objects.get(resume=self.resume).first_name, 'Augusta')
+        self.assertFalse(self.resume.projects.exists())
+
+    def test_invalid_operation_rejects_whole_batch(self):
+        response = self.post([
+            {'op': 'create', 'model': 'skill', 'data': {'name': 'Kept?', 'level': 'advanced'}},
+            {'op': 'create', 'model': 'skill', 'data': {'level': 'advanced'}},
+            {'op': 'delete', 'model': 'project', 'id': 999999},
+        ])
+        self.assertEqual(response.status_code, 400)
+        statuses = [r['status'] for r in response.json()['results']]
+        self.assertEqual(statuses, ['success', 'error', 'error'])
+        self.assertFalse(self.resume.skills.filter(name='Kept?').exists())
+
+    def test_row_changed_twice_rejects_batch(self):
+        skill = self.resume.skills.get()
+        for second in ({'op': 'delete', 'model': 'skill', 'id': skill.id},
+                       {'op': 'update', 'model': 'skill', 'id': skill.id, 'data': {'name': 'Second'}}):
+            with self.subTest(second=second['op']):
+                response = self.post([{'op': 'update', 'model': 'skill', 'id': skill.id, 'data': {'name': 'First'}}, second])
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(f'skill {skill.id} is already changed', response.json()['message'])
+        self.assertEqual(Skill.objects.get(pk=skill.pk).name, 'Skill 0')
+
+    def test_deletes_refresh_the_document_once(self):
+        Skill.objects.bulk_create([Skill(resume=self.resume, name=f'Extra {i}') for i in range(4)])
+        ids = list(self.resume.skills.values_list('id', flat=True))
+        with mock.patch.object(documents, 'refresh', wraps=documents.refresh) as refresh:
+            response = self.post([{'op': 'delete', 'model': 'skill', 'id': pk} for pk in ids] + [
+                {'op': 'delete', 'model': 'project', 'id': self.resume.projects.get().id},
+            ])
+        self.assertEqual(response.status_code, 200)
+        refresh.assert_called_once()
+        self.assertEqual(set(refresh.call_args.args[1]), {'skills', 'projects'})
+        document = Resume.objects.get(pk=self.resume.pk).document
+        self.assertEqual((document['skills'], document['projects']), ([], []))
+        self.assertFalse(self.resume.skills.exists())
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class AutosaveTests(TestCase):
+    def setUp(self):
+        caches['html'].clear()
+        self.user = User.objects.create_user('ada', password='secret')
+        self.client.force_login(self.user)
+        self.resume = make_resume(self.user, sections=1)
+        self.resume.refresh_from_db()
+        self.url = f'/autosave/{self.resume.id}/'
+
+    def post(self, version, changes):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.url, {'version': version, 'changes': changes}, content_type='application/json')
+
+    def test_patch_returns_changed_fragments(self):
+        self.client.get(f'/view/{self.resume.id}/')
+        response = self.post(self.resume.version, [{'model': 'personal_info', 'data': {'first_name': 'Augusta'}}])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['version'], self.resume.version + 1)
+        self.assertEqual(data['version'], Resume.objects.get(pk=self.resume.pk).version)
+        self.assertEqual(set(data['fragments']), {'header'})
+        self.assertIn('Augusta', data['fragments']['header'])
+        # Fields left out of the patch keep their values.
+        self.assertEqual(PersonalInfo.objects.get(resume=self.resume).last_name, 'Lovelace')
+
+    def test_cleared_checkbox_is_saved(self):
+        # autosave.js sends checkboxes as booleans, so unchecking one arrives as false.
+        experience = self.resume.experiences.get()
+        Experience.objects.filter(pk=experience.pk).update(current=True)
+        response = self.post(self.resume.version, [{'model': 'experience', 'id': experience.id, 'data': {'current': False}}])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Experience.objects.get(pk=experience.pk).current)
+
+    def test_stale_version_conflicts(self):
+        first = self.post(self.resume.version, [{'model': 'personal_info', 'data': {'first_name': 'Augusta'}}])
+        response = self.post(self.resume.version, [{'model': 'personal_info', 'data': {'first_name': 'Ada'}}])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['version'], first.json()['version'])
+        self.assertEqual(PersonalInfo.objects.get(resume=self.resume).first_name, 'Augusta')
+
+
+@skipUnless('replica' in settings.DATABASES, 'needs the SQLite test replica from resumw_project.test_settings')
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TransactionTestCase):
+    """A second SQLite database, copied from the primary by ``replicate``, stands in for a lagging replica."""
+
+    databases = {'default', 'replica'} if 'replica' in settings.DATABASES else {'default'}
+
+    def setUp(self):
+        caches['html'].clear()
+        self.user = User.objects.create_user('ada', password='secret')
+        self.client.force_login(self.user)
+        self.resume = make_resume(self.user, sections=1)
+        self.replicate()
+
+    def replicate(self):
+        for alias in ('default', 'replica'):
+            connections[alias].ensure_connection()
+        connections['default'].connection.backup(connections['replica'].connection)
+
+    def test_reads_stay_on_primary_after_a_write(self):
+        Resume.objects.filter(pk=self.resume.pk).update(title='Renamed')
+        skill = self.resume.skills.get()
+        skill.name = 'Analytical Engines'
+        skill.save()
+        self.assertContains(self.client.get(f'/view/{self.resume.id}/'), 'Skill 0')
+        self.assertNotContains(self.client.get('/dashboard/'), 'Renamed')
+
+        version = Resume.objects.get(pk=self.resume.pk).version
+        response = self.client.post(f'/autosave/{self.resume.id}/', {
+            'version': version, 'changes': [{'model': 'personal_info', 'data': {'first_name': 'Augusta'}}],
+        }, content_type='application/json')
+        self.assertEqual(response.cookies['db_pin']['max-age'], 15)
+        self.assertContains(self.client.get('/dashboard/'), 'Renamed')
+        self.assertContains(self.client.get(f'/view/{self.resume.id}/'), 'Augusta')
+
+        # Once the pin expires, reads go back to the (still lagging) replica.
+        del self.client.cookies['db_pin']
+        self.assertNotContains(self.client.get('/dashboard/'), 'Renamed')
+
+    def test_replica_renders_are_not_cached(self):
+        skill = self.resume.skills.get()
+        skill.name = 'Analytical Engines'
+        skill.save()
+        self.assertContains(self.client.get(f'/view/{self.resume.id}/'), 'Skill 0')
+        # The tokens already moved with the primary's commit; the stale page must not be stored under them.
+        self.client.cookies['db_pin'] = '1'
+        self.assertContains(self.client.get(f'/view/{self.resume.id}/'), 'Analytical Engines')
+
+    def test_writes_and_transactions_use_primary(self):
+        token = replicas._replica.set('replica')
+        try:
+            self.assertEqual(router.db_for_read(Resume), 'replica')
+            self.assertEqual(router.db_for_write(Resume, instance=Resume.objects.get(pk=self.resume.pk)), 'default')
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(Resume), 'default')
+        finally:
+            replicas._replica.reset(token)
+        self.assertEqual(router.db_for_read(Resume), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'main'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2', 'replica3'])
+class ReplicaChoiceTests(SimpleTestCase):
+    def test_one_replica_per_request(self):
+        @replicas.read_from_replica
+        def view(request):
+            return {router.db_for_read(Resume) for _ in range(20)}
+
+        request = mock.Mock(COOKIES={})
+        chosen = set()
+        for _ in range(20):
+            aliases = view(request)
+            self.assertEqual(len(aliases), 1)
+            chosen |= aliases
+        self.assertGreater(len(chosen), 1)
+        self.assertEqual(router.db_for_read(Resume), 'default')
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, LIVE_PREVIEW_ENABLED=True, LIVE_PREVIEW_KEEPALIVE=5)
+class LivePreviewTests(TestCase):
+    def setUp(self):
+        caches['html'].clear()
+        self.user = User.objects.create_user('ada', password='secret')
+        self.resume = make_resume(self.user, sections=1)
+
+    def test_section_save_publishes_after_commit(self):
+        with mock.patch.object(live_preview, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                Skill.objects.create(resume=self.resume, name='Analytical Engines')
+            publish.assert_not_called()
+            for callback in callbacks:
+                callback()
+        publish.assert_called_once_with(self.resume.id, {'skills'})
+
+    async def test_stream_pushes_rendered_fragments(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(f'/builder/{self.resume.id}/live/')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = aiter(response.streaming_content)
+        self.assertEqual(await anext(events), b'retry: 3000\n\n')
+        await Skill.objects.acreate(resume=self.resume, name='Analytical Engines')
+        live_preview.publish(self.resume.id, ['skills'])
+        event = (await anext(events)).decode()
+        self.assertTrue(event.startswith('event: fragments\n'))
+        self.assertIn('Analytical Engines', json.loads(event.split('data: ', 1)[1])['fragments']['skills'])
+        await events.aclose()
+
+    async def test_stream_is_private(self):
+        other = await User.objects.acreate_user('eve', password='secret')
+        await self.async_client.aforce_login(other)
+        response = await self.async_client.get(f'/builder/{self.resume.id}/live/')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(LIVE_PREVIEW_ENABLED=False)
+    def test_disabled_by_default_outside_asgi(self):
+        self.client.force_login(self.user)
+        self.assertNotContains(self.client.get(f'/builder/{self.resume.id}/'), 'EventSource(')
+        self.assertEqual(self.client.get(f'/builder/{self.resume.id}/live/').status_code, 404)
+
+    @override_settings(LIVE_PREVIEW_BROKER='main.live_preview.CacheBroker')
+    def test_check_warns_about_per_process_cache_broker(self):
+        self.assertEqual([w.id for w in checks.check_live_preview_broker(None)], ['main.W002'])
+
+    @override_settings(LIVE_PREVIEW_BROKER='main.live_preview.CacheBroker', LIVE_PREVIEW_POLL_INTERVAL=0.01)
+    async def test_cache_broker_delivers_across_subscribers(self):
+        live_preview.publish(1, ['education'])
+        subscriptions = [live_preview.subscribe(1), live_preview.subscribe(1)]
+        self.assertEqual(await subscriptions[0].get(0.02), [])
+        live_preview.publish(1, ['skills'])
+        live_preview.publish(1, ['header', 'skills'])
+        live_preview.publish(2, ['projects'])
+        for subscription in subscriptions:
+            messages = await subscription.get(1)
+            self.assertEqual(live_preview.changed_sections(messages), {'header', 'skills'})
+
+
+class ProcessPoolTests(TestCase):
+    def test_children_run_rendering_code(self):
+        # Unpickling anything from main.rendering imports the models in the child.
+        with rendering.process_pool(1) as pool:
+            name = pool.submit(rendering.pdf_template_name, Resume(template='classic')).result(timeout=60)
+        self.assertEqual(name, template_registry.template_path('classic'))
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class ZipExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ada', password='secret')
+        self.client.force_login(self.user)
+        self.first = make_resume(self.user, sections=1, title='First')
+        self.second = make_resume(self.user, sections=1, title='Second')
+        make_resume(User.objects.create_user('eve'), sections=1)
+        # Threads share the patched write_pdf; spawned processes would not.
+        pool = ThreadPoolExecutor(2)
+        self.addCleanup(pool.shutdown)
+        for patcher in (mock.patch.object(rendering, 'HTML', object()),
+                        mock.patch.object(rendering, 'shared_pool', return_value=pool)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def export(self, write_pdf, **params) -> zipfile.ZipFile:
+        with mock.patch.object(rendering, 'write_pdf', side_effect=write_pdf):
+            response = self.client.get('/export/all/', params)
+            data = b''.join(response.streaming_content)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        return zipfile.ZipFile(io.BytesIO(data))
+
+    def test_archive_holds_only_the_users_resumes(self):
+        archive = self.export(lambda html, base_url: b'%PDF-' + html.encode()[:8])
+        self.assertEqual(sorted(archive.namelist()), [f'first-{self.first.id}.pdf', f'second-{self.second.id}.pdf'])
+        self.assertTrue(archive.read(f'first-{self.first.id}.pdf').startswith(b'%PDF-'))
+
+    def test_ids_select_resumes(self):
+        archive = self.export(lambda html, base_url: b'%PDF-', ids=[self.second.id, 'x'])
+        self.assertEqual(archive.namelist(), [f'second-{self.second.id}.pdf'])
+
+    def test_failed_render_keeps_the_archive_intact(self):
+        def write_pdf(html, base_url):
+            if 'Second' in html:
+                raise RuntimeError('boom')
+            return b'%PDF-'
+
+        with self.assertLogs('main.rendering', 'ERROR'):
+            archive = self.export(write_pdf)
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(sorted(archive.namelist()), [f'first-{self.first.id}.pdf', f'second-{self.second.id}-FAILED.txt'])
+        self.assertEqual(archive.read(f'second-{self.second.id}-FAILED.txt'), views.ZIP_RENDER_FAILED)
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class PdfToImagesTests(TestCase):
+    url = '/tools/convert/pdf-to-images/'
+
+    def convert(self, page_count=4, **data):
+        pdf = SimpleUploadedFile('cv.pdf', make_pdf(page_count), content_type='application/pdf')
+        return self.client.post(self.url, {'pdf': pdf, **data})
+
+    def images(self, response) -> dict[str, bytes]:
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        return {name: archive.read(name) for name in archive.namelist()}
+
+    def test_page_range_selects_pages(self):
+        images = self.images(self.convert(pages='2-3', format='jpg'))
+        self.assertEqual(list(images), ['cv_page_2.jpg', 'cv_page_3.jpg'])
+        with Image.open(io.BytesIO(images['cv_page_2.jpg'])) as img:
+            self.assertEqual(img.format, 'JPEG')
+
+    def test_invalid_page_range_redirects(self):
+        response = self.convert(pages='3-9')
+        self.assertRedirects(response, '/tools/convert/', fetch_redirect_response=False)
+
+    @override_settings(PDF_TO_IMAGES_MAX_PAGES=2)
+    def test_page_limit(self):
+        self.assertRedirects(self.convert(page_count=3), '/tools/convert/', fetch_redirect_response=False)
+        self.assertEqual(list(self.images(self.convert(page_count=3, pages='1,3'))), ['cv_page_1.png', 'cv_page_3.png'])
+
+    @override_settings(PDF_TO_IMAGES_MAX_DPI=72)
+    def test_dpi_is_clamped(self):
+        # make_pdf pages are A4, 595 points wide.
+        for dpi, width in (('1000', 595), ('1', 298), ('abc', 595)):
+            with self.subTest(dpi=dpi):
+                png = self.images(self.convert(page_count=1, dpi=dpi))['cv_page_1.png']
+                with Image.open(io.BytesIO(png)) as img:
+                    self.assertEqual(img.width, width)
+
+    @override_settings(PDF_TO_IMAGES_PARALLEL=True, PDF_TO_IMAGES_PARALLEL_MIN_PAGES=2)
+    def test_parallel_matches_serial(self):
+        with self.settings(PDF_TO_IMAGES_PARALLEL=False):
+            serial = self.images(self.convert(page_count=6, pages='2-6', dpi='50'))
+        with rendering.process_pool(2) as pool, mock.patch.object(rendering, 'shared_pool', return_value=pool) as shared:
+            parallel = self.images(self.convert(page_count=6, pages='2-6', dpi='50'))
+        shared.assert_called_once()
+        self.assertEqual(list(parallel), list(serial))
+        self.assertEqual(parallel, serial)
+
+
+def make_image(fmt='JPEG', size=(400, 300), mode='RGB') -> bytes:
+    buf = io.BytesIO()
+    Image.new(mode, size, 'teal' if mode != 'L' else 128).save(buf, format=fmt)
+    return buf.getvalue()
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class ImagesToPdfTests(TestCase):
+    def convert(self, *uploads, **kwargs) -> tuple[int, bytes]:
+        with tempfile.NamedTemporaryFile(suffix='.pdf') as out:
+            pages = converters.images_to_pdf(
+                [SimpleUploadedFile(name, data) for name, data in uploads], out.name, **kwargs
+            )
+            with open(out.name, 'rb') as pdf:
+                return pages, pdf.read()
+
+    def test_fitting_jpeg_is_passed_through(self):
+        jpeg = make_image()
+        pages, pdf = self.convert(('photo.jpg', jpeg), ('scan.png', make_image('PNG')), ('notes.txt', b'not an image'))
+        self.assertEqual(pages, 2)
+        with converters.fitz.open(stream=pdf, filetype='pdf') as doc:
+            self.assertEqual(doc.page_count, 2)
+            xref = doc[0].get_images()[0][0]
+            self.assertEqual(doc.extract_image(xref)['image'], jpeg)
+            self.assertEqual(doc.extract_image(doc[1].get_images()[0][0])['ext'], 'jpeg')
+
+    def test_oversized_jpeg_is_downscaled_to_page(self):
+        pages, pdf = self.convert(('photo.jpg', make_image(size=(3000, 2000))), page_size='a4', dpi=72)
+        with converters.fitz.open(stream=pdf, filetype='pdf') as doc:
+            self.assertEqual(tuple(doc[0].rect)[2:], converters.PAGE_SIZES['a4'])
+            image = doc.extract_image(doc[0].get_images()[0][0])
+            self.assertLessEqual((image['width'], image['height']), converters.PAGE_SIZES['a4'])
+
+    def test_pillow_fallback(self):
+        fitz = converters.fitz
+        with mock.patch.object(converters, 'fitz', None):
+            pages, pdf = self.convert(('photo.jpg', make_image()), ('scan.png', make_image('PNG', mode='RGBA')),
+                                      ('notes.txt', b'not an image'))
+        self.assertEqual(pages, 2)
+        with fitz.open(stream=pdf, filetype='pdf') as doc:
+            self.assertEqual(doc.page_count, 2)
+            self.assertEqual(tuple(doc[0].rect)[2:], (400, 300))
+
+    def test_view_streams_pdf(self):
+        response = self.client.post('/tools/convert/image-to-pdf/', {
+            'images': [SimpleUploadedFile('photo.jpg', make_image())], 'page_size': 'letter',
+        })
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF-'))
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class BuildTemplatePreviewsTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        patcher = self.settings(TEMPLATE_PREVIEW_DIR=root)
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+        self.root = root
+
+    def build(self, **options) -> str:
+        out = io.StringIO()
+        call_command('build_template_previews', stdout=out, stderr=io.StringIO(), **options)
+        return out.getvalue()
+
+    def test_builds_changed_templates_only(self):
+        count = len(Resume.TEMPLATE_CHOICES)
+        with mock.patch.object(rendering, 'HTML', object()), \
+                mock.patch.object(rendering, 'write_pdf', return_value=make_pdf(1)):
+            self.assertIn(f'Built {count} preview(s), 0 unchanged.', self.build())
+            manifest = previews.load_manifest()
+            self.assertEqual(set(manifest), {key for key, _ in Resume.TEMPLATE_CHOICES})
+            for path in manifest['modern']['files'].values():
+                self.assertTrue(os.path.exists(os.path.join(self.root, path)))
+            self.assertIn(f'Built 0 preview(s), {count} unchanged.', self.build())
+            self.assertIn(f'Built {count} preview(s), 0 unchanged.', self.build(force=True))
+
+    def test_html_only_without_weasyprint(self):
+        with mock.patch.object(rendering, 'HTML', None):
+            self.build()
+        files = previews.load_manifest()['classic']['files']
+        self.assertEqual((files['pdf'], files['png']), (None, None))
+        self.assertTrue(os.path.exists(os.path.join(self.root, files['html'])))
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class BenchTemplatesTests(TestCase):
+    def test_json_report(self):
+        out = io.StringIO()
+        call_command('bench_templates', sizes='1,3', templates='modern,classic', iterations=2,
+                     no_pdf=True, json_path='-', stdout=out)
+        report = json.loads(out.getvalue()[out.getvalue().index('{'):])
+        self.assertEqual([(r['template'], r['size']) for r in report['results']],
+                         [('modern', 1), ('classic', 1), ('modern', 3), ('classic', 3)])
+        self.assertEqual(report['results'][2]['sections'], {'experiences': 3, 'education': 1, 'skills': 6, 'projects': 3})
+        self.assertGreater(report['results'][2]['html']['bytes'], report['results'][0]['html']['bytes'])
+        self.assertFalse(Resume.objects.exists())
+
+
+@override_settings(CACHES=TEST_CACHES)
+class BenchDbWritesTests(TransactionTestCase):
+    def test_json_report(self):
+        out = io.StringIO()
+        # Writer threads need their own connections to see committed rows, hence TransactionTestCase.
+        call_command('bench_db_writes', writers=2, readers=1, writes=3, json_path='-', stdout=out)
+        report = json.loads(out.getvalue()[out.getvalue().index('{'):])
+        self.assertEqual((report['meta']['profile'], report['meta']['writers']), ('sqlite', 2))
+        writes = report['results']['writes']
+        self.assertEqual(writes['runs'] + writes['errors'], 6)
+        self.assertFalse(User.objects.exists())
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class LoadTestHarnessTests(LiveServerTestCase):
+    def test_editor_session(self):
+        call_command('seed_loadtest', users=1, resumes_per_user=2, size=1, stdout=io.StringIO())
+        # One virtual user: the live server's threads share the in-memory SQLite connection.
+        report = loadtest.run(self.live_server_url, ['editor_session'], users=1, duration=0.5, accounts=1, think_time=0)
+        self.assertEqual(report['failed_logins'], [])
+        endpoints = report['endpoints']
+        self.assertEqual(endpoints['main:autosave_resume']['statuses'], {'200': endpoints['main:autosave_resume']['requests']})
+        self.assertTrue(all(e['errors'] == 0 for e in endpoints.values()))
+        self.assertEqual(Skill.objects.filter(name__startswith='Skill ', resume__user__username__startswith='loadtest-')
+                         .exclude(name__in=['Skill 0', 'Skill 1']).count(), endpoints['main:add_skill']['requests'])
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, PERF_SAMPLE_RATE=1.0, PERF_METRICS_TOKEN='')
+class PerfInstrumentationTests(TestCase):
+    def setUp(self):
+        caches['html'].clear()
+        for histogram in perf.HISTOGRAMS:
+            histogram.reset()
+        self.user = User.objects.create_user('ada', password='secret')
+        self.client.force_login(self.user)
+        self.resume = make_resume(self.user)
+
+    def test_sampled_request_gets_server_timing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/view/{self.resume.id}/')
+        timing = dict(
+            (metric.split(';')[0], metric) for metric in response['Server-Timing'].split(', ')
+        )
+        self.assertEqual(set(timing), {'db', 'template', 'total'})
+        self.assertIn(f'desc="{len(queries)}x"', timing['db'])
+        series = perf.REQUEST_SECONDS.collect()
+        self.assertEqual(series[('main:view_resume', 'GET', '2xx')][2], 1)
+
+    @override_settings(PERF_SAMPLE_RATE=0.0)
+    def test_unsampled_request_is_only_counted(self):
+        response = self.client.get(f'/view/{self.resume.id}/')
+        self.assertNotIn('Server-Timing', response)
+        self.assertIn(('main:view_resume', 'GET', '2xx'), perf.REQUEST_SECONDS.collect())
+
+    def test_streamed_response_is_timed_to_its_last_chunk(self):
+        pdf = SimpleUploadedFile('doc.pdf', make_pdf(2), content_type='application/pdf')
+        response = self.client.post('/tools/convert/pdf-to-images/', {'pdf': pdf})
+        self.assertEqual(perf.REQUEST_SECONDS.collect(), {})
+        b''.join(response.streaming_content)
+        self.assertIn(('main:tool_pdf_to_images', 'POST', '2xx'), perf.REQUEST_SECONDS.collect())
+        # Rasterizing happens while the ZIP streams.
+        self.assertEqual(perf.SPAN_SECONDS.collect()[('main:tool_pdf_to_images', 'mupdf')][2], 1)
+
+    def test_metrics_endpoint(self):
+        self.client.get(f'/view/{self.resume.id}/')
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        body = self.client.get('/metrics/').content.decode()
+        self.assertIn('resume_request_duration_seconds_count{view="main:view_resume",method="GET",status="2xx"} 1', body)
+        self.assertIn('resume_request_db_queries_bucket{view="main:view_resume",le="+Inf"} 1', body)
+        self.assertIn('resume_export_jobs{status="queued"} 0', body)
+        with self.settings(PERF_METRICS_TOKEN='s3cret'):
+            self.client.logout()
+            self.assertEqual(self.client.get('/metrics/').status_code, 401)
+            self.assertEqual(self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+
+
+def slow_write_pdf(html_string, base_url):
+    time.sleep(0.05)
+    return b'%PDF-1.7'
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, PROFILING_ENABLED=True, PROFILING_INTERVAL=0.001)
+class ProfilingTests(TestCase):
+    def setUp(self):
+        profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, profile_dir)
+        settings_override = self.settings(PROFILE_DIR=profile_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user('ada', password='secret', is_staff=True)
+        self.client.force_login(self.user)
+        self.resume = make_resume(self.user, sections=1)
+
+    def export(self, **headers):
+        with mock.patch.object(rendering, 'HTML', object()), \
+                mock.patch.object(rendering, 'write_pdf', slow_write_pdf):
+            return self.client.get(f'/export/{self.resume.id}/', headers=headers)
+
+    def test_staff_header_saves_downloadable_profile(self):
+        response = self.export(**{'X-Profile': '1'})
+        name = response['X-Profile-Id']
+        self.assertEqual([p['name'] for p in self.client.get('/profiles/').json()['profiles']], [name])
+        download = self.client.get(f'/profiles/{name}')
+        folded = b''.join(download.streaming_content).decode()
+        stacks = dict(line.rsplit(' ', 1) for line in folded.splitlines())
+        self.assertTrue(any('main.views:export_resume_pdf;' in stack and stack.endswith(':slow_write_pdf')
+                            for stack in stacks))
+        self.assertTrue(all(count.isdigit() for count in stacks.values()))
+
+    def test_only_staff_can_request_a_profile(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.export(**{'X-Profile': '1'})
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(profiling.list_profiles(), [])
+
+    def test_unsent_stream_is_saved_on_close(self):
+        pdf = SimpleUploadedFile('doc.pdf', make_pdf(1), content_type='application/pdf')
+        response = self.client.post('/tools/convert/pdf-to-images/', {'pdf': pdf}, headers={'X-Profile': '1'})
+        self.assertTrue(any(t.name == 'stack-sampler' for t in threading.enumerate()))
+        response.close()
+        self.assertFalse(any(t.name == 'stack-sampler' for t in threading.enumerate()))
+        self.assertEqual([p['name'] for p in profiling.list_profiles()], [response['X-Profile-Id']])
+
+    @override_settings(PROFILE_MAX_FILES=2)
+    def test_old_profiles_are_evicted(self):
+        for _ in range(3):
+            self.export(**{'X-Profile': '1'})
+            time.sleep(0.01)
+        self.assertEqual(len(profiling.list_profiles()), 2)
+        self.assertEqual(self.client.get('/profiles/../settings.py').status_code, 404)
+
+
+class ListingIndexTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ada', password='secret')
+        self.resume = make_resume(self.user)
+
+    def plan(self, queryset) -> str:
+        if connection.vendor == 'postgresql':
+            # Tiny test tables are cheaper to scan; ask whether the index can serve the query at all.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def assertServedByIndex(self, queryset, model):
+        index = model._meta.indexes[0].name
+        plan = self.plan(queryset)
+        self.assertIn(index, plan)
+        # The index also delivers the ordering: no separate sort step.
+        if connection.vendor == 'sqlite':
+            self.assertNotIn('TEMP B-TREE', plan)
+        elif connection.vendor == 'postgresql':
+            self.assertNotIn('Sort', plan)
+
+    def test_listing_queries_use_composite_indexes(self):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.skipTest(f'No plan expectations for {connection.vendor}')
+        self.assertServedByIndex(Resume.objects.filter(user=self.user), Resume)
+        self.assertServedByIndex(self.resume.experiences.all(), Experience)
+        self.assertServedByIndex(self.resume.education.all(), Education)
+        self.assertServedByIndex(self.resume.projects.all(), Project)
+        self.assertServedByIndex(self.resume.skills.all(), Skill)
@@ -7,14 +7,28 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('templates/', views.templates, name='templates'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/resumes/', views.dashboard_resumes, name='dashboard_resumes'),
     path('create/', views.create_resume, name='create_resume'),
     path('edit/<int:resume_id>/', views.edit_resume, name='edit_resume'),
     path('builder/<int:resume_id>/', views.builder_resume, name='builder_resume'),
-    path('builder/<int:resume_id>/history/', views.builder_resume, name='resume_history'),
+    path('builder/<int:resume_id>/history/', views.resume_history, name='resume_history'),
+    path('builder/<int:resume_id>/live/', views.resume_live_preview, name='resume_live_preview'),
+    path('builder/<int:resume_id>/versions/', views.resume_snapshots, name='resume_snapshots'),
+    path('builder/<int:resume_id>/versions/<int:number>/variant/', views.create_resume_variant, name='create_resume_variant'),
     path('view/<int:resume_id>/', views.view_resume, name='view_resume'),
+    path('view/<int:resume_id>/versions/<int:number>/', views.view_resume_snapshot, name='view_resume_snapshot'),
     path('view/preview/<str:template_key>/', views.preview_template, name='preview_template'),
     path('export/<int:resume_id>/', views.export_resume_pdf, name='export_resume_pdf'),
+    path('export/all/', views.export_resumes_zip, name='export_resumes_zip'),
+    path('export/<int:resume_id>/versions/<int:number>/', views.export_resume_snapshot_pdf, name='export_resume_snapshot_pdf'),
+    path('export/<int:resume_id>/async/', views.export_resume_pdf_async, name='export_resume_pdf_async'),
+    path('export/jobs/<int:job_id>/', views.export_job_status, name='export_job_status'),
+    path('export/jobs/metrics/', views.export_job_metrics, name='export_job_metrics'),
+    path('metrics/', views.metrics, name='metrics'),
+    path('profiles/', views.profile_list, name='profile_list'),
+    path('profiles/<str:name>', views.profile_download, name='profile_download'),
     path('delete/<int:resume_id>/', views.delete_resume, name='delete_resume'),
+    path('clone/<int:resume_id>/', views.clone_resume, name='clone_resume'),
     path('create/sample/<str:template_key>/', views.create_sample_resume, name='create_sample_resume'),
     path('about/', views.about, name='about'),
     # Tools
@@ -28,4 +42,6 @@ urlpatterns = [
     path('add-education/<int:resume_id>/', views.add_education, name='add_education'),
     path('add-skill/<int:resume_id>/', views.add_skill, name='add_skill'),
     path('add-project/<int:resume_id>/', views.add_project, name='add_project'),
+    path('batch/<int:resume_id>/', views.batch_sections, name='batch_sections'),
+    path('autosave/<int:resume_id>/', views.autosave_resume, name='autosave_resume'),
 ]
@@ -1,26 +1,28 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import HttpResponse, JsonResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
+from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
-from django.utils import timezone
-from django.template.loader import render_to_string
-from django.template import TemplateDoesNotExist
-from .models import Resume, PersonalInfo, Experience, Education, Skill, Project
+from django.utils.text import slugify
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, prefetch_related_objects
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date
+from asgiref.sync import sync_to_async
+from . import batch, converters, export_jobs, history, html_cache, keyset, live_preview, pdf_cache, perf, profiling, previews, rendering, replicas, seeding, signals, snapshots, template_registry, zipstream
+from .models import Resume, PersonalInfo, Experience, Education, Skill, Project, ExportJob, ResumeSnapshot, SECTION_RELATIONS
 from .forms import ResumeForm, PersonalInfoForm, ExperienceForm, EducationForm, SkillForm, ProjectForm
 from django.views.decorators.http import require_http_methods
-from io import BytesIO
-from zipfile import ZipFile
-from PIL import Image
+import json
+import os
 import re
-try:
-    import fitz  # PyMuPDF
-except Exception:
-    fitz = None
-try:
-    from weasyprint import HTML
-except Exception:
-    HTML = None
+import tempfile
+from .converters import fitz
 
 # Create your views here.
 
@@ -32,89 +34,112 @@ def home(request):
 def templates(request):
     templates_data = []
     for tpl_id, tpl_name in Resume.TEMPLATE_CHOICES:
+        artifacts = previews.artifact_urls(tpl_id) or {}
         templates_data.append({
             'id': tpl_id,
             'name': tpl_name,
             'description': f'{tpl_name} resume layout',
             'features': ['ATS friendly', 'Responsive print', 'Clean hierarchy'],
-            'preview_url': request.build_absolute_uri(f"/view/preview/{tpl_id}/")
+            'preview_url': artifacts.get('html') or request.build_absolute_uri(f"/view/preview/{tpl_id}/"),
+            'preview_pdf_url': artifacts.get('pdf'),
+            'thumbnail_url': artifacts.get('png'),
         })
     return render(request, 'main/templates.html', {
         'templates': templates_data,
         'title': 'Resume Templates'
     })
 
-def _seed_dummy_resume_data(resume: Resume):
-    pi, _ = PersonalInfo.objects.get_or_create(
-        resume=resume,
-        defaults=dict(
-            first_name='Alex', last_name='Doe', email='alex@example.com', phone='+1 555 123 4567',
-            linkedin='https://linkedin.com/in/alexdoe', website='https://alex.dev',
-            summary='Results-driven professional with 5+ years building impactful products.',
-            city='San Francisco', state='CA', country='USA',
-            photo_url='https://avatars.githubusercontent.com/u/9919?s=200&v=4',
-        )
-    )
-    if resume.experiences.count() == 0:
-        Experience.objects.create(resume=resume, company='TechCorp', position='Senior Developer',
-                                  location='Remote', start_date=timezone.now().date().replace(year=2021, month=1, day=1),
-                                  current=True, description='Built scalable services, mentored engineers, led delivery.')
-    if resume.education.count() == 0:
-        Education.objects.create(resume=resume, institution='State University', degree='B.Sc. Computer Science',
-                                 field_of_study='Computer Science', start_date=timezone.now().date().replace(year=2015, month=9, day=1),
-                                 end_date=timezone.now().date().replace(year=2019, month=6, day=1), gpa=3.8)
-    if resume.skills.count() == 0:
-        for n in ['Python','Django','PostgreSQL','Docker','AWS','Git','REST APIs']:
-            Skill.objects.create(resume=resume, name=n)
-    if resume.projects.count() == 0:
-        Project.objects.create(resume=resume, title='Project Atlas', technologies='Django, DRF, React',
-                               description='Platform for analytics with dashboards and APIs.',
-                               github_url='https://github.com/example/project')
-
-def _dummy_context_for_template(template_key: str):
-    dummy_resume = Resume(id=0, title='Sample Resume', template=template_key)
-    class P:
-        first_name='Jamie'; last_name='Smith'; email='jamie@example.com'; phone='+1 555 111 2222'
-        linkedin='https://linkedin.com/in/jamiesmith'; website='https://jamie.dev'; summary='Creative problem-solver.'
-        address='123 Main St'; city='NYC'; state='NY'; zip_code='10001'; country='USA'; photo_url='https://placehold.co/140x140'
-    experiences=[type('E',(),dict(position='Engineer',company='Acme',location='NY',start_date=timezone.now().date(),end_date=None,current=True,description='Did things.'))()]
-    education=[type('Ed',(),dict(degree='B.Sc',institution='Uni',field_of_study='CS',location='NY',start_date=timezone.now().date(),end_date=timezone.now().date(),current=False,gpa=3.7,description='Honors'))()]
-    skills=[type('S',(),dict(name='Python', get_level_display=lambda self='': 'Advanced'))(), type('S',(),dict(name='Django', get_level_display=lambda self='': 'Advanced'))()]
-    projects=[type('P',(),dict(title='Demo',description='A sample project',technologies='Django',url='',github_url=''))()]
-    return {
-        'resume': dummy_resume,
-        'personal_info': P,
-        'experiences': experiences,
-        'education': education,
-        'skills': skills,
-        'projects': projects,
-        'title': 'Preview '
-    }
-
+@replicas.read_from_replica
 def preview_template(request, template_key: str):
-    # Render a template preview with dummy data (no auth required)
-    try:
-        context = _dummy_context_for_template(template_key)
-        return render(request, f'main/resume_templates/{template_key}.html', context)
-    except TemplateDoesNotExist:
-        context = _dummy_context_for_template('modern')
-        return render(request, 'main/resume_templates/modern.html', context)
+    # Render a template preview with dummy data (no auth required).
+    # The gallery links to the static previews from `manage.py build_template_previews`;
+    # this view covers templates that haven't been built yet.
+    key = f'html:preview:{template_key}'
+    html = html_cache.get(key)
+    if html is None:
+        template = template_registry.resolve(template_key).template
+        html = template.render(previews.dummy_context(template_key), request)
+        html_cache.store(key, html, settings.TEMPLATE_PREVIEW_CACHE_TIMEOUT)
+    return HttpResponse(html)
 
 @login_required
 def create_sample_resume(request, template_key: str):
-    resume = Resume.objects.create(user=request.user, title=f'My {template_key.title()} Resume', template=template_key)
-    _seed_dummy_resume_data(resume)
+    resume = seeding.create_sample(request.user, template_key)
     messages.success(request, 'Sample resume created. You can now customize it!')
     return redirect('main:edit_resume', resume_id=resume.id)
 
 @login_required
+@require_http_methods(["POST"])
+def clone_resume(request, resume_id):
+    copy = seeding.clone(get_object_or_404(Resume, id=resume_id, user=request.user))
+    messages.success(request, f'Created "{copy.title}".')
+    return redirect('main:edit_resume', resume_id=copy.id)
+
+# Columns the dashboard cards show; the rest of the row is never loaded.
+DASHBOARD_FIELDS = ('title', 'template', 'created_at', 'updated_at')
+
+def _dashboard_page(request):
+    """
+    The requested page of the user's resumes, newest first, and the query
+    string for the next page. Raises ValueError for a bad cursor or limit.
+    """
+    limit = max(1, min(int(request.GET.get('limit') or settings.DASHBOARD_PAGE_SIZE), 100))
+    resumes = Resume.objects.filter(user=request.user).only(*DASHBOARD_FIELDS)
+    resumes, next_cursor = keyset.page(resumes, 'updated_at', request.GET.get('cursor', ''), limit)
+    return resumes, f'cursor={next_cursor}&limit={limit}' if next_cursor else None
+
+def _dashboard_stats(user):
+    """The summary cards' counts, which scan all of the user's resumes, cached until one of them changes."""
+    key = html_cache.dashboard_stats_key(user.id)
+    stats = html_cache.get(key)
+    if stats is None:
+        stats = Resume.objects.filter(user=user).aggregate(total=Count('id'), templates=Count('template', distinct=True))
+        # A replica may be behind the last invalidation; don't cache what it returned.
+        if not replicas.reading():
+            html_cache.store(key, stats, settings.DASHBOARD_STATS_CACHE_TIMEOUT)
+    return stats
+
+@login_required
+@replicas.read_from_replica
 def dashboard(request):
-    resumes = Resume.objects.filter(user=request.user)
+    try:
+        resumes, next_query = _dashboard_page(request)
+    except ValueError:
+        return redirect('main:dashboard')
+    stats = None
+    if resumes and not request.GET.get('cursor'):
+        stats = _dashboard_stats(request.user)
     return render(request, 'main/dashboard.html', {
         'resumes': resumes,
+        'next_query': next_query,
+        'stats': stats,
+        'async_export': settings.PDF_EXPORT_ASYNC,
         'title': 'My Resumes'
     })
 
+@login_required
+@replicas.read_from_replica
+def dashboard_resumes(request):
+    """A page of dashboard cards as JSON, for infinite scroll; follow ``next`` for older resumes."""
+    try:
+        resumes, next_query = _dashboard_page(request)
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid cursor or limit.'}, status=400)
+    return JsonResponse({
+        'status': 'success',
+        'resumes': [{
+            'id': r.id,
+            'title': r.title,
+            'template': r.template,
+            'created_at': r.created_at.isoformat(),
+            'updated_at': r.updated_at.isoformat(),
+            'html': render_to_string('main/_resume_card.html', {
+                'resume': r, 'async_export': settings.PDF_EXPORT_ASYNC,
+            }, request),
+        } for r in resumes],
+        'next': f"{reverse('main:dashboard_resumes')}?{next_query}" if next_query else None,
+    })
+
 @login_required
 def create_resume(request):
     selected_template = request.GET.get('template')
@@ -143,44 +168,60 @@ def create_resume(request):
         'title': 'Create New Resume'
     })
 
+def _get_user_resume(request, resume_id):
+    """The user's resume with personal info and every section prefetched."""
+    return get_object_or_404(Resume.objects.with_sections(), id=resume_id, user=request.user)
+
+def _prefetch_sections(resume: Resume) -> Resume:
+    """Load every section list onto a resume that is already in hand, as ``with_sections`` does."""
+    prefetch_related_objects([resume], *SECTION_RELATIONS)
+    return resume
+
+def _personal_info_for(resume: Resume) -> PersonalInfo:
+    personal_info = getattr(resume, 'personal_info', None)
+    if personal_info is None:
+        personal_info = PersonalInfo.objects.create(resume=resume)
+        # Creating the row bumped the version the page hands to autosave.
+        resume.refresh_from_db(fields=['version'])
+    return personal_info
+
+def _resume_suggestions(resume: Resume, personal_info: PersonalInfo, template_tips: bool = True) -> list[str]:
+    """Simple suggestions engine based on missing content and template choice (uses prefetched sections)."""
+    suggestions: list[str] = []
+    if not personal_info.first_name or not personal_info.last_name:
+        suggestions.append('Add your first and last name to personalize the header.')
+    if not personal_info.summary:
+        suggestions.append('Write a concise professional summary (2-3 sentences).')
+    if not resume.experiences.all():
+        suggestions.append('Add at least one work experience with achievements using action verbs.')
+    if not resume.education.all():
+        suggestions.append('Include your most relevant education with degree and institution.')
+    if len(resume.skills.all()) < 5:
+        suggestions.append('List 5-10 key skills that match the job description.')
+    if template_tips:
+        if not resume.projects.all() and resume.template in {'tech','developer','creative'}:
+            suggestions.append('Showcase 1-2 projects with links and your role/impact.')
+        if resume.template in {'executive','professional','corporate'} and personal_info.linkedin == '':
+            suggestions.append('Add your LinkedIn profile for professional credibility.')
+    return suggestions
+
 @login_required
 def edit_resume(request, resume_id):
-    resume = get_object_or_404(Resume, id=resume_id, user=request.user)
-    
     if request.method == 'POST':
+        resume = get_object_or_404(Resume.objects.select_related('personal_info'), id=resume_id, user=request.user)
         form = ResumeForm(request.POST, instance=resume)
         if form.is_valid():
             updated_resume = form.save()
-            updated_resume.history.append({
-                'ts': timezone.now().isoformat(),
-                'event': 'updated_settings',
-                'by': request.user.username,
-            })
-            updated_resume.save(update_fields=['history'])
+            history.record(updated_resume, 'updated_settings', request.user)
             messages.success(request, 'Resume updated successfully!')
             return redirect('main:edit_resume', resume_id=resume.id)
+        # Render the invalid form around the bound instance rather than fetching the row again.
+        resume = _prefetch_sections(resume)
     else:
+        resume = _get_user_resume(request, resume_id)
         form = ResumeForm(instance=resume)
     
-    # Get or create personal info
-    personal_info, created = PersonalInfo.objects.get_or_create(resume=resume)
-
-    # Simple suggestions engine based on missing content and template choice
-    suggestions: list[str] = []
-    if not personal_info.first_name or not personal_info.last_name:
-        suggestions.append('Add your first and last name to personalize the header.')
-    if not personal_info.summary:
-        suggestions.append('Write a concise professional summary (2-3 sentences).')
-    if resume.experiences.count() == 0:
-        suggestions.append('Add at least one work experience with achievements using action verbs.')
-    if resume.education.count() == 0:
-        suggestions.append('Include your most relevant education with degree and institution.')
-    if resume.skills.count() < 5:
-        suggestions.append('List 5-10 key skills that match the job description.')
-    if resume.projects.count() == 0 and resume.template in {'tech','developer','creative'}:
-        suggestions.append('Showcase 1-2 projects with links and your role/impact.')
-    if resume.template in {'executive','professional','corporate'} and personal_info.linkedin == '':
-        suggestions.append('Add your LinkedIn profile for professional credibility.')
+    personal_info = _personal_info_for(resume)
     
     context = {
         'resume': resume,
@@ -190,60 +231,242 @@ def edit_resume(request, resume_id):
         'education': resume.education.all(),
         'skills': resume.skills.all(),
         'projects': resume.projects.all(),
-        'suggestions': suggestions,
+        'suggestions': _resume_suggestions(resume, personal_info),
         'title': f'Edit {resume.title}'
     }
     
     return render(request, 'main/edit_resume.html', context)
 
 @login_required
+@replicas.read_from_replica
 def view_resume(request, resume_id):
+    # Read the cache tokens before the rows, so a concurrent edit can only orphan what we store.
+    tokens = html_cache.tokens(resume_id)
     resume = get_object_or_404(Resume, id=resume_id, user=request.user)
-    
-    context = {
-        'resume': resume,
-        'personal_info': getattr(resume, 'personal_info', None),
-        'experiences': resume.experiences.all(),
-        'education': resume.education.all(),
-        'skills': resume.skills.all(),
-        'projects': resume.projects.all(),
-        'title': resume.title
-    }
-    
-    template_name = f'main/resume_templates/{resume.template}.html'
-    if resume.template == 'custom' or resume.use_custom_theme:
-        template_name = 'main/resume_templates/custom.html'
-    try:
-        return render(request, template_name, context)
-    except TemplateDoesNotExist:
-        return render(request, 'main/resume_templates/modern.html', context)
+
+    entry = template_registry.for_resume(resume)
+    key = html_cache.page_key(resume.id, entry.name, tokens)
+    html = html_cache.get(key)
+    if html is None and replicas.reading():
+        # The replica may be older than the tokens: render straight through, cache nothing.
+        html = entry.template.render(rendering.page_context(resume, None), request)
+    elif html is None:
+        html = entry.template.render(rendering.page_context(resume, tokens), request)
+        html_cache.store(key, html)
+    return HttpResponse(html)
 
 @login_required
+@profiling.profile_view
 def export_resume_pdf(request, resume_id):
     resume = get_object_or_404(Resume, id=resume_id, user=request.user)
-    context = {
-        'resume': resume,
-        'personal_info': getattr(resume, 'personal_info', None),
-        'experiences': resume.experiences.all(),
-        'education': resume.education.all(),
-        'skills': resume.skills.all(),
-        'projects': resume.projects.all(),
+    template_name = rendering.pdf_template_name(resume)
+    base_url = request.build_absolute_uri('/')
+
+    # Serve repeat downloads of an unchanged resume from the PDF cache.
+    digest = pdf_cache.resume_digest(resume, template_name, base_url)
+    etag = f'"{digest}"'
+    entry = pdf_cache.get(digest)
+    if entry is not None:
+        not_modified = get_conditional_response(request, etag=etag, last_modified=int(entry['rendered_at']))
+        if not_modified is not None:
+            return not_modified
+    else:
+        if rendering.HTML is None:
+            messages.error(request, 'PDF export is not available on this server. Please install WeasyPrint.')
+            return redirect('main:view_resume', resume_id=resume.id)
+        html_string = rendering.render_pdf_html(resume, request=request)
+        entry = pdf_cache.store(resume.id, digest, rendering.write_pdf(html_string, base_url))
+
+    response = HttpResponse(entry['pdf'], content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{resume.title.replace(" ", "_")}.pdf"'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(entry['rendered_at'])
+    return response
+
+# Snapshot renderings are keyed by content, so browsers may keep them forever.
+IMMUTABLE_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+
+def _get_snapshot(request, resume_id, number):
+    return get_object_or_404(ResumeSnapshot, resume_id=resume_id, resume__user=request.user, number=number)
+
+def _immutable(response, etag):
+    response['ETag'] = etag
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+def _snapshot_json(snapshot):
+    args = [snapshot.resume_id, snapshot.number]
+    return {
+        'number': snapshot.number,
+        'label': snapshot.label,
+        'created_at': snapshot.created_at.isoformat(),
+        'view_url': reverse('main:view_resume_snapshot', args=args),
+        'pdf_url': reverse('main:export_resume_snapshot_pdf', args=args),
+        'variant_url': reverse('main:create_resume_variant', args=args),
     }
-    template_name = f'main/resume_templates/{resume.template}.html'
-    try:
-        html_string = render_to_string(template_name, context, request=request)
-    except TemplateDoesNotExist:
-        html_string = render_to_string('main/resume_templates/modern.html', context, request=request)
 
-    if HTML is None:
+@login_required
+@require_http_methods(["GET", "POST"])
+def resume_snapshots(request, resume_id):
+    """Saved versions as JSON, newest first; POST saves the resume as it is now as a new version."""
+    if request.method == 'POST':
+        resume = get_object_or_404(Resume, id=resume_id, user=request.user)
+        try:
+            snapshot, created = snapshots.take(resume, request.POST.get('label', '').strip()[:100])
+        except IntegrityError:
+            return JsonResponse({'status': 'error', 'message': 'Another version was just saved. Please try again.'}, status=409)
+        return JsonResponse({'status': 'success', 'created': created, 'snapshot': _snapshot_json(snapshot)},
+                            status=201 if created else 200)
+    resume = get_object_or_404(Resume.objects.only('id'), id=resume_id, user=request.user)
+    return JsonResponse({
+        'status': 'success',
+        'snapshots': [_snapshot_json(s) for s in resume.snapshots.defer('document')],
+    })
+
+@login_required
+@replicas.read_from_replica
+def view_resume_snapshot(request, resume_id, number):
+    """A saved version, rendered from its snapshot alone."""
+    snapshot = _get_snapshot(request, resume_id, number)
+    doc = snapshots.decode(snapshot)
+    entry = snapshots.page_template_for(doc)
+    render_key = snapshots.render_key(snapshot, entry.name)
+    etag = f'"{render_key}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return _immutable(not_modified, etag)
+    key = html_cache.snapshot_key(render_key)
+    html = html_cache.get(key)
+    if html is None:
+        html = html_cache.store(key, entry.template.render(snapshots.context(snapshot, doc), request))
+    return _immutable(HttpResponse(html), etag)
+
+@login_required
+@profiling.profile_view
+def export_resume_snapshot_pdf(request, resume_id, number):
+    snapshot = _get_snapshot(request, resume_id, number)
+    doc = snapshots.decode(snapshot)
+    entry = snapshots.template_for(doc)
+    base_url = request.build_absolute_uri('/')
+    digest = snapshots.render_key(snapshot, entry.name, base_url)
+    etag = f'"{digest}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return _immutable(not_modified, etag)
+    cached = pdf_cache.get(digest)
+    if cached is None:
+        if rendering.HTML is None:
+            messages.error(request, 'PDF export is not available on this server. Please install WeasyPrint.')
+            return redirect('main:view_resume_snapshot', resume_id=resume_id, number=number)
+        html_string = entry.template.render(snapshots.context(snapshot, doc), request)
+        # Not tied to the resume: edits to it must not drop the PDFs of its saved versions.
+        cached = pdf_cache.store(None, digest, rendering.write_pdf(html_string, base_url))
+    response = HttpResponse(cached['pdf'], content_type='application/pdf')
+    title = doc['resume'].get('title', 'resume')
+    response['Content-Disposition'] = f'attachment; filename="{title.replace(" ", "_")}-v{number}.pdf"'
+    return _immutable(response, etag)
+
+@login_required
+@require_http_methods(["POST"])
+def create_resume_variant(request, resume_id, number):
+    """A new resume from a saved version, e.g. to tailor it for another job."""
+    snapshot = _get_snapshot(request, resume_id, number)
+    resume = snapshots.create_variant(snapshot, request.user, request.POST.get('title', '').strip()[:200] or None)
+    messages.success(request, f'Created "{resume.title}" from version {number}.')
+    return redirect('main:edit_resume', resume_id=resume.id)
+
+# Stands in for a PDF that failed to render, so the rest of the archive still arrives intact.
+ZIP_RENDER_FAILED = b'This resume could not be rendered to PDF. Please try exporting it on its own.\n'
+
+def _zip_entry(resume, pdf):
+    stem = f"{slugify(resume.title) or 'resume'}-{resume.id}"
+    return (f'{stem}.pdf', pdf) if pdf is not None else (f'{stem}-FAILED.txt', ZIP_RENDER_FAILED)
+
+@login_required
+def export_resumes_zip(request):
+    """Stream all (or the selected ``ids``) of the user's resumes as a ZIP of PDFs."""
+    resumes = Resume.objects.filter(user=request.user)
+    ids = [i for i in request.GET.getlist('ids') if i.isdigit()]
+    if ids:
+        resumes = resumes.filter(id__in=ids)
+    if rendering.HTML is None:
         messages.error(request, 'PDF export is not available on this server. Please install WeasyPrint.')
-        return redirect('main:view_resume', resume_id=resume.id)
+        return redirect('main:dashboard')
 
-    pdf = HTML(string=html_string, base_url=request.build_absolute_uri('/')).write_pdf()
-    response = HttpResponse(pdf, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{resume.title.replace(" ", "_")}.pdf"'
+    base_url = request.build_absolute_uri('/')
+    entries = (_zip_entry(resume, pdf) for resume, pdf in rendering.iter_resume_pdfs(resumes, base_url))
+    response = StreamingHttpResponse(zipstream.iter_zip(entries), content_type='application/zip')
+    response['Content-Disposition'] = 'attachment; filename="resumes.zip"'
     return response
 
+def _export_job_payload(job: ExportJob) -> dict:
+    done = job.status == ExportJob.STATUS_DONE
+    return {
+        'status': 'success',
+        'job_id': job.id,
+        'state': job.status,
+        'status_url': reverse('main:export_job_status', args=[job.id]),
+        'download_url': reverse('main:export_resume_pdf', args=[job.resume_id]) if done else None,
+        'error': job.error or None,
+    }
+
+@login_required
+@require_http_methods(["POST"])
+def export_resume_pdf_async(request, resume_id):
+    resume = get_object_or_404(Resume, id=resume_id, user=request.user)
+    try:
+        job = export_jobs.enqueue(request.user, resume, request.build_absolute_uri('/'))
+    except export_jobs.QueueFull:
+        return JsonResponse({'status': 'error', 'message': 'Too many exports in progress. Please try again shortly.'}, status=429)
+    return JsonResponse(_export_job_payload(job), status=202)
+
+@login_required
+def export_job_status(request, job_id):
+    job = get_object_or_404(ExportJob, id=job_id, user=request.user)
+    if job.status == ExportJob.STATUS_DONE and request.GET.get('redirect'):
+        return redirect('main:export_resume_pdf', resume_id=job.resume_id)
+    return JsonResponse(_export_job_payload(job))
+
+@staff_member_required
+def export_job_metrics(request):
+    return JsonResponse(export_jobs.metrics())
+
+@staff_member_required
+def profile_list(request):
+    profiles = [
+        {**entry, 'url': reverse('main:profile_download', args=[entry['name']])}
+        for entry in profiling.list_profiles()
+    ]
+    return JsonResponse({'profiles': profiles})
+
+@staff_member_required
+def profile_download(request, name):
+    path = profiling.path_for(name)
+    if path is None:
+        raise Http404
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=name, content_type='text/plain')
+
+def metrics(request):
+    """Request histograms and export queue gauges in the Prometheus text format."""
+    if settings.PERF_METRICS_TOKEN:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {settings.PERF_METRICS_TOKEN}'):
+            return HttpResponse(status=401)
+    elif not (request.user.is_active and request.user.is_staff):
+        return HttpResponse(status=403)
+    queue = export_jobs.metrics()
+    gauges = {
+        'resume_export_jobs': ('Export jobs by status.', {
+            (('status', status),): queue[status] for status in ('running', 'done', 'failed')
+        } | {(('status', 'queued'),): queue['queue_depth']}),
+        'resume_export_wait_seconds': ('Queue wait over recent finished jobs.', {
+            (('quantile', q),): queue['wait_seconds'][p] for q, p in (('0.5', 'p50'), ('0.95', 'p95'))
+        }),
+        'resume_export_latency_seconds': ('Enqueue-to-done time over recent finished jobs.', {
+            (('quantile', q),): queue['latency_seconds'][p] for q, p in (('0.5', 'p50'), ('0.95', 'p95'))
+        }),
+    }
+    return HttpResponse(perf.render_metrics(gauges), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @login_required
 def delete_resume(request, resume_id):
     resume = get_object_or_404(Resume, id=resume_id, user=request.user)
@@ -265,34 +488,20 @@ def about(request):
 @login_required
 def builder_resume(request, resume_id):
     """Split view: left forms, right live preview."""
-    resume = get_object_or_404(Resume, id=resume_id, user=request.user)
     if request.method == 'POST':
+        resume = get_object_or_404(Resume.objects.select_related('personal_info'), id=resume_id, user=request.user)
         form = ResumeForm(request.POST, instance=resume)
         if form.is_valid():
             updated_resume = form.save()
-            updated_resume.history.append({
-                'ts': timezone.now().isoformat(),
-                'event': 'updated_settings',
-                'by': request.user.username,
-            })
-            updated_resume.save(update_fields=['history'])
+            history.record(updated_resume, 'updated_settings', request.user)
             messages.success(request, 'Resume updated successfully!')
             return redirect('main:builder_resume', resume_id=resume.id)
+        resume = _prefetch_sections(resume)
     else:
+        resume = _get_user_resume(request, resume_id)
         form = ResumeForm(instance=resume)
 
-    personal_info, _ = PersonalInfo.objects.get_or_create(resume=resume)
-    suggestions = []
-    if not personal_info.first_name or not personal_info.last_name:
-        suggestions.append('Add your first and last name to personalize the header.')
-    if not personal_info.summary:
-        suggestions.append('Write a concise professional summary (2-3 sentences).')
-    if resume.experiences.count() == 0:
-        suggestions.append('Add at least one work experience with achievements using action verbs.')
-    if resume.education.count() == 0:
-        suggestions.append('Include your most relevant education with degree and institution.')
-    if resume.skills.count() < 5:
-        suggestions.append('List 5-10 key skills that match the job description.')
+    personal_info = _personal_info_for(resume)
 
     context = {
         'resume': resume,
@@ -302,11 +511,76 @@ def builder_resume(request, resume_id):
         'education': resume.education.all(),
         'skills': resume.skills.all(),
         'projects': resume.projects.all(),
-        'suggestions': suggestions,
+        'suggestions': _resume_suggestions(resume, personal_info, template_tips=False),
+        'live_preview': settings.LIVE_PREVIEW_ENABLED,
         'title': f'Builder · {resume.title}'
     }
     return render(request, 'main/edit_resume_split.html', context)
 
+def _live_fragments(resume_id, sections):
+    tokens = html_cache.tokens(resume_id)
+    resume = Resume.objects.filter(id=resume_id).first()
+    if resume is None:
+        return None
+    return {'version': resume.version, 'fragments': rendering.render_fragments(resume, sections, tokens=tokens)}
+
+def _sse(event: str, data: dict) -> str:
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+async def _live_preview_events(subscription, resume_id):
+    try:
+        yield 'retry: 3000\n\n'
+        while True:
+            messages = await subscription.get(settings.LIVE_PREVIEW_KEEPALIVE)
+            if not messages:
+                # Keeps proxies from timing out the connection and notices dropped clients.
+                yield ': keepalive\n\n'
+                continue
+            sections = live_preview.changed_sections(messages)
+            if live_preview.RELOAD in sections:
+                yield _sse('reload', {})
+                continue
+            data = await sync_to_async(_live_fragments)(resume_id, sections)
+            if data is None:
+                return
+            yield _sse('fragments', data)
+    finally:
+        subscription.close()
+
+@login_required
+async def resume_live_preview(request, resume_id):
+    """Server-Sent Events carrying re-rendered preview fragments whenever a section is saved."""
+    if not settings.LIVE_PREVIEW_ENABLED:
+        raise Http404
+    user = await request.auser()
+    if not await Resume.objects.filter(id=resume_id, user=user).aexists():
+        raise Http404
+    # Subscribe before responding, so nothing saved after this request is missed.
+    subscription = live_preview.subscribe(resume_id)
+    return StreamingHttpResponse(
+        _live_preview_events(subscription, resume_id),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+@login_required
+def resume_history(request, resume_id):
+    """Newest-first history as JSON; follow ``next`` for older events."""
+    resume = get_object_or_404(Resume.objects.only('id'), id=resume_id, user=request.user)
+    try:
+        limit = max(1, min(int(request.GET.get('limit') or settings.RESUME_HISTORY_PAGE_SIZE), 100))
+        events, next_cursor = history.page(resume, request.GET.get('cursor', ''), limit)
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid cursor or limit.'}, status=400)
+    next_url = None
+    if next_cursor:
+        next_url = f"{reverse('main:resume_history', args=[resume.id])}?cursor={next_cursor}&limit={limit}"
+    return JsonResponse({
+        'status': 'success',
+        'events': [{'id': e.id, 'ts': e.ts.isoformat(), 'event': e.event, 'by': e.by} for e in events],
+        'next': next_url,
+    })
+
 # Tools: Image ↔ PDF
 def tools_convert(request):
     return render(request, 'main/tools_convert.html', {
@@ -320,34 +594,38 @@ def tool_image_to_pdf(request):
         messages.error(request, 'Please upload at least one image.')
         return redirect('main:tools_convert')
 
-    images = []
-    for f in uploaded_files:
-        try:
-            img = Image.open(f)
-            if img.mode in ("RGBA", "P"):
-                img = img.convert("RGB")
-            else:
-                img = img.copy()
-            images.append(img)
-        except Exception:
-            continue
-
-    if not images:
+    page_size = request.POST.get('page_size', '')
+    try:
+        dpi = int(request.POST.get('dpi') or settings.IMAGE_TO_PDF_DPI)
+    except ValueError:
+        dpi = settings.IMAGE_TO_PDF_DPI
+    dpi = max(72, min(dpi, 600))
+
+    # Images are appended one by one to a temporary file instead of being held in a list.
+    fd, path = tempfile.mkstemp(suffix='.pdf')
+    os.close(fd)
+    try:
+        pages = converters.images_to_pdf(
+            uploaded_files, path, page_size=page_size, dpi=dpi, quality=settings.IMAGE_TO_PDF_JPEG_QUALITY,
+        )
+        pdf = open(path, 'rb') if pages else None
+    finally:
+        # The open handle keeps the data readable until the response is closed.
+        os.unlink(path)
+
+    if pdf is None:
         messages.error(request, 'Could not read any of the uploaded images.')
         return redirect('main:tools_convert')
+    return FileResponse(pdf, as_attachment=True, filename='images_to_pdf.pdf', content_type='application/pdf')
 
-    buf = BytesIO()
-    if len(images) == 1:
-        images[0].save(buf, format='PDF')
-    else:
-        images[0].save(buf, format='PDF', save_all=True, append_images=images[1:])
-    buf.seek(0)
-
-    response = HttpResponse(buf.getvalue(), content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="images_to_pdf.pdf"'
-    return response
+def _iter_page_images_parallel(pdf_file, pages, dpi, fmt):
+    with converters.uploaded_pdf_path(pdf_file) as path:
+        yield from converters.iter_page_images_parallel(
+            path, pages, dpi, fmt, rendering.shared_pool(), settings.PDF_SHARED_POOL_WORKERS,
+        )
 
 @require_http_methods(["POST"]) 
+@profiling.profile_view
 def tool_pdf_to_images(request):
     if fitz is None:
         messages.error(request, 'PDF to Image requires PyMuPDF. Please ensure it is installed.')
@@ -357,28 +635,49 @@ def tool_pdf_to_images(request):
     fmt = request.POST.get('format', 'png').lower()
     if fmt not in {'png', 'jpg', 'jpeg'}:
         fmt = 'png'
+    try:
+        dpi = int(request.POST.get('dpi') or settings.PDF_TO_IMAGES_DEFAULT_DPI)
+    except ValueError:
+        dpi = settings.PDF_TO_IMAGES_DEFAULT_DPI
+    dpi = max(36, min(dpi, settings.PDF_TO_IMAGES_MAX_DPI))
 
     if not pdf_file:
         messages.error(request, 'Please upload a PDF file.')
         return redirect('main:tools_convert')
 
-    data = pdf_file.read()
-    doc = fitz.open(stream=data, filetype='pdf')
-    zip_buf = BytesIO()
-    with ZipFile(zip_buf, 'w') as zf:
-        for i, page in enumerate(doc):
-            pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-            img_bytes = pix.tobytes(output=fmt)
-            safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', pdf_file.name.rsplit('.', 1)[0]) or 'page'
-            zf.writestr(f"{safe_name}_page_{i+1}.{fmt if fmt != 'jpg' else 'jpg'}", img_bytes)
-    doc.close()
-    zip_buf.seek(0)
-
-    resp = HttpResponse(zip_buf.getvalue(), content_type='application/zip')
+    try:
+        doc = converters.open_pdf(pdf_file)
+    except Exception:
+        messages.error(request, 'Could not read the uploaded PDF.')
+        return redirect('main:tools_convert')
+    try:
+        pages = converters.parse_page_range(request.POST.get('pages', ''), doc.page_count)
+    except ValueError as exc:
+        doc.close()
+        messages.error(request, str(exc))
+        return redirect('main:tools_convert')
+    if len(pages) > settings.PDF_TO_IMAGES_MAX_PAGES:
+        doc.close()
+        messages.error(request, f'At most {settings.PDF_TO_IMAGES_MAX_PAGES} pages can be converted at once. Please select a page range.')
+        return redirect('main:tools_convert')
+
+    # Pages are rasterized and zipped one at a time while the response streams.
+    if settings.PDF_TO_IMAGES_PARALLEL and len(pages) >= settings.PDF_TO_IMAGES_PARALLEL_MIN_PAGES:
+        doc.close()
+        images = _iter_page_images_parallel(pdf_file, pages, dpi, fmt)
+    else:
+        images = converters.iter_page_images(doc, pages, dpi, fmt)
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', pdf_file.name.rsplit('.', 1)[0]) or 'page'
+    entries = ((f"{safe_name}_page_{i+1}.{fmt}", img_bytes) for i, img_bytes in images)
+    resp = StreamingHttpResponse(zipstream.iter_zip(entries), content_type='application/zip')
     resp['Content-Disposition'] = 'attachment; filename="pdf_pages.zip"'
     return resp
 
 # AJAX views for dynamic form handling
+def _current_version(resume: Resume) -> int:
+    # Saves bump the version with an UPDATE, so the in-memory copy is stale.
+    return Resume.objects.values_list('version', flat=True).get(pk=resume.pk)
+
 @login_required
 @csrf_exempt
 def save_personal_info(request, resume_id):
@@ -405,7 +704,7 @@ def add_experience(request, resume_id):
             experience = form.save(commit=False)
             experience.resume = resume
             experience.save()
-            return JsonResponse({'status': 'success', 'id': experience.id})
+            return JsonResponse({'status': 'success', 'id': experience.id, 'version': _current_version(resume)})
         else:
             return JsonResponse({'status': 'error', 'errors': form.errors})
     
@@ -421,7 +720,7 @@ def add_education(request, resume_id):
             education = form.save(commit=False)
             education.resume = resume
             education.save()
-            return JsonResponse({'status': 'success', 'id': education.id})
+            return JsonResponse({'status': 'success', 'id': education.id, 'version': _current_version(resume)})
         else:
             return JsonResponse({'status': 'error', 'errors': form.errors})
     
@@ -437,7 +736,7 @@ def add_skill(request, resume_id):
             skill = form.save(commit=False)
             skill.resume = resume
             skill.save()
-            return JsonResponse({'status': 'success', 'id': skill.id})
+            return JsonResponse({'status': 'success', 'id': skill.id, 'version': _current_version(resume)})
         else:
             return JsonResponse({'status': 'error', 'errors': form.errors})
     
@@ -453,8 +752,63 @@ def add_project(request, resume_id):
             project = form.save(commit=False)
             project.resume = resume
             project.save()
-            return JsonResponse({'status': 'success', 'id': project.id})
+            return JsonResponse({'status': 'success', 'id': project.id, 'version': _current_version(resume)})
         else:
             return JsonResponse({'status': 'error', 'errors': form.errors})
     
     return JsonResponse({'status': 'error', 'message': 'Invalid request method'})
+
+@login_required
+@require_http_methods(["POST"])
+def autosave_resume(request, resume_id):
+    """
+    Apply a patch of changed fields if the resume is still at the client's version.
+
+    Body: ``{"version": 7, "changes": [{"model": "experience", "id": 3, "data": {...}}]}``.
+    Responds with the new version and the re-rendered preview fragments for the
+    changed sections, or 409 with the current version if someone else saved first.
+    """
+    try:
+        payload = json.loads(request.body)
+        version, changes = int(payload['version']), payload['changes']
+        operations = [{**change, 'op': 'update'} for change in changes]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'status': 'error', 'message': 'Expected {"version": int, "changes": [...]}.'}, status=400)
+    try:
+        with transaction.atomic():
+            # Lock the row at the client's version first, so concurrent saves serialize on it;
+            # the section signals then bump the version once.
+            claimed = Resume.objects.filter(id=resume_id, user=request.user, version=version).update(version=F('version'))
+            if not claimed:
+                current = get_object_or_404(Resume.objects.only('version'), id=resume_id, user=request.user).version
+                return JsonResponse({
+                    'status': 'error', 'message': 'This resume was changed elsewhere. Reload to continue.', 'version': current,
+                }, status=409)
+            batch.apply(Resume.objects.only('id').get(id=resume_id), operations)
+    except batch.BatchError as e:
+        return JsonResponse({'status': 'error', 'message': str(e), 'results': e.results}, status=400)
+
+    # Render just what changed, fresh: the cache tokens are only bumped once the
+    # outermost transaction commits, which may not have happened yet.
+    resume = Resume.objects.get(id=resume_id)
+    sections = {signals.SECTION_MODELS[batch.FORMS[op['model']]._meta.model] for op in operations}
+    return JsonResponse({
+        'status': 'success',
+        'version': resume.version,
+        'fragments': rendering.render_fragments(resume, sections, request),
+    })
+
+@login_required
+@require_http_methods(["POST"])
+def batch_sections(request, resume_id):
+    """Apply a JSON list of section create/update/delete operations in one transaction."""
+    resume = get_object_or_404(Resume, id=resume_id, user=request.user)
+    try:
+        operations = json.loads(request.body)['operations']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'status': 'error', 'message': 'Expected a JSON object with an "operations" list.'}, status=400)
+    try:
+        results = batch.apply(resume, operations)
+    except batch.BatchError as e:
+        return JsonResponse({'status': 'error', 'message': str(e), 'results': e.results}, status=400)
+    return JsonResponse({'status': 'success', 'results': results})
@@ -0,0 +1,36 @@
+"""Build ZIP archives incrementally so they can be streamed to the client."""
+from zipfile import ZIP_STORED, ZipFile
+
+
+class _Sink:
+    """Write-only file object that holds bytes until the generator drains them."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(entries, compression=ZIP_STORED):
+    """
+    Yield a ZIP archive chunk by chunk from an iterable of ``(name, bytes)``.
+
+    Only the entry currently being written is held in memory; PDFs and PNGs are
+    already compressed, hence ZIP_STORED by default.
+    """
+    sink = _Sink()
+    with ZipFile(sink, 'w', compression=compression) as zf:
+        for name, data in entries:
+            zf.writestr(name, data)
+            yield sink.drain()
+    yield sink.drain()
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 from django.contrib.messages import constants as messages
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -53,6 +54,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'main.perf.PerfMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -60,6 +62,8 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    # Keeps a browser on the primary database right after it writes (main/replicas.py).
+    'main.replicas.ReplicaPinMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -67,7 +71,8 @@ ROOT_URLCONF = 'resumw_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates with render timing for main.perf.
+        'BACKEND': 'main.template_backends.InstrumentedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -86,12 +91,204 @@ WSGI_APPLICATION = 'resumw_project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DATABASE_PROFILE picks one of:
+#   sqlite      - the development default: rollback journal, one writer blocks every reader.
+#   sqlite-wal  - single-node deployments: WAL journal so readers never wait for the writer,
+#                 and write transactions take the lock up front (BEGIN IMMEDIATE) so
+#                 concurrent autosaves queue on busy_timeout instead of failing to upgrade.
+#   postgres    - PostgreSQL from POSTGRES_* variables; needs psycopg (requirements.txt).
+# `manage.py bench_db_writes` measures concurrent-write throughput of the active profile.
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'sqlite')
+SQLITE_PATH = os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3')
+
+if DATABASE_PROFILE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': SQLITE_PATH,
+        }
+    }
+elif DATABASE_PROFILE == 'sqlite-wal':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': SQLITE_PATH,
+            'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', '600')),
+            'OPTIONS': {
+                # Seconds a writer waits for the lock (SQLite's busy_timeout).
+                'timeout': float(os.environ.get('SQLITE_BUSY_TIMEOUT', '20')),
+                'transaction_mode': 'IMMEDIATE',
+                # synchronous=NORMAL is durable in WAL mode except for the last commits on power loss.
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA temp_store=MEMORY;'
+                    'PRAGMA cache_size=-20000;'
+                    'PRAGMA mmap_size=134217728;'
+                ),
+            },
+        }
     }
+elif DATABASE_PROFILE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'resumw'),
+            'USER': os.environ.get('POSTGRES_USER', 'resumw'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', '600')),
+            'OPTIONS': {},
+        }
+    }
+    # Psycopg's pool (psycopg[pool]) instead of one persistent connection per thread; Django
+    # requires CONN_MAX_AGE = 0 with it. Size it to workers x threads per worker at most.
+    if os.environ.get('DATABASE_POOL', 'False').lower() == 'true':
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', '10')),
+            'timeout': float(os.environ.get('DATABASE_POOL_TIMEOUT', '10')),
+        }
+else:
+    raise ImproperlyConfigured(
+        f"DATABASE_PROFILE must be 'sqlite', 'sqlite-wal' or 'postgres', not {DATABASE_PROFILE!r}."
+    )
+# Persistent connections are pinged before reuse, so a restarted database server costs one retry, not an error.
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Read replicas (main/replicas.py): page views wrapped in read_from_replica read from one of
+# DATABASE_REPLICAS, except for browsers that wrote within the last REPLICA_PIN_SECONDS.
+# POSTGRES_REPLICA_HOSTS is a comma-separated list of hot standbys of POSTGRES_HOST.
+DATABASE_REPLICAS = []
+if DATABASE_PROFILE == 'postgres':
+    for n, host in enumerate(filter(None, os.environ.get('POSTGRES_REPLICA_HOSTS', '').split(',')), 1):
+        DATABASES[f'replica{n}'] = {**DATABASES['default'], 'HOST': host.strip(), 'TEST': {'MIRROR': 'default'}}
+        DATABASE_REPLICAS.append(f'replica{n}')
+DATABASE_ROUTERS = ['main.replicas.ReplicaRouter']
+REPLICA_PIN_COOKIE = 'db_pin'
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', '15'))
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Rendered resume PDFs, keyed by content hash (see main/pdf_cache.py).
+    # Bump VERSION after changing resume templates to drop stale PDFs.
+    'pdf': {
+        'BACKEND': 'main.cache_backends.LRUFileBasedCache',
+        'LOCATION': os.environ.get('PDF_CACHE_DIR', BASE_DIR / '.cache' / 'pdf'),
+        'TIMEOUT': None,
+        'VERSION': 1,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('PDF_CACHE_MAX_ENTRIES', '1000')),
+            'MAX_BYTES': int(os.environ.get('PDF_CACHE_MAX_BYTES', str(256 * 1024 * 1024))),
+        },
+    },
+    # Rendered resume pages and section fragments (see main/html_cache.py).
+    # Shared between worker processes so signal-driven invalidation reaches all of them.
+    'html': {
+        'BACKEND': 'main.cache_backends.LRUFileBasedCache',
+        'LOCATION': os.environ.get('HTML_CACHE_DIR', BASE_DIR / '.cache' / 'html'),
+        'TIMEOUT': None,
+        'VERSION': 1,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('HTML_CACHE_MAX_ENTRIES', '5000')),
+            'MAX_BYTES': int(os.environ.get('HTML_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+        },
+    },
 }
+PDF_CACHE_ALIAS = 'pdf'
+HTML_CACHE_ALIAS = 'html'
+# Template previews use dummy data, so they only need to expire eventually.
+TEMPLATE_PREVIEW_CACHE_TIMEOUT = 60 * 60
+
+# Resume history (main/history.py); `manage.py compact_resume_history` applies the limits.
+RESUME_HISTORY_COMPACT_WINDOW = int(os.environ.get('RESUME_HISTORY_COMPACT_WINDOW', '600'))
+RESUME_HISTORY_RETENTION_DAYS = int(os.environ.get('RESUME_HISTORY_RETENTION_DAYS', '365'))
+RESUME_HISTORY_MAX_EVENTS = int(os.environ.get('RESUME_HISTORY_MAX_EVENTS', '500'))
+RESUME_HISTORY_PAGE_SIZE = 20
+# Resumes per dashboard page; later pages load on scroll (main.keyset).
+DASHBOARD_PAGE_SIZE = 24
+# The summary counts are dropped whenever a resume is saved or deleted; the timeout is a backstop.
+DASHBOARD_STATS_CACHE_TIMEOUT = 60 * 60
+
+# Request instrumentation (main/perf.py). Every request feeds the latency histograms;
+# PERF_SAMPLE_RATE of them also get a per-span breakdown, a Server-Timing header and a
+# log line on the main.perf logger. /metrics/ needs PERF_METRICS_TOKEN as a bearer token,
+# or a staff login when no token is set.
+PERF_SAMPLE_RATE = float(os.environ.get('PERF_SAMPLE_RATE', '0.1'))
+PERF_SERVER_TIMING = os.environ.get('PERF_SERVER_TIMING', 'True').lower() == 'true'
+PERF_SLOW_REQUEST_SECONDS = float(os.environ.get('PERF_SLOW_REQUEST_SECONDS', '2'))
+PERF_METRICS_TOKEN = os.environ.get('PERF_METRICS_TOKEN', '')
+
+# Opt-in sampling profiler (main/profiling.py) for export_resume_pdf and tool_pdf_to_images.
+# When enabled, staff trigger it with an `X-Profile: 1` header and PROFILING_SAMPLE_RATE
+# of all requests are profiled too. Profiles are listed at /profiles/ (staff only).
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'False').lower() == 'true'
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_INTERVAL = 0.005
+PROFILING_MAX_SECONDS = 120
+PROFILING_MAX_STACKS = 5000
+PROFILE_DIR = os.environ.get('PROFILE_DIR', BASE_DIR / '.cache' / 'profiles')
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', '50'))
+PROFILE_MAX_BYTES = int(os.environ.get('PROFILE_MAX_BYTES', str(20 * 1024 * 1024)))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # INFO logs every sampled request as JSON; WARNING only the slow ones.
+        'main.perf': {'handlers': ['console'], 'level': os.environ.get('PERF_LOG_LEVEL', 'WARNING'), 'propagate': False},
+    },
+}
+
+# Builder batch endpoint (main/batch.py).
+BATCH_MAX_OPERATIONS = 200
+
+# Builder live preview over Server-Sent Events (main/live_preview.py). Each open builder keeps a
+# request open indefinitely, which only an ASGI server (resumw_project.asgi) can afford: under
+# WSGI every builder tab pins a worker. Off by default; the builder then reloads its preview
+# after each save. With more than one process, use main.live_preview.CacheBroker and point
+# LIVE_PREVIEW_CACHE_ALIAS at a cache they all share: the LocMem 'default' is per process
+# (`manage.py check` warns about it).
+LIVE_PREVIEW_ENABLED = os.environ.get('LIVE_PREVIEW_ENABLED', 'False').lower() == 'true'
+LIVE_PREVIEW_BROKER = os.environ.get('LIVE_PREVIEW_BROKER', 'main.live_preview.InProcessBroker')
+LIVE_PREVIEW_CACHE_ALIAS = os.environ.get('LIVE_PREVIEW_CACHE_ALIAS', 'default')
+LIVE_PREVIEW_POLL_INTERVAL = float(os.environ.get('LIVE_PREVIEW_POLL_INTERVAL', '0.5'))
+LIVE_PREVIEW_KEEPALIVE = 15
+
+# Background PDF exports (main/export_jobs.py, `manage.py run_export_worker`).
+# Enable PDF_EXPORT_ASYNC only where a worker process is running.
+PDF_EXPORT_ASYNC = os.environ.get('PDF_EXPORT_ASYNC', 'False').lower() == 'true'
+PDF_RENDER_WORKERS = int(os.environ.get('PDF_RENDER_WORKERS', str(os.cpu_count() or 2)))
+# Every web worker process starts its own pool for ZIP exports and parallel rasterizing, so the
+# host runs (web workers x PDF_SHARED_POOL_WORKERS) renderers at most; keep that near the CPU count.
+PDF_SHARED_POOL_WORKERS = int(os.environ.get('PDF_SHARED_POOL_WORKERS', '2'))
+EXPORT_MAX_PENDING_JOBS_PER_USER = int(os.environ.get('EXPORT_MAX_PENDING_JOBS_PER_USER', '5'))
+EXPORT_MAX_RUNNING_JOBS_PER_USER = int(os.environ.get('EXPORT_MAX_RUNNING_JOBS_PER_USER', '1'))
+EXPORT_JOB_TIMEOUT = int(os.environ.get('EXPORT_JOB_TIMEOUT', '300'))
+
+# PDF → Images tool limits
+PDF_TO_IMAGES_DEFAULT_DPI = 144
+PDF_TO_IMAGES_MAX_DPI = int(os.environ.get('PDF_TO_IMAGES_MAX_DPI', '300'))
+PDF_TO_IMAGES_MAX_PAGES = int(os.environ.get('PDF_TO_IMAGES_MAX_PAGES', '200'))
+# Opt-in: rasterize pages on the PDF_SHARED_POOL_WORKERS process pool (see `manage.py bench_pdf_to_images`).
+PDF_TO_IMAGES_PARALLEL = os.environ.get('PDF_TO_IMAGES_PARALLEL', 'False').lower() == 'true'
+PDF_TO_IMAGES_PARALLEL_MIN_PAGES = 4
+
+# Image → PDF tool: resolution used when fitting images onto a fixed page size,
+# and JPEG quality for images that cannot be passed through unchanged.
+IMAGE_TO_PDF_DPI = 150
+IMAGE_TO_PDF_JPEG_QUALITY = int(os.environ.get('IMAGE_TO_PDF_JPEG_QUALITY', '85'))
 
 
 # Password validation
@@ -133,6 +330,8 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# Template gallery previews, built by `manage.py build_template_previews` before collectstatic.
+TEMPLATE_PREVIEW_DIR = BASE_DIR / 'static' / 'previews'
 
 # WhiteNoise static files storage
 STORAGES = {
@@ -0,0 +1,12 @@
+"""
+Settings for the test suite: ``manage.py test --settings=resumw_project.test_settings``.
+
+On SQLite they add a second database, ``replica``, that ReplicaRoutingTests
+fills with copies of the primary; nothing reads from it unless
+DATABASE_REPLICAS names it. Under the regular settings those tests are skipped.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES = {**DATABASES, 'replica': {**DATABASES['default'], 'TEST': {'MIGRATE': False}}}
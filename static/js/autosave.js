@@ -0,0 +1,131 @@
+// Debounced autosave for the resume editors.
+//
+// Sends only the fields that changed since the last successful save, as a
+// patch against the resume's version (see main.views.autosave_resume). The
+// response carries the re-rendered preview fragments, which are swapped into
+// the preview iframe between their <!--fragment:name--> markers instead of
+// reloading the whole page.
+(function () {
+  function csrfToken() {
+    return document.querySelector('[name=csrfmiddlewaretoken]').value;
+  }
+
+  function formValues(form) {
+    const values = {};
+    new FormData(form).forEach(function (value, name) {
+      if (name !== 'csrfmiddlewaretoken') values[name] = value;
+    });
+    // FormData leaves unchecked boxes out; read them as booleans so clearing one is a change.
+    form.querySelectorAll('input[type=checkbox][name]').forEach(function (box) {
+      if (!box.disabled) values[box.name] = box.checked;
+    });
+    return values;
+  }
+
+  // Fields whose value differs from the last save, over the keys of both; a field
+  // that has gone missing from the form is sent as empty.
+  function diff(saved, current) {
+    const changed = {};
+    Object.keys(Object.assign({}, saved, current)).forEach(function (name) {
+      const value = name in current ? current[name] : '';
+      if (value !== saved[name]) changed[name] = value;
+    });
+    return changed;
+  }
+
+  function swapFragment(doc, name, html) {
+    const walker = doc.createTreeWalker(doc.body, NodeFilter.SHOW_COMMENT);
+    let start = null, node;
+    while ((node = walker.nextNode())) {
+      if (node.data === 'fragment:' + name) {
+        start = node;
+      } else if (start && node.data === '/fragment:' + name) {
+        const range = doc.createRange();
+        range.setStartAfter(start);
+        range.setEndBefore(node);
+        range.deleteContents();
+        range.insertNode(range.createContextualFragment(html));
+        return true;
+      }
+    }
+    return false;
+  }
+
+  // Swap fragments into the preview iframe, reloading it if any marker is missing.
+  function updatePreview(frame, fragments) {
+    if (!frame) return;
+    const doc = frame.contentDocument;
+    const names = Object.keys(fragments);
+    if (!doc || !names.every(function (name) { return swapFragment(doc, name, fragments[name]); })) {
+      frame.contentWindow.location.reload();
+    }
+  }
+
+  // options: form, url, model, id (omit for personal_info), version,
+  //          preview (iframe, optional), status (element, optional), delay (ms)
+  window.ResumeAutosave = function (options) {
+    const form = options.form;
+    let saved = formValues(form);
+    let version = Number(options.version);
+    let timer = null, inFlight = false, pending = false, stopped = false;
+
+    function setStatus(text) {
+      if (options.status) options.status.textContent = text;
+    }
+
+    function save() {
+      clearTimeout(timer);
+      timer = null;
+      if (stopped) return;
+      if (inFlight) { pending = true; return; }
+      const changed = diff(saved, formValues(form));
+      if (!Object.keys(changed).length) return;
+
+      const change = {model: options.model, data: changed};
+      if (options.id !== undefined) change.id = options.id;
+      inFlight = true;
+      setStatus('Saving…');
+      fetch(options.url, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json', 'X-CSRFToken': csrfToken()},
+        body: JSON.stringify({version: version, changes: [change]})
+      }).then(function (response) {
+        return response.json().then(function (data) { return {code: response.status, data: data}; });
+      }).then(function (result) {
+        const data = result.data;
+        if (result.code === 409) {
+          stopped = true;
+          setStatus(data.message);
+          return;
+        }
+        if (data.status !== 'success') {
+          const errors = (data.results || []).map(function (r) { return r.errors ? Object.values(r.errors).join(' ') : ''; });
+          setStatus('Not saved: ' + (errors.join(' ') || data.message));
+          return;
+        }
+        Object.assign(saved, changed);
+        version = data.version;
+        setStatus('Saved');
+        updatePreview(options.preview, data.fragments);
+      }).catch(function () {
+        setStatus('Not saved: connection problem. Will retry on the next change.');
+      }).finally(function () {
+        inFlight = false;
+        if (pending) { pending = false; schedule(); }
+      });
+    }
+
+    function schedule() {
+      clearTimeout(timer);
+      timer = setTimeout(save, options.delay || 800);
+    }
+
+    form.addEventListener('input', schedule);
+    return {
+      flush: save,
+      // For other endpoints that change the resume and report its new version.
+      setVersion: function (value) { version = Number(value); }
+    };
+  };
+  window.ResumeAutosave.updatePreview = updatePreview;
+})();